@@ -1,4 +1,5 @@
 import argparse
+import datetime as dt
 
 
 def validate_args(args):
@@ -19,9 +20,25 @@ def validate_args(args):
     if not isinstance(args.dirconf, str):
         raise argparse.ArgumentTypeError("DIRCONF must be of type string.")
 
+    if getattr(args, 'scanthreads', 0) < 0:
+        raise argparse.ArgumentTypeError("SCANTHREADS must be 0 or larger.")
+
+    datefrom = getattr(args, 'datefrom', None)
+    dateto = getattr(args, 'dateto', None)
+    if datefrom and dateto and datefrom > dateto:
+        raise argparse.ArgumentTypeError("DATEFROM must be before DATETO.")
+
     return args
 
 
+def _date(value: str) -> dt.datetime:
+    """Parse date given as YYYY-MM-DD"""
+    try:
+        return dt.datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Date must be given as YYYY-MM-DD, not {value}.")
+
+
 def get_args():
     """Get args from CLI input"""
     parser = argparse.ArgumentParser(description="dataflow",
@@ -49,6 +66,47 @@ def get_args():
     parser.add_argument('-n', '--newestfiles', type=int, default=0,
                         help="Consider newest files only, 0 means keep all files, e.g. 3 means keep 3 newest files. "
                              "Is applied after FILELIMIT was considered.")
+    parser.add_argument('-i', '--incremental', action='store_true',
+                        help="Only process files that are new or changed since the last run, "
+                             "based on the scan manifest stored in the output folder.")
+    parser.add_argument('-t', '--scanthreads', type=int, default=0,
+                        help="Number of threads that list folders in parallel during the file scan, "
+                             "0 means folders are listed one after the other. Useful for network shares.")
+    parser.add_argument('--from', type=_date, dest='datefrom',
+                        help="Start date YYYY-MM-DD, year and month folders (e.g. 2023/07) before this date "
+                             "are not scanned.")
+    parser.add_argument('--to', type=_date, dest='dateto',
+                        help="End date YYYY-MM-DD, year and month folders (e.g. 2023/07) after this date "
+                             "are not scanned.")
+    parser.add_argument('-s', '--stream', action='store_true',
+                        help="Upload data of found files while the file scan is still running. "
+                             "Not possible in combination with NEWESTFILES.")
+    parser.add_argument('-w', '--watch', action='store_true',
+                        help="After the file scan, keep running and upload new or changed files as soon as "
+                             "they are complete (inotify on Linux, otherwise polling). Stop with Ctrl+C.")
+    parser.add_argument('-d', '--dedup', action='store_true',
+                        help="Upload files with identical contents only once, also if they have different "
+                             "filenames or are in different folders (e.g. backup copies).")
+    parser.add_argument('-g', '--greenlitonly', action='store_true',
+                        help="Read only columns that are defined in the filetype settings. Other columns are "
+                             "listed as not greenlit from the file header, without checking their data.")
+    parser.add_argument('--chunksize', type=int, default=0,
+                        help="Read and upload data files in chunks of this number of rows, so that the memory "
+                             "needed does not depend on the size of the files. 0 reads complete files. Not used "
+                             "for special formats.")
+    parser.add_argument('--cachedir', type=str, default=None,
+                        help="Folder for a cache of formatted data. Files with contents and filetype settings "
+                             "that were already read before are loaded from the cache instead of reading them "
+                             "again. No cache is used if not given.")
+    parser.add_argument('--cachesize', type=float, default=10,
+                        help="Maximum size of the cache in GiB, the least recently used files are removed "
+                             "from the cache first.")
+    parser.add_argument('--mmap', action='store_true',
+                        help="Parse uncompressed files directly from memory-mapped files, and decompress gzip "
+                             "files in a separate thread while their data are parsed.")
+    parser.add_argument('--float32', action='store_true',
+                        help="Hold numeric data as float32 between reading and upload to reduce memory use, "
+                             "for all filetypes. Only columns with at most 6 significant digits are converted.")
 
     # TODO hier weiter: add arg for testupload
 
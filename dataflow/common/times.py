@@ -35,6 +35,40 @@ def make_run_id(prefix: str = None, suffix: str = None) -> str:
     return run_id
 
 
+def split_datetime_format(datetime_format: str) -> list[tuple[str, str]]:
+    """Split strftime/strptime format string into literal text and directives
+
+    Example:
+        'meteo%Y%m%d%H.a%M' -> [('literal', 'meteo'), ('directive', 'Y'), ('directive', 'm'),
+                                ('directive', 'd'), ('directive', 'H'), ('literal', '.a'),
+                                ('directive', 'M')]
+
+    The escaped percent sign '%%' is returned as literal '%'. A single '%' at
+    the end of the format string is returned as directive with empty name.
+    """
+    tokens = []
+    literal = ''
+    ix = 0
+    while ix < len(datetime_format):
+        char = datetime_format[ix]
+        if char != '%':
+            literal += char
+            ix += 1
+            continue
+        directive = datetime_format[ix + 1:ix + 2]
+        if directive == '%':
+            literal += '%'
+        else:
+            if literal:
+                tokens.append(('literal', literal))
+                literal = ''
+            tokens.append(('directive', directive))
+        ix += 2
+    if literal:
+        tokens.append(('literal', literal))
+    return tokens
+
+
 def timedelta_to_string(timedelta):
     """
     Converts a pandas.Timedelta to a frequency string representation
@@ -0,0 +1,188 @@
+"""
+Fixtures for filescanner tests
+
+baseline_scan() finds files and assigns filetypes the same way as FileScanner
+did before v0.22.0 (os.walk, loop over all filetypes, strptime), the results
+of the current FileScanner are compared against it.
+"""
+import datetime as dt
+import fnmatch
+import logging
+import os
+import re
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from dataflow.filescanner.filescanner import FileScanner
+
+# Modification time of the first file in the test tree, later files are one minute newer each
+mtime_start = dt.datetime(2024, 3, 1, 12, 0, 0).timestamp()
+
+
+def filetypeconf(filetype_id, filetype_dateparser, valid_from=dt.datetime(2000, 1, 1),
+                 valid_to=dt.datetime(2099, 12, 31, 23, 59), filegroup='10_meteo', data_version='raw',
+                 filetype_gzip=False) -> dict:
+    return dict(filetype_id=filetype_id, filetype_dateparser=filetype_dateparser,
+                filetype_valid_from=valid_from, filetype_valid_to=valid_to,
+                filegroup=filegroup, data_version=data_version, filetype_gzip=filetype_gzip)
+
+
+@pytest.fixture
+def conf_filetypes() -> dict:
+    """Filetypes with the different kinds of filename patterns and dateparsers"""
+    return {
+        # Same pattern as the next filetype, only valid for older files
+        'METEO-10MIN-OLD': filetypeconf(filetype_id='meteo*.a*', filetype_dateparser='meteo%Y%m%d%H.a%M',
+                                        valid_to=dt.datetime(2022, 12, 31, 23, 59), data_version='old'),
+        'METEO-10MIN': filetypeconf(filetype_id='meteo*.a*', filetype_dateparser='meteo%Y%m%d%H.a%M',
+                                    valid_from=dt.datetime(2023, 1, 1)),
+        # Pattern without literal start, several dateparsers
+        'METEO-TBL1': filetypeconf(filetype_id=['*_TBL1_*.dat', '*_TBL1.dat'],
+                                   filetype_dateparser=['CH-DAV_iDL_H1_0_1_TBL1_%Y_%m_%d_%H%M.dat',
+                                                        'get_from_filepath']),
+        # Date from modification time, only in folders named Level-0
+        'EC-FLUX-LEVEL0': filetypeconf(filetype_id='eddypro_*_full_output_*.csv', filetype_dateparser=False,
+                                       filegroup='20_ec_fluxes', data_version='eddypro_level-0'),
+        'PROFILE-ICOSSEQ-': filetypeconf(filetype_id='CH-DAV_prof_*.csv', filetype_dateparser='CH-DAV_prof_%Y%m%d',
+                                         filegroup='12_profile'),
+        'METEO-DOY': filetypeconf(filetype_id='Davos10Min-*.dat', filetype_dateparser='Davos10Min-%Y%j.dat'),
+    }
+
+
+# Files in the test tree, relative to the source folder
+tree_files = [
+    'meteo2022123123.a50',
+    'meteo2023010100.a00',
+    'meteo2023010100.a05.txt',
+    'meteo2023013124.a00',  # Hour 24 is not valid
+    'meteo_notes.a00',
+    '2023/01/CH-DAV_iDL_H1_0_1_TBL1.dat',
+    '2023/01/CH-DAV_iDL_H1_0_1_TBL1_2023_01_15_1200.dat',
+    '2023/02/CH-DAV_iDL_H1_0_1_TBL1_2023_2_15_1200.dat',
+    '2023/13/CH-LAE_iDL_H1_0_1_TBL1.dat',
+    '2024/07/CH-DAV_iDL_H1_0_1_TBL1_x.dat',
+    '2024/07/Davos10Min-202433.dat',
+    '2024/07/Davos10Min-202400.dat',  # Day of year 0 is not valid
+    '2024/binned_meteo.dat',
+    'eddypro/Level-0/eddypro_CH-DAV_full_output_2024-07-01.csv',
+    'eddypro/Level-1/eddypro_CH-DAV_full_output_2024-07-01b.csv',
+    'profile/CH-DAV_prof_20240701.csv',
+    'profile/CH-DAV_prof_2024070.csv',
+    'profile/image.png',
+    'profile/other.csv',
+]
+
+
+@pytest.fixture
+def tree(tmp_path) -> Path:
+    """Source folder with files of all filetypes, each file with a different modification time"""
+    dir_src = tmp_path / 'src'
+    for ix, relpath in enumerate(tree_files):
+        filepath = dir_src / relpath
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_text(f"TIMESTAMP,TA\n2024-01-01 00:00,{ix}\n")
+        mtime = mtime_start + 60 * ix
+        os.utime(filepath, (mtime, mtime))
+    return dir_src
+
+
+@pytest.fixture
+def logger() -> logging.Logger:
+    return logging.getLogger('dataflow-test')
+
+
+def make_filescanner(dir_src: Path, conf_filetypes: dict, logger: logging.Logger, **kwargs) -> FileScanner:
+    kwargs.setdefault('newestfiles', 0)
+    return FileScanner(site='CH-DAV', datatype='raw', filegroup='10_meteo', conf_filetypes=conf_filetypes,
+                       logger=logger, dir_src=dir_src, **kwargs)
+
+
+def baseline_detect_filetype(newfile: dict, conf_filetypes: dict, db_bucket: str) -> dict:
+    """Filetype detection as before v0.22.0"""
+    newfile['filedate'] = newfile['config_filetype'] = newfile['db_bucket'] = newfile['id'] = '-not-defined-'
+    for filetype in conf_filetypes.keys():
+        filetypeconf = conf_filetypes[filetype].copy()
+        if not isinstance(filetypeconf['filetype_id'], list):
+            filetypeconf['filetype_id'] = filetypeconf['filetype_id'].split()
+        fnmatch_success = False
+        for filetype_id in filetypeconf['filetype_id']:
+            if fnmatch.fnmatch(newfile['filename'], filetype_id):
+                filetypeconf['filetype_id'] = filetype_id
+                fnmatch_success = True
+                break
+        if not fnmatch_success:
+            continue
+        if filetypeconf['filegroup'] == '20_ec_fluxes' \
+                and filetypeconf['data_version'] == 'eddypro_level-0' \
+                and not 'Level-0' in str(newfile['filepath'].parent):
+            continue
+        if not isinstance(filetypeconf['filetype_dateparser'], list):
+            filetypeconf['filetype_dateparser'] = [filetypeconf['filetype_dateparser']]
+        filedate = None
+        for dateparser in filetypeconf['filetype_dateparser']:
+            if dateparser:
+                if dateparser != 'get_from_filepath':
+                    try:
+                        length = len(dateparser) + 1
+                        filedate = dt.datetime.strptime(newfile['filename'][0:length + 1], dateparser)
+                        break
+                    except ValueError:
+                        continue
+                else:
+                    maybe_month = newfile['filepath'].parents[0].name
+                    maybe_year = newfile['filepath'].parents[1].name
+                    if re.match('^(0[1-9]|1[012])$', maybe_month) \
+                            and re.match('^(19[0-9][0-9]|20[0-9][0-9])$', maybe_year):
+                        filedate = dt.datetime(int(maybe_year), int(maybe_month), 1, 0, 0)
+                        break
+            else:
+                filedate = dt.datetime.strptime(newfile['filemtime'], '%Y-%m-%d %H:%M:%S')
+        if not filedate:
+            continue
+        if (filedate >= filetypeconf['filetype_valid_from']) & (filedate <= filetypeconf['filetype_valid_to']):
+            newfile['filedate'] = filedate
+            newfile['config_filetype'] = filetype
+            newfile['db_bucket'] = db_bucket
+            newfile['id'] = filetypeconf['filetype_id']
+            newfile['data_version'] = filetypeconf['data_version']
+            for sf in FileScanner.special_formats:
+                newfile['special_format'] = sf if sf in newfile['config_filetype'] else False
+            return newfile
+    return newfile
+
+
+def baseline_scan(dir_src: Path, conf_filetypes: dict, newestfiles: int = 0) -> pd.DataFrame:
+    """Results of FileScanner as before v0.22.0"""
+    columns = ['filename', 'site', 'filegroup', 'config_filetype', 'filedate', 'filepath', 'filesize',
+               'db_bucket', 'filemtime', 'id', 'data_version', 'special_format']
+    df = pd.DataFrame(columns=columns)
+    filenum = 0
+    for root, dirs, files in os.walk(str(dir_src)):
+        root = Path(root)
+        for filename in files:
+            if Path(filename).suffix in FileScanner.ignored_extensions \
+                    or any(fnmatch.fnmatch(filename, s) for s in FileScanner.ignored_strings):
+                continue
+            filenum += 1
+            newfile = dict(site='CH-DAV', filegroup='10_meteo', filename=filename, filepath=root / filename)
+            newfile['filesize'] = newfile['filepath'].stat().st_size
+            newfile['filemtime'] = time.strftime('%Y-%m-%d %H:%M:%S',
+                                                 time.localtime(os.stat(newfile['filepath']).st_mtime))
+            newfile = baseline_detect_filetype(newfile=newfile, conf_filetypes=conf_filetypes,
+                                               db_bucket='CH-DAV_raw')
+            for key in newfile.keys():
+                df.loc[filenum, key] = newfile[key]
+    df['filedate'] = pd.to_datetime(df['filedate'], errors='coerce', format='%Y-%m-%d %H:%M:%S')
+    if newestfiles > 0:
+        df = df.sort_values(by='filemtime', axis=0, inplace=False, ascending=False).head(newestfiles)
+    df = df.sort_values(by='filename', axis=0, inplace=False)
+    df.index = range(1, len(df) + 1)
+    return df
+
+
+def assert_same_results(df: pd.DataFrame, baseline: pd.DataFrame):
+    """Results are the same as before, compared as they are written to the CSV output"""
+    assert df[baseline.columns].to_csv() == baseline.to_csv()
@@ -0,0 +1,134 @@
+"""
+FILE DATE PARSER
+"""
+import datetime as dt
+import re
+
+try:
+    # For CLI
+    from ..common.times import split_datetime_format
+except:
+    # For BOX
+    from dataflow.common.times import split_datetime_format
+
+# Directives that are parsed directly, with the number of digits in filenames
+# and the number of digits that are accepted by strptime
+_fixed_widths = {
+    'Y': (4, '4'),
+    'y': (2, '2'),
+    'm': (2, '1,2'),
+    'd': (2, '1,2'),
+    'H': (2, '1,2'),
+    'M': (2, '1,2'),
+    'S': (2, '1,2'),
+    'j': (3, '1,3'),
+}
+
+
+class FilenameDateParser:
+    """Parse the filedate from the start of a filename, with a compiled dateparser
+
+    Gives the same result as
+
+        dt.datetime.strptime(filename[0:len(dateparser) + 2], dateparser)
+
+    with None instead of a ValueError if the filename does not fit. The dateparser
+    (e.g. 'meteo%Y%m%d%H.a%M') is compiled once into a regular expression with
+    one fixed-width group of digits per directive. Filenames that match are
+    converted to datetime directly from the digits. strptime is only called if
+    the dateparser contains other directives (e.g. '%b'), or for filenames that
+    strptime might still accept, e.g. with a single-digit month.
+
+    Results are remembered for each part of a filename that was parsed, the
+    same filename is often parsed by several filetypes with the same dateparser.
+    """
+
+    memo_size = 100_000
+
+    def __init__(self, dateparser: str):
+        self.dateparser = dateparser
+        self.length = len(dateparser) + 2  # Number of characters at the start of the filename that are parsed
+        self._memo = {}
+        self.fixed = None  # Regular expression for filenames that are parsed directly
+        self.lenient = None  # Regular expression for filenames that strptime might accept
+        self.directives = []
+        self._compile()
+
+    def _compile(self):
+        tokens = split_datetime_format(self.dateparser)
+        directives = [value for kind, value in tokens if kind == 'directive']
+        if any(d not in _fixed_widths for d in directives) \
+                or len(set(directives)) != len(directives) \
+                or {'Y', 'y'}.issubset(directives) \
+                or any(c.isspace() for kind, value in tokens if kind == 'literal' for c in value):
+            # Other directives, repeated directives and whitespace: always use strptime
+            return
+
+        fixed = ''
+        lenient = ''
+        for kind, value in tokens:
+            if kind == 'literal':
+                fixed += re.escape(value)
+                lenient += re.escape(value)
+            else:
+                width, accepted = _fixed_widths[value]
+                fixed += rf'(\d{{{width}}})'
+                lenient += rf' ?\d{{{accepted}}}'
+
+        # strptime ignores case
+        self.fixed = re.compile(fixed, re.IGNORECASE)
+        self.lenient = re.compile(lenient, re.IGNORECASE)
+        self.directives = directives
+
+    def parse(self, filename: str) -> dt.datetime or None:
+        """Filedate from the start of the filename, None if the filename does not fit the dateparser"""
+        part = filename[0:self.length]
+        try:
+            return self._memo[part]
+        except KeyError:
+            pass
+
+        if self.fixed:
+            match = self.fixed.fullmatch(part)
+            if match:
+                filedate = self._from_digits(part=part, values=match.groups())
+            elif self.lenient.fullmatch(part):
+                filedate = self._strptime(part=part)
+            else:
+                filedate = None
+        else:
+            filedate = self._strptime(part=part)
+
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()
+        self._memo[part] = filedate
+        return filedate
+
+    def _from_digits(self, part: str, values: tuple) -> dt.datetime or None:
+        """Build datetime from digits, same defaults and rules as strptime"""
+        found = dict(zip(self.directives, map(int, values)))
+        if 'Y' in found:
+            year = found['Y']
+        elif 'y' in found:
+            year = found['y'] + 2000 if found['y'] <= 68 else found['y'] + 1900
+        else:
+            year = 1900
+        try:
+            if 'j' in found:
+                # Day of year has priority over month and day
+                if not 1 <= found['j'] <= 366:
+                    raise ValueError
+                date = dt.date.fromordinal(dt.date(year, 1, 1).toordinal() + found['j'] - 1)
+                year, month, day = date.year, date.month, date.day
+            else:
+                month, day = found.get('m', 1), found.get('d', 1)
+            return dt.datetime(year, month, day, found.get('H', 0), found.get('M', 0), found.get('S', 0))
+        except ValueError:
+            # Invalid values, strptime decides (e.g. leap day without year)
+            return self._strptime(part=part)
+
+    def _strptime(self, part: str) -> dt.datetime or None:
+        try:
+            return dt.datetime.strptime(part, self.dateparser)
+        except ValueError:
+            return None
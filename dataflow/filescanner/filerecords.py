@@ -0,0 +1,54 @@
+"""
+FILE RECORDS
+"""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+
+class FileRecords:
+    """Collect info about found files column by column
+
+    Each found file is appended as one record, the values are stored in one
+    list per column. The dataframe with typed columns is built only once,
+    after all files were collected.
+    """
+
+    columns = ['filename', 'site', 'filegroup',
+               'config_filetype', 'filedate', 'filepath', 'filesize',
+               'db_bucket', 'filemtime',
+               'id',
+               'data_version', 'special_format',
+               'filesize_uncompressed', 'fingerprint']
+
+    def __init__(self):
+        self._columns_set = set(self.columns)
+        self._data = {col: [] for col in self.columns}
+
+    def __len__(self) -> int:
+        return len(self._data['filename'])
+
+    def append(self, newfile: dict) -> None:
+        # All keys available for the new file must also be present in the records
+        if not self._columns_set.issuperset(newfile.keys()):
+            raise Warning("Not all required keys were found in filescanner records.")
+        for col, values in self._data.items():
+            values.append(newfile.get(col, np.nan))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Build dataframe, index starts at 1"""
+        data = dict(self._data)
+
+        # Filedate needs to be datetime, strings (e.g. '-not-defined-') converted to NaT
+        data['filedate'] = pd.to_datetime(
+            [d if isinstance(d, dt.datetime) else None for d in data['filedate']])
+        data['filesize'] = np.array(data['filesize'], dtype='int64')
+
+        # Uncompressed size is only known for gzip files
+        data['filesize_uncompressed'] = pd.array(
+            [None if pd.isna(s) else s for s in data['filesize_uncompressed']], dtype='Int64')
+
+        df = pd.DataFrame(data, columns=self.columns)
+        df.index = np.arange(1, len(df) + 1)
+        return df
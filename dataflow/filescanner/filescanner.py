@@ -1,9 +1,9 @@
 """
 FILESCANNER
 """
-import datetime
 import datetime as dt
 import fnmatch
+import heapq
 import logging
 import os
 import pathlib
@@ -17,9 +17,32 @@ from numpy import arange
 try:
     # For CLI
     from ..common import logblocks
+    from .filerecords import FileRecords
+    from .fingerprint import Fingerprinter
+    from .gzipinfo import gzip_uncompressed_size
+    from .filetypematcher import FiletypeMatcher
+    from .walker import walk_files
+    from .watcher import FileWatcher
 except:
     # For BOX
     from dataflow.common import logblocks
+    from dataflow.filescanner.filerecords import FileRecords
+    from dataflow.filescanner.fingerprint import Fingerprinter
+    from dataflow.filescanner.gzipinfo import gzip_uncompressed_size
+    from dataflow.filescanner.filetypematcher import FiletypeMatcher
+    from dataflow.filescanner.walker import walk_files
+    from dataflow.filescanner.watcher import FileWatcher
+
+# Folder names that indicate the year (1900-2099) and month (01-12) of the files they contain
+pattern_years = re.compile('^(19[0-9][0-9]|20[0-9][0-9])$')
+pattern_months = re.compile('^(0[1-9]|1[012])$')
+
+
+def folder_year_month(year_folder: str, month_folder: str) -> tuple[int, int] or None:
+    """Year and month from folder names, e.g. '2023' and '07' for data in folder 2023/07"""
+    if pattern_years.match(year_folder) and pattern_months.match(month_folder):
+        return int(year_folder), int(month_folder)
+    return None
 
 
 class FileScanner:
@@ -55,7 +78,13 @@ class FileScanner:
             dir_src: pathlib.Path,
             filelimit: int = 0,
             newestfiles: int = 3,
-            testupload: bool = False
+            testupload: bool = False,
+            manifest=None,
+            scanthreads: int = 0,
+            datefrom: dt.datetime = None,
+            dateto: dt.datetime = None,
+            fingerprint: bool = False,
+            fingerprinter: Fingerprinter = None
     ):
         self.dir_src = dir_src
         self.site = site
@@ -66,6 +95,13 @@ class FileScanner:
         self.newestfiles = newestfiles if newestfiles >= 0 else 0
         self.testupload = testupload
         self.logger = logger
+        self.manifest = manifest  # Optional ScanManifest for incremental runs
+        self.scanthreads = scanthreads  # Number of threads listing folders in parallel, 0 = serial
+        self.datefrom = datefrom  # Year and month folders outside this date range are not visited
+        self.dateto = dateto
+        # Fingerprints of files with filetype, a given fingerprinter is shared with other scans
+        self.fingerprinter = (fingerprinter or Fingerprinter()) if fingerprint else None
+        self.watcher = None  # FileWatcher, only used in watch()
 
         # Destination bucket in database
         # v0.2.0: Target bucket is now determined from site
@@ -75,14 +111,12 @@ class FileScanner:
 
         logblocks.log_start(logger=self.logger, class_id=self.class_id)
 
-        self.filescanner_df = self._init_df()
+        self.records = FileRecords()  # Collects info about found files during the scan
+        self.found_files = 0  # Number of found files, before newest files were selected
+        self.filescanner_df = pd.DataFrame(columns=FileRecords.columns)
 
-    def _init_df(self) -> pd.DataFrame:
-        return pd.DataFrame(columns=['filename', 'site', 'filegroup',
-                                     'config_filetype', 'filedate', 'filepath', 'filesize',
-                                     'db_bucket', 'filemtime',
-                                     'id',
-                                     'data_version', 'special_format'])
+        # Filetype settings compiled once, used to find matching filetypes for each file
+        self.matcher = FiletypeMatcher(conf_filetypes=self.conf_filetypes)
 
     def get_results(self) -> pd.DataFrame:
         return self.filescanner_df
@@ -92,114 +126,84 @@ class FileScanner:
         newfile['filedate'] = newfile['config_filetype'] = \
             newfile['db_bucket'] = newfile['id'] = '-not-defined-'
 
-        # Loop through all available filetypes
-        for filetype in self.conf_filetypes.keys():
-            filetypeconf = self.conf_filetypes[filetype].copy()
+        # Loop through filetypes with a filename pattern that matches the file,
+        # in the same order as the filetypes are given in the settings
+        for filetype, filetype_id in self.matcher.candidates(filename=newfile['filename']):
 
             # Assing filetype:
             # File must match filetype_id (e.g. "meteo*.a*"), filedate format (e.g. "meteo%Y%m%d%H.a%M")
             # and must fall within the defined filetype date range.
-
-            # Check id: check if current file matches filetype_id
-            # Needs to be list
-            # Multiple ids can be defined in a list
-            if not isinstance(filetypeconf['filetype_id'], list):
-                filetypeconf['filetype_id'] = filetypeconf['filetype_id'].split()  # Converts to list w/ one element
-
-            # Check if filename matches with one of the search patterns
-            fnmatch_success = False
-            for filetype_id in filetypeconf['filetype_id']:
-                if fnmatch.fnmatch(newfile['filename'], filetype_id):
-                    filetypeconf['filetype_id'] = filetype_id
-                    fnmatch_success = True
-                    break
-
-            # Continue if match was found
-            if fnmatch_success:
-
-                # Check: Level-0 fluxes must be in a subfolder that is named 'Level-0',
-                # otherwise continue with next file. Basically, this allows Level-0
-                # flux data to be uploaded.
-                if filetypeconf['filegroup'] == '20_ec_fluxes' \
-                        and filetypeconf['data_version'] == 'eddypro_level-0' \
-                        and not 'Level-0' in str(newfile['filepath'].parent):
-                    continue
-
-                # If a 'filetype_parser' is given, try to parse datetime from filename
-                # Multiple formats can be defined in a list
-                # If only one format is given, it will be converted to a list with a
-                # single element.
-                if not isinstance(filetypeconf['filetype_dateparser'], list):
-                    filetypeconf['filetype_dateparser'] = [filetypeconf['filetype_dateparser']]
-                    # filetypeconf['filetype_dateparser'] = filetypeconf['filetype_dateparser'].split()
-
-                # Check if file conforms to one of the defined filedate formats
-                # Check if filedate can be parsed with one of the patterns
-                filedate = None
-                for dateparser in filetypeconf['filetype_dateparser']:
-                    if dateparser:
-
-                        if dateparser != 'get_from_filepath':
-                            try:
-                                # Parse the filename for filedate, based on the length of the provided
-                                # dateparser string. Necessary to account for incremental numbers
-                                # at the end of the filename. This way only part of the filename
-                                # is used to check for filedate. Necessary b/c strptime does not
-                                # seem to accept wildcards to ignore e.g. the end of the filename
-                                # during parsing.
-                                #   Example setting where filename is parsed only partly:
-                                #       DAV11-RAW 'Davos10Min-%Y%m%d-'
-                                #       (ideally this could be parsed with 'Davos10Min-%Y%m%d-*.dat',
-                                #       but this is not possible b/c wildcard cannot be used)
-                                #   Example where filename is parsed in full, including file extension:
-                                #       'CH-DAV_iDL_H1_0_1_TBL1_%Y_%m_%d_%H%M.dat'
-                                length = len(dateparser) + 1
-                                filedate = dt.datetime.strptime(newfile['filename'][0:length + 1], dateparser)
+            # The filetype_id was already checked by the matcher.
+
+            # Check: Level-0 fluxes must be in a subfolder that is named 'Level-0',
+            # otherwise continue with next file. Basically, this allows Level-0
+            # flux data to be uploaded.
+            if filetype.filegroup == '20_ec_fluxes' \
+                    and filetype.data_version == 'eddypro_level-0' \
+                    and not 'Level-0' in str(newfile['filepath'].parent):
+                continue
+
+            # Check if file conforms to one of the defined filedate formats
+            # Check if filedate can be parsed with one of the patterns
+            filedate = None
+            for dateparser in filetype.filedateparsers:
+                if dateparser:
+
+                    if dateparser != 'get_from_filepath':
+                        # Parse the filename for filedate, based on the length of the provided
+                        # dateparser string. Necessary to account for incremental numbers
+                        # at the end of the filename. This way only part of the filename
+                        # is used to check for filedate. Necessary b/c strptime does not
+                        # seem to accept wildcards to ignore e.g. the end of the filename
+                        # during parsing.
+                        #   Example setting where filename is parsed only partly:
+                        #       DAV11-RAW 'Davos10Min-%Y%m%d-'
+                        #       (ideally this could be parsed with 'Davos10Min-%Y%m%d-*.dat',
+                        #       but this is not possible b/c wildcard cannot be used)
+                        #   Example where filename is parsed in full, including file extension:
+                        #       'CH-DAV_iDL_H1_0_1_TBL1_%Y_%m_%d_%H%M.dat'
+                        # The dateparser was compiled once, see FilenameDateParser.
+                        filedate = dateparser.parse(filename=newfile['filename'])
+                        if filedate:
+                            break
+
+                    elif dateparser == 'get_from_filepath':
+                        # Check if the filepath gives an indication of the filedate
+                        try:
+                            # Check if the parent folder could be a month 01-12 and if the parent
+                            # folder of the parent folder could be a year 1900-2099
+                            maybe_month = newfile['filepath'].parents[0].name
+                            maybe_year = newfile['filepath'].parents[1].name
+                            year_month = folder_year_month(year_folder=maybe_year, month_folder=maybe_month)
+
+                            if year_month:
+                                filedate = dt.datetime(year_month[0], year_month[1], 1, 0, 0)
                                 break
-                            except ValueError:
-                                continue
-
-                        elif dateparser == 'get_from_filepath':
-                            # Check if the filepath gives an indication of the filedate
-                            try:
-                                # Check if the parent folder could be a month 01-12
-                                maybe_month = newfile['filepath'].parents[0].name
-                                pattern_months = '^(0[1-9]|1[012])$'
-                                result_month = re.match(pattern_months, maybe_month)
-
-                                # Check if the parent folder of the parent folder could be a year 1900-2099
-                                maybe_year = newfile['filepath'].parents[1].name
-                                pattern_years = '^(19[0-9][0-9]|20[0-9][0-9])$'
-                                result_year = re.match(pattern_years, maybe_year)
-
-                                if result_month and result_year:
-                                    filedate = dt.datetime(int(maybe_year), int(maybe_month), 1, 0, 0)
-                                    break
-                            except:
-                                continue
-
-                    elif not dateparser:
-                        # No *dateparser* means that in the filetype settings the setting *filetype_dateparser*
-                        # was set to *false*.
-                        # In case the datetime is not parsed directly from the filename (e.g. for
-                        # EddyPro full output files), the file modification datetime is used instead.
-                        filedate = datetime.datetime.strptime(newfile['filemtime'], '%Y-%m-%d %H:%M:%S')
-
-                # Continue with next filetype if no filedate could be parsed
-                if not filedate:
-                    continue
-
-                # Check date: file must be within defined date range for this filetype
-                if (filedate >= filetypeconf['filetype_valid_from']) \
-                        & (filedate <= filetypeconf['filetype_valid_to']):
-                    # If True, file passed all checks and info is filled into dict
-                    newfile['filedate'] = filedate
-                    newfile['config_filetype'] = filetype
-                    newfile['db_bucket'] = self.db_bucket
-                    newfile['id'] = filetypeconf['filetype_id']
-                    newfile['data_version'] = filetypeconf['data_version']
-                    newfile = self._detect_special_format(newfile=newfile)
-                    return newfile
+                        except:
+                            continue
+
+                elif not dateparser:
+                    # No *dateparser* means that in the filetype settings the setting *filetype_dateparser*
+                    # was set to *false*.
+                    # In case the datetime is not parsed directly from the filename (e.g. for
+                    # EddyPro full output files), the file modification datetime is used instead.
+                    filedate = dt.datetime.strptime(newfile['filemtime'], '%Y-%m-%d %H:%M:%S')
+
+            # Continue with next filetype if no filedate could be parsed
+            if not filedate:
+                continue
+
+            # Check date: file must be within defined date range for this filetype
+            if (filedate >= filetype.valid_from) \
+                    & (filedate <= filetype.valid_to):
+                # If True, file passed all checks and info is filled into dict
+                newfile['filedate'] = filedate
+                newfile['config_filetype'] = filetype.name
+                newfile['db_bucket'] = self.db_bucket
+                newfile['id'] = filetype_id
+                newfile['data_version'] = filetype.data_version
+                newfile = self._detect_special_format(newfile=newfile)
+                return newfile
 
         return newfile
 
@@ -223,86 +227,202 @@ class FileScanner:
         # filedate = '-not-defined-' if filetype == '-not-defined-' else filedate
 
     def run(self):
-        filenum = 0
-        ignored_files = []
-
-        for root, dirs, files in os.walk(str(self.dir_src)):
-            root = Path(root)
+        for _ in self.iter_files():
+            pass
+        self.finalize()
 
-            for filename in files:
+    def iter_files(self):
+        """Walk the source folder and yield each found file as soon as its filetype is known
 
-                ignore = False
+        Each file is also collected in the records, the dataframe with all files
+        is built in finalize() after the walk is complete. This allows callers to
+        start working on the first files while the search for more files is
+        still running.
 
-                # Ignore certain extensions
-                if Path(filename).suffix in self.ignored_extensions:
-                    ignore = True
+        If only the newest files are kept, the newest files are collected in a
+        heap during the walk, based on their modification time. The filetype is
+        then detected only for the newest files, after the walk.
 
-                # Ignore files that contain certain strings
-                for ignored_string in self.ignored_strings:
-                    if fnmatch.fnmatch(filename, ignored_string):
-                        ignore = True
-
-                if ignore:
-                    continue
-
-                filenum += 1
-
-                if self.filelimit:
-                    if filenum > self.filelimit:
-                        break
-
-                self.logger.info(f"{self.class_id} Found file #{filenum}: {filename}")
+        Yields:
+            dict with info about the found file, same keys as the results dataframe
+        """
+        filenum = 0
+        newest = []  # Heap with the newest files, the oldest of them is the first element
 
-                newfile = dict(site=self.site,
-                               filegroup=self.filegroup,
-                               filename=filename,
-                               filepath=root / filename)
+        keep_dir = self._keep_dir if self.datefrom or self.dateto else None
+        for root, filename, statinfo in walk_files(top=self.dir_src, threads=self.scanthreads, keep_dir=keep_dir):
 
-                newfile['filesize'] = newfile['filepath'].stat().st_size
-                newfile['filemtime'] = self._mtime(filepath=newfile['filepath'])
-                # Path(newfile['filepath']).stat().st_mtime
-                # Path(newfile['filepath']).stat().st_ctime
+            if self._ignored(filename=filename):
+                continue
 
-                newfile = self._detect_filetype(newfile=newfile)
+            filenum += 1
 
-                # Some filetypes are not allowed for filescanner
-                if newfile['config_filetype'] == '-ignored-':
-                    logtxt = (
-                        f"(!)Ignoring file {newfile['filepath']} "
-                        f"because this filetype is ignored, see settings in config "
-                        f"can_be_used_by_filescanner: false, which then sets "
-                        f"config_filetype={newfile['config_filetype']}"
-                    )
-                    self.logger.info(logtxt)
-                    # ignored_files.append(filename)
-                    # continue
+            if self.filelimit:
+                if filenum > self.filelimit:
+                    filenum -= 1
+                    break
 
-                # Check if filescanner df was initialized correctly
-                # All keys available for the new file must also be present in the filescanner df
-                available_keys = self.filescanner_df.columns.to_list()
-                required_keys = list(newfile.keys())
-                res = all(ele in available_keys for ele in required_keys)
-                if not res:
-                    raise Warning("Not all required keys were found in filescanner dataframe.")
+            self.logger.info(f"{self.class_id} Found file #{filenum}: {filename}")
+
+            if self.newestfiles > 0:
+                # Files with the same modification time: the file that was found first is kept
+                entry = (statinfo.st_mtime_ns, -filenum, root, filename, statinfo)
+                if len(newest) < self.newestfiles:
+                    heapq.heappush(newest, entry)
+                elif entry > newest[0]:
+                    heapq.heapreplace(newest, entry)
+                continue
+
+            newfile = self._new_file(root=root, filename=filename, statinfo=statinfo)
+            self.records.append(newfile=newfile)
+            yield newfile
+
+        self.found_files = filenum
+
+        # Newest files in the order they were found
+        for _, _, root, filename, statinfo in sorted(newest, key=lambda entry: -entry[1]):
+            newfile = self._new_file(root=root, filename=filename, statinfo=statinfo)
+            self.records.append(newfile=newfile)
+            yield newfile
+
+        if self.manifest:
+            self.manifest.commit()
+
+    def watch(self, settle: float = 5.0, poll_interval: float = 10.0, since_ns: int = None):
+        """Watch the source folder and yield new and changed files as soon as they are complete
+
+        Runs until the generator is closed, e.g. after KeyboardInterrupt. Found
+        files are not collected in the records.
+
+        Args:
+            settle: seconds a file must remain unchanged before it is yielded,
+                files that are still being written are not yielded
+            poll_interval: seconds between searches for changed files if
+                inotify is not available
+            since_ns: only files modified after this time (ns since epoch) are
+                yielded, e.g. the start of the previous scan, so that files written
+                during the scan are not missed. Default is the start of the watch.
+                Files that were already uploaded in their current state (manifest)
+                are not yielded.
+
+        Yields:
+            dict with info about the found file, same keys as the results dataframe
+        """
+        keep_dir = self._keep_dir if self.datefrom or self.dateto else None
+        skip_file = self._uploaded_unchanged if self.manifest else None
+        watcher = FileWatcher(top=self.dir_src, settle=settle, poll_interval=poll_interval,
+                              keep_dir=keep_dir, logger=self.logger, since_ns=since_ns, skip_file=skip_file)
+        self.watcher = watcher
+        self.logger.info(f"{self.class_id} Watching {self.dir_src} for new files ({watcher.mode}) ...")
+        for root, filename, statinfo in watcher.watch():
+            if self._ignored(filename=filename):
+                continue
+            self.logger.info(f"{self.class_id} Found new file: {filename}")
+            try:
+                newfile = self._new_file(root=root, filename=filename, statinfo=statinfo)
+            except Exception as e:
+                # One erroneous file does not stop the watch
+                self.logger.exception(f"{self.class_id} (!)File {filename} is skipped: {e}")
+                continue
+            if self.manifest:
+                self.manifest.commit()
+            yield newfile
+
+    def forget(self, filepath) -> None:
+        """Stop remembering a file that was yielded by watch(), e.g. after it was uploaded"""
+        if self.watcher:
+            self.watcher.forget(path=str(filepath))
+
+    def _uploaded_unchanged(self, path: str, statinfo: os.stat_result) -> bool:
+        return self.manifest.is_uploaded(filepath=Path(path), filesize=statinfo.st_size,
+                                         filemtime_ns=statinfo.st_mtime_ns)
+
+    def _ignored(self, filename: str) -> bool:
+        """Check if file is ignored, based on its extension and on strings in the filename"""
+        ignore = False
+
+        # Ignore certain extensions
+        if Path(filename).suffix in self.ignored_extensions and not self._gzip_filetype(filename=filename):
+            ignore = True
+
+        # Ignore files that contain certain strings
+        for ignored_string in self.ignored_strings:
+            if fnmatch.fnmatch(filename, ignored_string):
+                ignore = True
+
+        return ignore
+
+    def _gzip_filetype(self, filename: str) -> bool:
+        """Check if file is a .gz file that matches the pattern of a filetype with filetype_gzip"""
+        if Path(filename).suffix != '.gz':
+            return False
+        return any(self.conf_filetypes[filetype.name]['filetype_gzip']
+                   for filetype, _ in self.matcher.candidates(filename=filename))
+
+    def _new_file(self, root: str, filename: str, statinfo: os.stat_result) -> dict:
+        """Collect info about found file and detect its filetype"""
+        newfile = dict(site=self.site,
+                       filegroup=self.filegroup,
+                       filename=filename,
+                       filepath=Path(root) / filename)
+
+        # Stat info was collected once per file during the walk
+        newfile['filesize'] = statinfo.st_size
+        newfile['filemtime'] = self._mtime(statinfo=statinfo)
+
+        # Files that did not change since the last run keep their filetype
+        cached = None
+        if self.manifest:
+            cached = self.manifest.lookup(filepath=newfile['filepath'],
+                                          filesize=statinfo.st_size,
+                                          filemtime_ns=statinfo.st_mtime_ns)
+        if cached:
+            newfile.update(cached)
+            if newfile['config_filetype'] != '-not-defined-':
+                newfile['db_bucket'] = self.db_bucket
+        else:
+            newfile = self._detect_filetype(newfile=newfile)
+
+        if self.manifest:
+            self.manifest.update(newfile=newfile, filemtime_ns=statinfo.st_mtime_ns)
+
+        # Files of gzip filetypes: uncompressed size from the gzip trailer, used to skip empty files
+        filetypeconf = self.conf_filetypes.get(newfile['config_filetype'], None)
+        if filetypeconf and filetypeconf['filetype_gzip']:
+            newfile['filesize_uncompressed'] = gzip_uncompressed_size(filepath=newfile['filepath'],
+                                                                      filesize=statinfo.st_size)
+
+        # Fingerprint of file contents, to find identical files with different filenames or paths
+        if self.fingerprinter and newfile['config_filetype'] != '-not-defined-':
+            newfile['fingerprint'] = self.fingerprinter.fingerprint(filepath=newfile['filepath'],
+                                                                    filesize=statinfo.st_size)
+
+        # Some filetypes are not allowed for filescanner
+        if newfile['config_filetype'] == '-ignored-':
+            logtxt = (
+                f"(!)Ignoring file {newfile['filepath']} "
+                f"because this filetype is ignored, see settings in config "
+                f"can_be_used_by_filescanner: false, which then sets "
+                f"config_filetype={newfile['config_filetype']}"
+            )
+            self.logger.info(logtxt)
+            # ignored_files.append(filename)
+            # continue
 
-                for key in newfile.keys():
-                    self.filescanner_df.loc[filenum, key] = newfile[key]
+        return newfile
 
-        self.logger.info(f"{self.class_id} Found {self.filescanner_df.__len__()} files.")
+    def finalize(self):
+        """Build results dataframe from all files that were found by iter_files()"""
 
-        # Filedate needs to be datetime, strings converted to NaT
-        self.filescanner_df['filedate'] = pd.to_datetime(self.filescanner_df['filedate'], errors='coerce',
-                                                         format='%Y-%m-%d %H:%M:%S')
+        # Build dataframe with typed columns once, after all files were found
+        self.filescanner_df = self.records.to_dataframe()
+        self.logger.info(f"{self.class_id} Found {self.found_files} files.")
 
         # Keep newest files
         if self.newestfiles > 0:
             # Changed in v0.9.0: 10 newest files detected by modification time instead of filedate
-            self.filescanner_df \
-                = self.filescanner_df.sort_values(by='filemtime', axis=0, inplace=False, ascending=False)
-            # self.filescanner_df \
-            #     = self.filescanner_df.sort_values(by='filedate', axis=0, inplace=False, ascending=False)
-            self.filescanner_df = self.filescanner_df.head(self.newestfiles)
-            self.logger.info(f"{self.class_id} Keeping {self.newestfiles} newest files, "
+            # Newest files were already selected during the walk, see iter_files()
+            self.logger.info(f"{self.class_id} Keeping {self.filescanner_df.__len__()} newest files, "
                              f"based on file modification time.")
         else:
             self.logger.info(f"{self.class_id} Keeping all {self.filescanner_df.__len__()} files.")
@@ -323,8 +443,29 @@ class FileScanner:
 
         logblocks.log_end(logger=self.logger, class_id=self.class_id)
 
-    def _mtime(self, filepath) -> str:
+    def _keep_dir(self, path: str) -> bool:
+        """Check if year or month folder can contain files within the requested date range
+
+        Year folders (e.g. 2023) and month folders in year folders (e.g. 2023/07)
+        are recognized the same way as for the dateparser 'get_from_filepath'.
+        All other folders are always visited.
+        """
+        folder = os.path.basename(path)
+        parent = os.path.basename(os.path.dirname(path))
+        year_month = folder_year_month(year_folder=parent, month_folder=folder)
+        if year_month:
+            first = (self.datefrom.year, self.datefrom.month) if self.datefrom else year_month
+            last = (self.dateto.year, self.dateto.month) if self.dateto else year_month
+            return first <= year_month <= last
+        if pattern_years.match(folder):
+            year = int(folder)
+            first = self.datefrom.year if self.datefrom else year
+            last = self.dateto.year if self.dateto else year
+            return first <= year <= last
+        return True
+
+    @staticmethod
+    def _mtime(statinfo: os.stat_result) -> str:
         """File modification time"""
-        statinfo = os.stat(filepath)
         file_modified = statinfo.st_mtime
         return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(file_modified))
@@ -0,0 +1,124 @@
+"""
+FILETYPE MATCHER
+"""
+import fnmatch
+import os
+import re
+
+try:
+    # For CLI
+    from .filedateparser import FilenameDateParser
+except:
+    # For BOX
+    from dataflow.filescanner.filedateparser import FilenameDateParser
+
+# Characters that start a wildcard in fnmatch patterns
+_wildcards = re.compile(r'[*?\[\]]')
+
+
+class CompiledFiletype:
+    """Settings of one filetype that are needed to assign files, normalized once"""
+
+    __slots__ = ('name', 'order', 'filetype_ids', 'dateparsers', 'filedateparsers', 'valid_from', 'valid_to',
+                 'filegroup', 'data_version')
+
+    def __init__(self, name: str, order: int, filetypeconf: dict, parsers: dict):
+        self.name = name
+        self.order = order
+
+        # Multiple ids can be defined in a list, a single id is converted to a list w/ one element
+        filetype_ids = filetypeconf['filetype_id']
+        self.filetype_ids = filetype_ids if isinstance(filetype_ids, list) else filetype_ids.split()
+
+        # Multiple dateparsers can be defined in a list, a single one is converted to a list w/ one element
+        dateparsers = filetypeconf['filetype_dateparser']
+        self.dateparsers = dateparsers if isinstance(dateparsers, list) else [dateparsers]
+
+        # Dateparsers that parse the filename are compiled, filetypes with the same dateparser share one parser
+        self.filedateparsers = []
+        for dateparser in self.dateparsers:
+            if dateparser and dateparser != 'get_from_filepath':
+                if dateparser not in parsers:
+                    parsers[dateparser] = FilenameDateParser(dateparser=dateparser)
+                dateparser = parsers[dateparser]
+            self.filedateparsers.append(dateparser)
+
+        self.valid_from = filetypeconf['filetype_valid_from']
+        self.valid_to = filetypeconf['filetype_valid_to']
+        self.filegroup = filetypeconf['filegroup']
+        self.data_version = filetypeconf['data_version']
+
+
+class FiletypeMatcher:
+    """Index of the filename patterns ('filetype_id') of all filetypes
+
+    The settings of all filetypes are compiled once. Each filename pattern is
+    translated to a regular expression and stored in a bucket that is keyed
+    by the literal start of the pattern (e.g. 'meteo' for 'meteo*.a*'). Patterns
+    without literal start are keyed by their literal end instead (e.g. '.dat'
+    for '*.dat'). To find the filetypes that match a filename, only patterns in
+    the buckets that fit the start or the end of the filename are tested.
+
+    Matching follows fnmatch.fnmatch, i.e. is case-insensitive on systems with
+    case-insensitive filenames.
+    """
+
+    def __init__(self, conf_filetypes: dict):
+        self.filetypes = []
+        self._prefix_buckets = {}
+        self._suffix_buckets = {}
+        self._unbucketed = []
+        self._parsers = {}
+
+        for order, filetype in enumerate(conf_filetypes.keys()):
+            compiled = CompiledFiletype(name=filetype, order=order, filetypeconf=conf_filetypes[filetype],
+                                        parsers=self._parsers)
+            self.filetypes.append(compiled)
+            for pattern_ix, filetype_id in enumerate(compiled.filetype_ids):
+                self._add_pattern(order=order, pattern_ix=pattern_ix, pattern=filetype_id)
+
+        self._prefix_lengths = sorted({len(p) for p in self._prefix_buckets})
+        self._suffix_lengths = sorted({len(s) for s in self._suffix_buckets})
+
+    def _add_pattern(self, order: int, pattern_ix: int, pattern: str):
+        pattern = os.path.normcase(pattern)
+        entry = (order, pattern_ix, re.compile(fnmatch.translate(pattern)))
+        parts = _wildcards.split(pattern)
+        prefix, suffix = parts[0], parts[-1]
+        if len(parts) == 1:
+            # No wildcards, the pattern is the complete filename
+            self._prefix_buckets.setdefault(prefix, []).append(entry)
+        elif prefix:
+            self._prefix_buckets.setdefault(prefix, []).append(entry)
+        elif suffix:
+            self._suffix_buckets.setdefault(suffix, []).append(entry)
+        else:
+            self._unbucketed.append(entry)
+
+    def candidates(self, filename: str) -> list:
+        """Filetypes whose patterns match the filename, in the order of the filetype settings
+
+        Returns a list of tuples (CompiledFiletype, matched filetype_id). If several
+        patterns of the same filetype match, the first pattern is returned.
+        """
+        name = os.path.normcase(filename)
+        entries = []
+        for length in self._prefix_lengths:
+            if length > len(name):
+                break
+            entries += self._prefix_buckets.get(name[:length], [])
+        for length in self._suffix_lengths:
+            if length > len(name):
+                break
+            entries += self._suffix_buckets.get(name[len(name) - length:], [])
+        entries += self._unbucketed
+
+        matched = {}
+        for order, pattern_ix, regex in entries:
+            if order in matched and matched[order] < pattern_ix:
+                continue
+            if regex.match(name):
+                matched[order] = pattern_ix
+
+        return [(self.filetypes[order], self.filetypes[order].filetype_ids[matched[order]])
+                for order in sorted(matched)]
@@ -0,0 +1,91 @@
+"""
+FINGERPRINT
+"""
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+
+
+def file_hash(filepath: Path) -> str:
+    """Hash of the complete contents of a file"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class Fingerprinter:
+    """Fingerprints of file contents, to find byte-identical files
+
+    The fingerprint of a file is built from its size and a fast hash of its
+    first and last block. This requires reading only two blocks per file, also
+    for large files. If two files have the same fingerprint, both files are
+    hashed completely to make sure they are identical. Files that are not
+    identical then get a fingerprint that includes their full hash.
+
+    Byte-identical files always get the same fingerprint, files with different
+    contents always get different fingerprints.
+
+    If maxsize is given (e.g. in watch mode, which runs indefinitely), only the
+    maxsize most recently used quick fingerprints and full hashes are kept. Once
+    quick fingerprints were removed, the first file with a quick fingerprint
+    might not be the first file with this fingerprint: its fingerprint then also
+    includes its full hash, so that files with different contents never get the
+    same fingerprint.
+    """
+
+    blocksize = 65536
+
+    def __init__(self, maxsize: int = None):
+        self.maxsize = maxsize
+        self._first = OrderedDict()  # Quick fingerprint -> (path, fingerprint) of first file with quick fingerprint
+        self._full_hashes = OrderedDict()  # Path -> hash of complete file
+        self._removed = False  # True once quick fingerprints were removed
+
+    def fingerprint(self, filepath: Path, filesize: int) -> str or None:
+        """Fingerprint of file, None if the file cannot be read"""
+        try:
+            quick = self._quick(filepath=filepath, filesize=filesize)
+            if filesize <= 2 * self.blocksize:
+                # The complete file was already hashed
+                return quick
+            if quick not in self._first:
+                # Files with this quick fingerprint might have been removed, then the full hash is needed
+                fingerprint = f"{quick}-{self._full(filepath)}" if self._removed else quick
+                self._remember(self._first, key=quick, value=(filepath, fingerprint))
+                return fingerprint
+            first, fingerprint = self._remember(self._first, key=quick, value=None)
+            if first == filepath:
+                return fingerprint
+            # Same size, first and last block: compare complete files
+            if self._full(first) == self._full(filepath):
+                return fingerprint
+            return f"{quick}-{self._full(filepath)}"
+        except OSError:
+            return None
+
+    def _quick(self, filepath: Path, filesize: int) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        with open(filepath, 'rb') as f:
+            h.update(f.read(self.blocksize))
+            if filesize > self.blocksize:
+                f.seek(max(filesize - self.blocksize, self.blocksize))
+                h.update(f.read(self.blocksize))
+        return f"{filesize}-{h.hexdigest()}"
+
+    def _full(self, filepath: Path) -> str:
+        if filepath not in self._full_hashes:
+            return self._remember(self._full_hashes, key=filepath, value=file_hash(filepath))
+        self._full_hashes.move_to_end(filepath)
+        return self._full_hashes[filepath]
+
+    def _remember(self, entries: OrderedDict, key, value):
+        """Value of key, value is stored if key is new, least recently used entries are removed"""
+        value = entries.setdefault(key, value)
+        entries.move_to_end(key)
+        if self.maxsize and len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            if entries is self._first:
+                self._removed = True
+        return value
@@ -0,0 +1,47 @@
+"""
+GZIP INFO
+"""
+import gzip
+import struct
+import zlib
+from pathlib import Path
+
+# Magic number at the start of each gzip file
+_gzip_magic = b'\x1f\x8b'
+
+# Smallest possible gzip file: 10 bytes header, 2 bytes empty deflate block, 8 bytes trailer
+_gzip_min_size = 20
+
+
+def gzip_uncompressed_size(filepath: Path, filesize: int) -> int or None:
+    """Uncompressed size of a gzip file, from the trailer of the file
+
+    The last 4 bytes of a gzip file (ISIZE) contain the uncompressed size
+    modulo 2^32 of the last member of the file. Only the header and the
+    trailer are read, the file is not decompressed.
+
+    ISIZE is not reliable for files with more than one member (e.g. files that
+    were appended to) and for files with an uncompressed size of 4 GiB or more.
+    In both cases ISIZE can be 0 although the file contains data. Files with
+    ISIZE 0 are therefore confirmed by decompressing the first byte, which is
+    cheap for files that are empty.
+
+    Returns:
+        uncompressed size in bytes, None if the file is not a gzip file or the
+        size cannot be determined
+    """
+    if filesize < _gzip_min_size:
+        return None
+    try:
+        with open(filepath, 'rb') as f:
+            if f.read(2) != _gzip_magic:
+                return None
+            f.seek(-4, 2)
+            isize = struct.unpack('<I', f.read(4))[0]
+        if isize > 0:
+            # Not exact for files >= 4 GiB, but never zero for files that contain data
+            return isize
+        with gzip.open(filepath, 'rb') as f:
+            return 0 if not f.read(1) else None
+    except (OSError, EOFError, zlib.error):
+        return None
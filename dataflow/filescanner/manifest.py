@@ -0,0 +1,129 @@
+"""
+SCAN MANIFEST
+"""
+import datetime as dt
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+
+def hash_config(conf) -> str:
+    """Stable hash of a (nested) configuration, e.g. the settings of one filetype"""
+    _json = json.dumps(conf, sort_keys=True, default=str)
+    return hashlib.sha1(_json.encode('utf-8')).hexdigest()
+
+
+class ScanManifest:
+    """Persistent record of scanned and uploaded files
+
+    The manifest is a SQLite database that stores one row per file path,
+    together with the file size and modification time that were seen during
+    the last scan, the assigned filetype and the time of the last successful
+    upload. This allows incremental runs: files that did not change since the
+    last run do not need to be classified again, and files that were already
+    uploaded with the same filetype settings do not need to be read again.
+
+    The cached classification of a file is only used if the file itself
+    (size, mtime) and the complete set of filetype settings are unchanged.
+    The upload status of a file is reset whenever the file or the settings
+    of its assigned filetype change.
+    """
+
+    def __init__(self, filepath: Path, conf_filetypes: dict):
+        self.filepath = Path(filepath)
+        self.conf_filetypes_hash = hash_config(conf_filetypes)
+        self.filetype_hashes = {ft: hash_config(conf) for ft, conf in conf_filetypes.items()}
+
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self.con = sqlite3.connect(str(self.filepath), timeout=60)  # Parallel runs can share a manifest
+        self._init_db()
+
+    def _init_db(self):
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "filepath TEXT PRIMARY KEY, "
+            "filesize INTEGER, "
+            "filemtime_ns INTEGER, "
+            "config_filetype TEXT, "
+            "filedate TEXT, "
+            "filetype_id TEXT, "
+            "data_version TEXT, "
+            "special_format TEXT, "
+            "config_hash TEXT, "
+            "conf_filetypes_hash TEXT, "
+            "last_upload TEXT)"
+        )
+        self.con.commit()
+
+    def lookup(self, filepath: Path, filesize: int, filemtime_ns: int) -> dict or None:
+        """Return the cached filetype detection for an unchanged file, None otherwise"""
+        row = self.con.execute(
+            "SELECT config_filetype, filedate, filetype_id, data_version, special_format "
+            "FROM files WHERE filepath = ? AND filesize = ? AND filemtime_ns = ? "
+            "AND conf_filetypes_hash = ?",
+            (str(filepath), filesize, filemtime_ns, self.conf_filetypes_hash)).fetchone()
+        if not row:
+            return None
+        config_filetype, filedate, filetype_id, data_version, special_format = row
+        detected = dict(config_filetype=config_filetype, id=filetype_id)
+        if config_filetype == '-not-defined-':
+            detected['filedate'] = '-not-defined-'
+            detected['db_bucket'] = '-not-defined-'
+        else:
+            detected['filedate'] = dt.datetime.fromisoformat(filedate)
+            detected['data_version'] = data_version
+            detected['special_format'] = special_format if special_format else False
+        return detected
+
+    def update(self, newfile: dict, filemtime_ns: int) -> None:
+        """Store scan result of a file, the upload status is reset if file or settings changed"""
+        config_filetype = newfile['config_filetype']
+        filedate = newfile['filedate']
+        filedate = filedate.isoformat() if isinstance(filedate, dt.datetime) else str(filedate)
+        special_format = newfile.get('special_format', None)
+        self.con.execute(
+            "INSERT INTO files (filepath, filesize, filemtime_ns, config_filetype, filedate, "
+            "filetype_id, data_version, special_format, config_hash, conf_filetypes_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(filepath) DO UPDATE SET "
+            "last_upload = CASE WHEN files.filesize = excluded.filesize "
+            "AND files.filemtime_ns = excluded.filemtime_ns "
+            "AND files.config_hash = excluded.config_hash "
+            "THEN files.last_upload ELSE NULL END, "
+            "filesize = excluded.filesize, filemtime_ns = excluded.filemtime_ns, "
+            "config_filetype = excluded.config_filetype, filedate = excluded.filedate, "
+            "filetype_id = excluded.filetype_id, data_version = excluded.data_version, "
+            "special_format = excluded.special_format, config_hash = excluded.config_hash, "
+            "conf_filetypes_hash = excluded.conf_filetypes_hash",
+            (str(newfile['filepath']), int(newfile['filesize']), filemtime_ns, config_filetype, filedate,
+             str(newfile['id']), newfile.get('data_version', None),
+             special_format if special_format else None,
+             self.filetype_hashes.get(config_filetype, ''), self.conf_filetypes_hash))
+
+    def is_uploaded(self, filepath: Path, filesize: int = None, filemtime_ns: int = None) -> bool:
+        """Check if file was already uploaded in its current state
+
+        Without filesize and filemtime_ns, the state that was stored during the
+        last scan of the file is the current state.
+        """
+        row = self.con.execute("SELECT last_upload, filesize, filemtime_ns FROM files WHERE filepath = ?",
+                               (str(filepath),)).fetchone()
+        if not row or not row[0]:
+            return False
+        if filesize is not None and filemtime_ns is not None:
+            return row[1] == filesize and row[2] == filemtime_ns
+        return True
+
+    def mark_uploaded(self, filepath: Path) -> None:
+        """Store time of successful upload, committed immediately to survive aborted runs"""
+        now = dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.con.execute("UPDATE files SET last_upload = ? WHERE filepath = ?", (now, str(filepath)))
+        self.con.commit()
+
+    def commit(self) -> None:
+        self.con.commit()
+
+    def close(self) -> None:
+        self.con.commit()
+        self.con.close()
@@ -0,0 +1,73 @@
+import datetime as dt
+import random
+
+import pytest
+
+from dataflow.filescanner.filedateparser import FilenameDateParser
+
+dateparsers = ['meteo%Y%m%d%H.a%M', 'CH-DAV_iDL_H1_0_1_TBL1_%Y_%m_%d_%H%M.dat', 'Davos10Min-%Y%m%d-',
+               'Davos10Min-%Y%j.dat', 'file_%y%m%d%H%M%S', '%Y%m%d', 'ec_%d.%m.%Y_%H-%M', 'log_%Y_%b_%d',
+               'x%m%d', 'a %Y%m%d', '%Y%m%d%%', '%y%m_%Y']
+
+
+def _strptime(dateparser: str, filename: str) -> dt.datetime or None:
+    """Filedate as parsed before"""
+    try:
+        length = len(dateparser) + 1
+        return dt.datetime.strptime(filename[0:length + 1], dateparser)
+    except ValueError:
+        return None
+
+
+def _filenames(dateparser: str, rnd: random.Random) -> list:
+    """Filenames from valid and invalid dates, with digits that do not fit and random changes"""
+    filenames = []
+    for date in [dt.datetime(2024, 2, 29, 23, 59, 58), dt.datetime(2023, 1, 1), dt.datetime(1999, 12, 31, 5, 7, 9),
+                 dt.datetime(2068, 6, 15, 12, 30), dt.datetime(1969, 6, 15, 12, 30)]:
+        filename = date.strftime(dateparser) + '.csv'
+        filenames.append(filename)
+        filenames.append(filename.upper())
+        filenames.append(filename[:-5])
+        for _ in range(30):
+            chars = list(filename)
+            ix = rnd.randrange(len(chars))
+            change = rnd.choice(['digit', 'space', 'remove', 'letter'])
+            if change == 'digit':
+                chars[ix] = str(rnd.randrange(10))
+            elif change == 'space':
+                chars.insert(ix, ' ')
+            elif change == 'remove':
+                del chars[ix]
+            else:
+                chars[ix] = rnd.choice('aZ_-.')
+            filenames.append(''.join(chars))
+    # Invalid values: month 13, day 32, hour 24, February 30, day of year 0 and 367
+    for date in ['20241301', '20240132', '2024013124', '20240230', '2023000', '2024367', '2023366']:
+        filenames.append(dateparser.split('%')[0] + date + '.csv')
+    return filenames
+
+
+@pytest.mark.parametrize('dateparser', dateparsers)
+def test_same_as_strptime(dateparser):
+    parser = FilenameDateParser(dateparser=dateparser)
+    rnd = random.Random(dateparser)
+    for filename in _filenames(dateparser=dateparser, rnd=rnd):
+        assert parser.parse(filename=filename) == _strptime(dateparser=dateparser, filename=filename), filename
+        # Remembered results
+        assert parser.parse(filename=filename) == _strptime(dateparser=dateparser, filename=filename), filename
+
+
+def test_compiled():
+    assert FilenameDateParser(dateparser='meteo%Y%m%d%H.a%M').fixed is not None
+    # Other directives, whitespace and both year directives: parsed with strptime
+    assert FilenameDateParser(dateparser='log_%Y_%b_%d').fixed is None
+    assert FilenameDateParser(dateparser='a %Y%m%d').fixed is None
+    assert FilenameDateParser(dateparser='%y%m_%Y').fixed is None
+
+
+def test_memo_size():
+    parser = FilenameDateParser(dateparser='%Y%m%d')
+    parser.memo_size = 10
+    for day in range(1, 30):
+        assert parser.parse(f"202401{day:02d}.csv") == dt.datetime(2024, 1, day)
+    assert len(parser._memo) <= 10
@@ -0,0 +1,56 @@
+import datetime as dt
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataflow.filescanner.filerecords import FileRecords
+from dataflow.filescanner.filescanner import FileScanner
+
+
+def _newfile(filename: str, filedate, filemtime: str, **kwargs) -> dict:
+    newfile = dict(filename=filename, site='CH-XXX', filegroup='10_meteo', config_filetype='-not-defined-',
+                   filedate=filedate, filepath=Path('/data') / filename, filesize=100, db_bucket='-not-defined-',
+                   filemtime=filemtime)
+    newfile.update(kwargs)
+    return newfile
+
+
+def _baseline_dataframe(newfiles: list) -> pd.DataFrame:
+    """Results dataframe as it was built before, cell by cell"""
+    df = pd.DataFrame(columns=FileRecords.columns)
+    for filenum, newfile in enumerate(newfiles, start=1):
+        for key in newfile.keys():
+            df.loc[filenum, key] = newfile[key]
+    df['filedate'] = pd.to_datetime(df['filedate'], errors='coerce', format='%Y-%m-%d %H:%M:%S')
+    return df
+
+
+def test_mtime_same_text_as_before(tmp_path):
+    filepath = tmp_path / 'data.csv'
+    filepath.write_text('')
+    os.utime(filepath, (1700000000.7, 1700000000.7))
+    statinfo = os.stat(filepath)
+    expected = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(statinfo.st_mtime))
+    assert FileScanner._mtime(statinfo=statinfo) == expected
+
+
+def test_to_dataframe_same_as_before():
+    newfiles = [_newfile('a.csv', dt.datetime(2024, 1, 1, 12, 30), '2024-01-01 00:00:00',
+                         config_filetype='METEO', db_bucket='test', filesize_uncompressed=1000),
+                _newfile('b.csv', '-not-defined-', '2024-01-02 13:45:10', fingerprint='abc')]
+    records = FileRecords()
+    for newfile in newfiles:
+        records.append(newfile=newfile)
+
+    df = records.to_dataframe()
+    baseline = _baseline_dataframe(newfiles=newfiles)
+
+    assert list(df.columns) == list(baseline.columns)
+    assert list(df.index) == [1, 2]
+    assert df.to_csv(index=False) == baseline.to_csv(index=False)
+    assert df['filedate'].dtype == 'datetime64[ns]'
+    assert df['filesize'].dtype == np.int64
+    assert list(df['filemtime']) == ['2024-01-01 00:00:00', '2024-01-02 13:45:10']
@@ -0,0 +1,82 @@
+import datetime as dt
+import os
+
+import pytest
+
+from dataflow.filescanner.conftest import assert_same_results, baseline_scan, make_filescanner
+
+
+@pytest.mark.parametrize('datefrom, dateto, pruned', [
+    # Only folders that are year folders or month folders in year folders are pruned
+    (dt.datetime(2023, 2, 1), None, ['2023/01']),
+    (None, dt.datetime(2023, 12, 31), ['2024']),
+    (dt.datetime(2023, 1, 15), dt.datetime(2023, 1, 20), ['2023/02', '2024']),
+    (dt.datetime(2025, 1, 1), None, ['2023', '2024']),
+    (dt.datetime(2024, 6, 1), dt.datetime(2024, 8, 1), ['2023']),
+])
+def test_date_pruning_same_as_before_without_pruned_folders(tree, conf_filetypes, logger, datefrom, dateto, pruned):
+    filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger,
+                                   datefrom=datefrom, dateto=dateto)
+    filescanner.run()
+    df = filescanner.get_results()
+
+    baseline = baseline_scan(dir_src=tree, conf_filetypes=conf_filetypes)
+    in_pruned = baseline['filepath'].apply(
+        lambda filepath: any(filepath.parent.relative_to(tree).as_posix().startswith(folder) for folder in pruned))
+    baseline = baseline[~in_pruned]
+    baseline.index = range(1, len(baseline) + 1)
+
+    assert_same_results(df=df, baseline=baseline)
+    # Folder 2023/13 is not a month folder, it is visited as long as year 2023 is not pruned
+    assert any(df['filename'] == 'CH-LAE_iDL_H1_0_1_TBL1.dat') == ('2023' not in pruned)
+
+
+def test_iter_files_same_as_run(tree, conf_filetypes, logger):
+    filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger)
+    found = list(filescanner.iter_files())
+    filescanner.finalize()
+    df = filescanner.get_results()
+
+    assert_same_results(df=df, baseline=baseline_scan(dir_src=tree, conf_filetypes=conf_filetypes))
+    # Yielded files are the files in the results
+    assert sorted(newfile['filepath'] for newfile in found) == sorted(df['filepath'])
+    for newfile in found:
+        row = df.loc[df['filepath'] == newfile['filepath']].iloc[0]
+        assert newfile['config_filetype'] == row['config_filetype']
+        assert newfile['filemtime'] == row['filemtime']
+
+
+def test_iter_files_yields_while_walking(tree, conf_filetypes, logger):
+    filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger)
+    files = filescanner.iter_files()
+    first = next(files)
+    assert first['filename'] == 'meteo2022123123.a50'
+
+    # Folders that were not listed yet when the first file was yielded
+    (tree / 'profile' / 'CH-DAV_prof_20240702.csv').write_text('TIMESTAMP,TA\n')
+    found = [first] + list(files)
+    assert found[-1]['filename'] == 'other.csv'
+    assert 'CH-DAV_prof_20240702.csv' in [newfile['filename'] for newfile in found]
+
+
+@pytest.mark.parametrize('newestfiles', [1, 3, 5, 100])
+def test_newestfiles_same_as_before(tree, conf_filetypes, logger, newestfiles):
+    filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger,
+                                   newestfiles=newestfiles)
+    filescanner.run()
+    assert_same_results(df=filescanner.get_results(),
+                        baseline=baseline_scan(dir_src=tree, conf_filetypes=conf_filetypes, newestfiles=newestfiles))
+    assert filescanner.found_files == 17
+
+
+@pytest.mark.parametrize('scanthreads', [0, 4])
+def test_newestfiles_same_mtime(tree, conf_filetypes, logger, scanthreads):
+    # Files with the same modification time: the file that was found first is kept
+    mtime = dt.datetime(2024, 9, 1).timestamp()
+    for filepath in [tree / 'profile' / 'other.csv', tree / 'meteo_notes.a00', tree / '2023' / '01' / 'x.csv']:
+        filepath.write_text('')
+        os.utime(filepath, (mtime, mtime))
+    filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger, newestfiles=2,
+                                   scanthreads=scanthreads)
+    filescanner.run()
+    assert list(filescanner.get_results()['filename']) == ['meteo_notes.a00', 'x.csv']
@@ -0,0 +1,60 @@
+import datetime as dt
+import fnmatch
+import itertools
+
+from dataflow.filescanner.conftest import assert_same_results, baseline_scan, filetypeconf, make_filescanner
+from dataflow.filescanner.filetypematcher import FiletypeMatcher
+
+patterns = ['meteo*.a*', 'meteo*', '*.dat', '*_TBL1_*.dat', 'CH-DAV_prof_*.csv', 'logger?.csv', 'log[0-9]*.txt',
+            '*', 'exact.csv', 'EXACT.CSV', '*.a5?', 'Davos10Min-*']
+
+filenames = ['meteo2023010100.a00', 'meteo.a', 'meteo', 'METEO2023.a00', 'x.dat', 'CH-DAV_TBL1_2023.dat',
+             'CH-DAV_prof_20240701.csv', 'logger1.csv', 'logger12.csv', 'log5.txt', 'logx.txt', 'exact.csv',
+             'EXACT.CSV', 'file.a50', 'file.a500', 'Davos10Min-20240101-1.dat', '', '.dat']
+
+
+def _linear_candidates(conf_filetypes: dict, filename: str) -> list:
+    """Filetypes that match filename, as found before by checking all filetypes"""
+    candidates = []
+    for filetype, conf in conf_filetypes.items():
+        ids = conf['filetype_id'] if isinstance(conf['filetype_id'], list) else conf['filetype_id'].split()
+        for filetype_id in ids:
+            if fnmatch.fnmatch(filename, filetype_id):
+                candidates.append((filetype, filetype_id))
+                break
+    return candidates
+
+
+def test_candidates_same_as_fnmatch():
+    # Single patterns, pairs of patterns in both orders
+    conf_filetypes = {f"FT-{ix}": filetypeconf(filetype_id=pattern, filetype_dateparser=False)
+                      for ix, pattern in enumerate(patterns)}
+    for ix, (first, second) in enumerate(itertools.permutations(patterns, 2)):
+        conf_filetypes[f"FT-PAIR-{ix}"] = filetypeconf(filetype_id=[first, second], filetype_dateparser=False)
+    matcher = FiletypeMatcher(conf_filetypes=conf_filetypes)
+
+    for filename in filenames:
+        found = [(filetype.name, filetype_id) for filetype, filetype_id in matcher.candidates(filename=filename)]
+        assert found == _linear_candidates(conf_filetypes=conf_filetypes, filename=filename), filename
+
+
+def test_compiled_filetype():
+    conf_filetypes = {'METEO': filetypeconf(filetype_id='meteo*.a*', filetype_dateparser='meteo%Y%m%d%H.a%M'),
+                      'OTHER': filetypeconf(filetype_id=['*.dat', '*.csv'],
+                                            filetype_dateparser=['meteo%Y%m%d%H.a%M', 'get_from_filepath', False])}
+    matcher = FiletypeMatcher(conf_filetypes=conf_filetypes)
+    meteo, other = matcher.filetypes
+    assert meteo.filetype_ids == ['meteo*.a*']
+    assert other.filetype_ids == ['*.dat', '*.csv']
+    assert other.dateparsers == ['meteo%Y%m%d%H.a%M', 'get_from_filepath', False]
+    # Filetypes with the same dateparser share the compiled parser
+    assert other.filedateparsers[0] is meteo.filedateparsers[0]
+    assert other.filedateparsers[1:] == ['get_from_filepath', False]
+    assert meteo.filedateparsers[0].parse('meteo2023010100.a10') == dt.datetime(2023, 1, 1, 0, 10)
+
+
+def test_scan_same_as_before(tree, conf_filetypes, logger):
+    filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger)
+    filescanner.run()
+    assert_same_results(df=filescanner.get_results(), baseline=baseline_scan(dir_src=tree,
+                                                                             conf_filetypes=conf_filetypes))
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from dataflow.filescanner.conftest import assert_same_results, baseline_scan, make_filescanner
+from dataflow.filescanner.fingerprint import Fingerprinter, file_hash
+
+blocksize = Fingerprinter.blocksize
+
+
+def _contents(rnd: random.Random) -> list:
+    """Contents of files, with the same size, first and last block but different data in between"""
+    large = rnd.randbytes(3 * blocksize + 100)
+    contents = [b'', b'x', rnd.randbytes(blocksize), rnd.randbytes(2 * blocksize), rnd.randbytes(2 * blocksize + 1),
+                large]
+    for ix in [blocksize, blocksize + 50, 2 * blocksize + 99]:
+        changed = bytearray(large)
+        changed[ix] ^= 0xff
+        contents.append(bytes(changed))
+    return contents
+
+
+@pytest.mark.parametrize('maxsize', [None, 1, 2, 5])
+def test_same_fingerprint_only_for_identical_files(tmp_path, maxsize):
+    rnd = random.Random(maxsize)
+    contents = _contents(rnd=rnd)
+    fingerprinter = Fingerprinter(maxsize=maxsize)
+    found = {}  # Fingerprint -> contents
+    copies = {}  # Contents -> fingerprints
+    for ix in range(200):
+        data = rnd.choice(contents)
+        filepath = tmp_path / f"file_{ix}.csv"
+        filepath.write_bytes(data)
+        fingerprint = fingerprinter.fingerprint(filepath=filepath, filesize=len(data))
+        # Files with different contents never get the same fingerprint, files are not lost with dedup
+        assert found.setdefault(fingerprint, data) == data
+        copies.setdefault(data, set()).add(fingerprint)
+        if maxsize:
+            assert len(fingerprinter._first) <= maxsize
+            assert len(fingerprinter._full_hashes) <= maxsize
+
+    if not maxsize:
+        # Identical files always get the same fingerprint
+        assert all(len(fingerprints) == 1 for fingerprints in copies.values())
+    # Small files are always recognized
+    assert all(len(copies[data]) == 1 for data in copies if len(data) <= 2 * blocksize)
+
+
+def test_removed_first_file(tmp_path):
+    large = random.Random(1).randbytes(3 * blocksize)
+    changed = bytearray(large)
+    changed[blocksize + 1] ^= 0xff
+    first, second, third = tmp_path / 'first.csv', tmp_path / 'second.csv', tmp_path / 'third.csv'
+    first.write_bytes(large)
+    second.write_bytes(bytes(changed))
+    third.write_bytes(bytes(changed))
+    other = tmp_path / 'other.csv'
+    other.write_bytes(large[::-1])
+
+    fingerprinter = Fingerprinter(maxsize=1)
+    fingerprint = fingerprinter.fingerprint(filepath=first, filesize=len(large))
+    fingerprinter.fingerprint(filepath=other, filesize=len(large))
+    assert list(fingerprinter._first) == [fingerprinter._quick(filepath=other, filesize=len(large))]
+
+    # Quick fingerprint of the first file was removed, other contents with the same quick fingerprint
+    assert fingerprinter.fingerprint(filepath=second, filesize=len(changed)) != fingerprint
+    assert fingerprinter.fingerprint(filepath=third, filesize=len(changed)) \
+           == fingerprinter.fingerprint(filepath=second, filesize=len(changed)) \
+           == f"{fingerprint}-{file_hash(second)}"
+
+
+def test_missing_file(tmp_path):
+    assert Fingerprinter().fingerprint(filepath=tmp_path / 'missing.csv', filesize=10) is None
+
+
+def test_scan_same_as_before(tree, conf_filetypes, logger):
+    filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger, fingerprint=True)
+    filescanner.run()
+    df = filescanner.get_results()
+    assert_same_results(df=df, baseline=baseline_scan(dir_src=tree, conf_filetypes=conf_filetypes))
+
+    # Files of the test tree all have different contents, files without filetype have no fingerprint
+    has_filetype = df['config_filetype'] != '-not-defined-'
+    assert df.loc[has_filetype, 'fingerprint'].notna().all()
+    assert df.loc[has_filetype, 'fingerprint'].is_unique
+    assert df.loc[~has_filetype, 'fingerprint'].isna().all()
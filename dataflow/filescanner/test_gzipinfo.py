@@ -0,0 +1,127 @@
+import datetime as dt
+import gzip
+import os
+import zlib
+
+import pandas as pd
+import pytest
+
+from dataflow.filescanner.conftest import assert_same_results, baseline_detect_filetype, baseline_scan, \
+    filetypeconf, make_filescanner, mtime_start
+from dataflow.filescanner.gzipinfo import gzip_uncompressed_size
+
+
+def _decompressed_size(filepath) -> int:
+    """Uncompressed size as found before, by decompressing the whole file"""
+    with gzip.open(filepath, 'rb') as f:
+        return len(f.read())
+
+
+def _size(filepath) -> int or None:
+    return gzip_uncompressed_size(filepath=filepath, filesize=os.path.getsize(filepath))
+
+
+@pytest.mark.parametrize('data', [b'', b'x', b'TIMESTAMP,TA\n2016-03-19 03:45,1.5\n' * 1000, os.urandom(70000)])
+def test_same_as_decompressed(tmp_path, data):
+    filepath = tmp_path / 'file.csv.gz'
+    filepath.write_bytes(gzip.compress(data))
+    assert _size(filepath) == _decompressed_size(filepath) == len(data)
+
+
+def test_multiple_members(tmp_path):
+    # File that was appended to: trailer only contains the size of the last member
+    filepath = tmp_path / 'file.csv.gz'
+    filepath.write_bytes(gzip.compress(b'a' * 10) + gzip.compress(b'b' * 5))
+    assert _decompressed_size(filepath) == 15
+    assert _size(filepath) == 5
+
+    # Last member empty: not reported as empty
+    filepath.write_bytes(gzip.compress(b'a' * 10) + gzip.compress(b''))
+    assert _decompressed_size(filepath) == 10
+    assert _size(filepath) is None
+
+    # All members empty
+    filepath.write_bytes(gzip.compress(b'') + gzip.compress(b''))
+    assert _size(filepath) == _decompressed_size(filepath) == 0
+
+
+def test_isize_zero_with_data(tmp_path):
+    # ISIZE 0 although the file contains data, as for files with a size of a multiple of 4 GiB
+    filepath = tmp_path / 'file.csv.gz'
+    compressed = bytearray(gzip.compress(b'data'))
+    compressed[-4:] = b'\x00\x00\x00\x00'
+    filepath.write_bytes(bytes(compressed))
+    assert _size(filepath) is None
+
+
+def test_not_gzip(tmp_path):
+    filepath = tmp_path / 'file.csv.gz'
+
+    # Not a gzip file
+    filepath.write_bytes(b'TIMESTAMP,TA\n2016-03-19 03:45,1.5\n')
+    assert _size(filepath) is None
+
+    # Too small
+    filepath.write_bytes(gzip.compress(b'')[:19])
+    assert _size(filepath) is None
+    filepath.write_bytes(b'')
+    assert _size(filepath) is None
+
+    # Broken data with ISIZE 0, decompressing fails: not reported as empty
+    compressed = gzip.compress(b'')
+    filepath.write_bytes(compressed[:10] + b'\xff\xff' + compressed[12:])
+    with pytest.raises((OSError, EOFError, zlib.error)):
+        _decompressed_size(filepath)
+    assert _size(filepath) is None
+
+    # Broken file with ISIZE > 0: not empty, errors are reported when the file is read, as before
+    filepath.write_bytes(compressed[:10] + b'\xff' * (len(compressed) - 10))
+    with pytest.raises((OSError, EOFError, zlib.error)):
+        _decompressed_size(filepath)
+    assert _size(filepath) > 0
+
+    # Missing file
+    assert gzip_uncompressed_size(filepath=tmp_path / 'missing.csv.gz', filesize=100) is None
+
+
+def test_scan_gzip_files(tree, conf_filetypes, logger):
+    baseline = baseline_scan(dir_src=tree, conf_filetypes=conf_filetypes)
+    conf_filetypes['METEO-BOX1-GZ'] = filetypeconf(filetype_id='CH-CHA_iDL_BOX1_1min_*.csv.gz',
+                                                   filetype_dateparser='CH-CHA_iDL_BOX1_1min_%Y%m%d-%H%M.csv.gz',
+                                                   filetype_gzip=True)
+    folder = tree / 'box1'
+    folder.mkdir()
+    empty = folder / 'CH-CHA_iDL_BOX1_1min_20160319-0345.csv.gz'
+    empty.write_bytes(gzip.compress(b''))
+    data = b'TIMESTAMP,TA\n2016-03-19 03:50,1.5\n'
+    nonempty = folder / 'CH-CHA_iDL_BOX1_1min_20160319-0350.csv.gz'
+    nonempty.write_bytes(gzip.compress(data))
+    # .gz file of a filetype without filetype_gzip, ignored as before
+    (folder / 'meteo2023010100.a00.gz').write_bytes(gzip.compress(b'TIMESTAMP,TA\n'))
+    for filepath in folder.iterdir():
+        os.utime(filepath, (mtime_start, mtime_start))
+
+    filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger)
+    filescanner.run()
+    df = filescanner.get_results()
+    assert 'meteo2023010100.a00.gz' not in df['filename'].tolist()
+
+    # Other files are the same as before and have no uncompressed filesize
+    others = df.loc[df['config_filetype'] != 'METEO-BOX1-GZ'].copy()
+    others.index = range(1, len(others) + 1)
+    assert_same_results(df=others, baseline=baseline)
+    assert others['filesize_uncompressed'].isna().all()
+
+    # Gzip files have the same filetype as files without .gz, and the size of their contents
+    gz = df.loc[df['config_filetype'] == 'METEO-BOX1-GZ'].set_index('filename')
+    assert gz.loc[empty.name, 'filesize_uncompressed'] == _decompressed_size(empty) == 0
+    assert gz.loc[nonempty.name, 'filesize_uncompressed'] == _decompressed_size(nonempty) == len(data)
+    for filepath in [empty, nonempty]:
+        expected = dict(site='CH-DAV', filegroup='10_meteo', filename=filepath.name, filepath=filepath,
+                        filesize=os.path.getsize(filepath), filemtime=gz.loc[filepath.name, 'filemtime'])
+        expected = baseline_detect_filetype(newfile=expected, conf_filetypes=conf_filetypes, db_bucket='CH-DAV_raw')
+        assert expected['filedate'] == dt.datetime(2016, 3, 19, 3, int(filepath.name[-9:-7]))
+        for key, value in expected.items():
+            if key != 'filename':
+                assert gz.loc[filepath.name, key] == value, key
+    assert gz['filesize_uncompressed'].dtype == pd.Int64Dtype()
@@ -0,0 +1,95 @@
+import datetime as dt
+import os
+from pathlib import Path
+
+from dataflow.filescanner.conftest import assert_same_results, baseline_scan, make_filescanner
+from dataflow.filescanner.manifest import ScanManifest
+
+
+def _newfile(filepath: Path, config_filetype: str = 'METEO-10MIN', filesize: int = 100) -> dict:
+    return dict(filepath=filepath, filesize=filesize, config_filetype=config_filetype,
+                filedate=dt.datetime(2023, 1, 1), id='meteo*.a*', data_version='raw', special_format=False)
+
+
+def test_lookup(tmp_path, conf_filetypes):
+    manifest = ScanManifest(filepath=tmp_path / 'manifest.sqlite', conf_filetypes=conf_filetypes)
+    filepath = Path('/data/meteo2023010100.a00')
+    manifest.update(newfile=_newfile(filepath=filepath), filemtime_ns=1000)
+
+    assert manifest.lookup(filepath=filepath, filesize=100, filemtime_ns=1000) == dict(
+        config_filetype='METEO-10MIN', id='meteo*.a*', filedate=dt.datetime(2023, 1, 1),
+        data_version='raw', special_format=False)
+
+    # Changed file
+    assert manifest.lookup(filepath=filepath, filesize=101, filemtime_ns=1000) is None
+    assert manifest.lookup(filepath=filepath, filesize=100, filemtime_ns=1001) is None
+
+    # Changed settings of any filetype, files might now be assigned to another filetype
+    manifest.close()
+    conf_filetypes['METEO-DOY']['filetype_valid_to'] = dt.datetime(2030, 1, 1)
+    changed = ScanManifest(filepath=tmp_path / 'manifest.sqlite', conf_filetypes=conf_filetypes)
+    assert changed.lookup(filepath=filepath, filesize=100, filemtime_ns=1000) is None
+    changed.close()
+
+
+def test_upload_status_reset(tmp_path, conf_filetypes):
+    manifest = ScanManifest(filepath=tmp_path / 'manifest.sqlite', conf_filetypes=conf_filetypes)
+    filepath = Path('/data/meteo2023010100.a00')
+    manifest.update(newfile=_newfile(filepath=filepath), filemtime_ns=1000)
+    assert not manifest.is_uploaded(filepath=filepath)
+    manifest.mark_uploaded(filepath=filepath)
+    assert manifest.is_uploaded(filepath=filepath)
+    assert manifest.is_uploaded(filepath=filepath, filesize=100, filemtime_ns=1000)
+    assert not manifest.is_uploaded(filepath=filepath, filesize=100, filemtime_ns=1001)
+
+    # Same file and settings of its filetype: still uploaded
+    manifest.update(newfile=_newfile(filepath=filepath), filemtime_ns=1000)
+    assert manifest.is_uploaded(filepath=filepath)
+
+    # Settings of another filetype changed: still uploaded
+    manifest.close()
+    conf_filetypes['METEO-DOY']['filetype_valid_to'] = dt.datetime(2030, 1, 1)
+    manifest = ScanManifest(filepath=tmp_path / 'manifest.sqlite', conf_filetypes=conf_filetypes)
+    manifest.update(newfile=_newfile(filepath=filepath), filemtime_ns=1000)
+    assert manifest.is_uploaded(filepath=filepath)
+
+    # Settings of the filetype of the file changed
+    manifest.close()
+    conf_filetypes['METEO-10MIN']['data_version'] = 'raw2'
+    manifest = ScanManifest(filepath=tmp_path / 'manifest.sqlite', conf_filetypes=conf_filetypes)
+    manifest.update(newfile=_newfile(filepath=filepath), filemtime_ns=1000)
+    assert not manifest.is_uploaded(filepath=filepath)
+
+    # File changed
+    manifest.mark_uploaded(filepath=filepath)
+    manifest.update(newfile=_newfile(filepath=filepath, filesize=200), filemtime_ns=1000)
+    assert not manifest.is_uploaded(filepath=filepath)
+
+    # File was assigned to another filetype
+    manifest.mark_uploaded(filepath=filepath)
+    manifest.update(newfile=_newfile(filepath=filepath, config_filetype='METEO-10MIN-OLD'), filemtime_ns=1000)
+    assert not manifest.is_uploaded(filepath=filepath)
+    manifest.close()
+
+
+def test_scan_with_manifest_same_as_before(tree, tmp_path, conf_filetypes, logger):
+    baseline = baseline_scan(dir_src=tree, conf_filetypes=conf_filetypes)
+    manifest = ScanManifest(filepath=tmp_path / 'manifest.sqlite', conf_filetypes=conf_filetypes)
+
+    # First run classifies all files, the second run uses the manifest
+    for _ in range(2):
+        filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger,
+                                       manifest=manifest)
+        filescanner.run()
+        assert_same_results(df=filescanner.get_results(), baseline=baseline)
+
+    # Changed file is classified again
+    filepath = tree / 'eddypro' / 'Level-0' / 'eddypro_CH-DAV_full_output_2024-07-01.csv'
+    mtime = dt.datetime(2024, 8, 1, 6, 0).timestamp()
+    os.utime(filepath, (mtime, mtime))
+    filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger, manifest=manifest)
+    filescanner.run()
+    df = filescanner.get_results()
+    assert_same_results(df=df, baseline=baseline_scan(dir_src=tree, conf_filetypes=conf_filetypes))
+    assert df.loc[df['filepath'] == filepath, 'filedate'].iloc[0] == dt.datetime(2024, 8, 1, 6, 0)
+    manifest.close()
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from dataflow.filescanner.conftest import assert_same_results, baseline_scan, make_filescanner
+from dataflow.filescanner.walker import scan_dir, walk_files
+
+
+def _os_walk(top) -> list:
+    """Files found with os.walk, as before"""
+    found = []
+    for root, dirs, files in os.walk(str(top)):
+        for filename in files:
+            found.append((root, filename, os.stat(os.path.join(root, filename))))
+    return found
+
+
+@pytest.mark.parametrize('threads', [0, 1, 4])
+def test_same_files_as_os_walk(tree, threads):
+    found = list(walk_files(top=tree, threads=threads))
+    expected = _os_walk(top=tree)
+
+    assert sorted((root, filename) for root, filename, _ in found) \
+           == sorted((root, filename) for root, filename, _ in expected)
+    stats = {(root, filename): statinfo for root, filename, statinfo in expected}
+    for root, filename, statinfo in found:
+        assert statinfo.st_size == stats[(root, filename)].st_size
+        assert statinfo.st_mtime_ns == stats[(root, filename)].st_mtime_ns
+
+
+@pytest.mark.parametrize('threads', [0, 4])
+def test_order(tree, threads):
+    # Depth-first, files of a folder before its subfolders, alphabetically
+    found = [os.path.relpath(os.path.join(root, filename), tree) for root, filename, _ in
+             walk_files(top=tree, threads=threads)]
+    assert found[:5] == ['meteo2022123123.a50', 'meteo2023010100.a00', 'meteo2023010100.a05.txt',
+                         'meteo2023013124.a00', 'meteo_notes.a00']
+    assert found[5:8] == [os.path.join('2023', '01', 'CH-DAV_iDL_H1_0_1_TBL1.dat'),
+                          os.path.join('2023', '01', 'CH-DAV_iDL_H1_0_1_TBL1_2023_01_15_1200.dat'),
+                          os.path.join('2023', '02', 'CH-DAV_iDL_H1_0_1_TBL1_2023_2_15_1200.dat')]
+    assert found == [os.path.relpath(os.path.join(root, filename), tree) for root, filename, _ in
+                     walk_files(top=tree, threads=0)]
+
+
+def test_keep_dir(tree):
+    found = {os.path.relpath(root, tree) for root, _, _ in
+             walk_files(top=tree, keep_dir=lambda path: os.path.basename(path) != '2024')}
+    assert os.path.join('2024', '07') not in found
+    assert '2024' not in found
+    assert os.path.join('2023', '01') in found
+
+
+def test_scan_dir_missing_folder(tmp_path):
+    assert scan_dir(str(tmp_path / 'missing')) == ([], [])
+
+
+@pytest.mark.parametrize('scanthreads', [0, 4])
+def test_scan_same_as_before(tree, conf_filetypes, logger, scanthreads):
+    filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger,
+                                   scanthreads=scanthreads)
+    filescanner.run()
+    assert_same_results(df=filescanner.get_results(), baseline=baseline_scan(dir_src=tree,
+                                                                             conf_filetypes=conf_filetypes))
@@ -0,0 +1,119 @@
+import os
+import time
+
+import pytest
+
+from dataflow.filescanner import watcher as watcher_module
+from dataflow.filescanner.conftest import baseline_detect_filetype, make_filescanner
+from dataflow.filescanner.watcher import FileWatcher, Inotify
+
+
+@pytest.fixture(params=['inotify', 'polling'])
+def mode(request, monkeypatch) -> str:
+    if request.param == 'inotify' and not Inotify.available():
+        pytest.skip('inotify is not available')
+    if request.param == 'polling':
+        monkeypatch.setattr(watcher_module.Inotify, 'available', staticmethod(lambda: False))
+    return request.param
+
+
+def _check(watcher: FileWatcher) -> list:
+    """Look for changed files once, returns the reported filenames"""
+    if watcher.mode == 'inotify':
+        watcher._read_events(timeout=0.05)
+    else:
+        watcher._poll()
+    return [filename for _, filename, _ in watcher._ready()]
+
+
+def _write(filepath, text: str):
+    with open(filepath, 'a') as f:
+        f.write(text)
+
+
+def test_reported_when_settled(tmp_path, mode):
+    old = tmp_path / 'old.csv'
+    _write(old, 'a')
+    os.utime(old, (time.time() - 60, time.time() - 60))
+    watcher = FileWatcher(top=tmp_path, settle=0.3, poll_interval=0.1)
+    assert watcher.mode == mode
+
+    filepath = tmp_path / 'sub' / 'new.csv'
+    filepath.parent.mkdir()
+    if mode == 'inotify':
+        # Events of new folders are only read once the folder is watched
+        _check(watcher)
+    _write(filepath, 'a')
+    assert _check(watcher) == []
+
+    # Still written, not reported
+    time.sleep(0.2)
+    _write(filepath, 'b')
+    assert _check(watcher) == []
+    time.sleep(0.2)
+    assert _check(watcher) == []
+
+    # Files that did not change since settle seconds, files modified before the start are not reported
+    time.sleep(0.4)
+    assert _check(watcher) == ['new.csv']
+    time.sleep(0.4)
+    assert _check(watcher) == []
+
+    # Changed again
+    _write(filepath, 'c')
+    _check(watcher)
+    time.sleep(0.4)
+    assert _check(watcher) == ['new.csv']
+
+
+def test_skip_file_and_forget(tmp_path, monkeypatch):
+    monkeypatch.setattr(watcher_module.Inotify, 'available', staticmethod(lambda: False))
+    uploaded = set()
+    watcher = FileWatcher(top=tmp_path, settle=0, poll_interval=0.1,
+                          skip_file=lambda path, statinfo: path in uploaded)
+    _write(tmp_path / 'a.csv', 'a')
+    _write(tmp_path / 'b.csv', 'b')
+    uploaded.add(str(tmp_path / 'b.csv'))
+    assert _check(watcher) == ['a.csv']
+    assert _check(watcher) == []
+
+    # Forgotten file is reported again, unless it is skipped
+    watcher.forget(path=str(tmp_path / 'a.csv'))
+    assert _check(watcher) == ['a.csv']
+    uploaded.add(str(tmp_path / 'a.csv'))
+    watcher.forget(path=str(tmp_path / 'a.csv'))
+    assert _check(watcher) == []
+
+
+def test_prune(tmp_path, monkeypatch):
+    monkeypatch.setattr(watcher_module.Inotify, 'available', staticmethod(lambda: False))
+    watcher = FileWatcher(top=tmp_path, settle=0, poll_interval=0.1, since_ns=0, max_age=3600)
+    old, new = tmp_path / 'old.csv', tmp_path / 'new.csv'
+    _write(old, 'a')
+    _write(new, 'b')
+    os.utime(old, (time.time() - 7200, time.time() - 7200))
+    assert _check(watcher) == ['new.csv', 'old.csv']
+
+    watcher._prune()
+    assert list(watcher._reported) == [str(new)]
+    # Old file is no longer remembered, but not reported again
+    assert watcher.since_ns > os.stat(old).st_mtime_ns
+    assert _check(watcher) == []
+
+
+def test_filescanner_watch_same_filetype_as_before(tree, conf_filetypes, logger, mode):
+    filescanner = make_filescanner(dir_src=tree, conf_filetypes=conf_filetypes, logger=logger)
+    # The watch starts with the first next(), files written before are found via since_ns
+    files = filescanner.watch(settle=0.2, poll_interval=0.1, since_ns=time.time_ns())
+
+    filepath = tree / '2023' / '02' / 'CH-DAV_iDL_H1_0_1_TBL1_2023_02_20_1200.dat'
+    filepath.write_text('TIMESTAMP,TA\n')
+    (tree / 'profile' / 'image2.png').write_text('')
+    newfile = next(files)
+    files.close()
+
+    expected = dict(site='CH-DAV', filegroup='10_meteo', filename=filepath.name, filepath=filepath,
+                    filesize=newfile['filesize'], filemtime=newfile['filemtime'])
+    expected = baseline_detect_filetype(newfile=expected, conf_filetypes=conf_filetypes, db_bucket='CH-DAV_raw')
+    assert {key: newfile[key] for key in expected} == expected
+    assert newfile['config_filetype'] == 'METEO-TBL1'
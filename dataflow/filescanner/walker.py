@@ -0,0 +1,83 @@
+"""
+WALKER
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def scan_dir(path: str) -> tuple[list, list]:
+    """List subfolders and files in folder, with stat info for each file
+
+    The stat info is requested once per file from the directory entry, on
+    network shares each request is a round-trip to the server. Subfolders
+    and files are sorted by name. Symbolic links to folders are not followed,
+    same as in os.walk.
+
+    Returns:
+        list of subfolder paths, list of (filename, stat info) tuples
+    """
+    dirs = []
+    files = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            dirs.append(entry.path)
+                    else:
+                        files.append((entry.name, entry.stat()))
+                except OSError:
+                    # E.g. broken symbolic links or files removed during the scan
+                    continue
+    except OSError:
+        # Folder cannot be listed, ignored same as in os.walk
+        pass
+    dirs.sort()
+    files.sort(key=lambda f: f[0])
+    return dirs, files
+
+
+def walk_files(top: str, threads: int = 0, keep_dir=None):
+    """Walk folder tree and yield found files, optionally listing folders in parallel
+
+    Folders are visited top-down and depth-first, subfolders and files in
+    alphabetical order, so the order of the yielded files does not depend
+    on the number of threads.
+
+    With threads > 1, subfolders are listed in a thread pool as soon as their
+    parent folder was listed, i.e. while files of previous folders are still
+    being processed by the caller. This hides the latency of network shares.
+
+    Args:
+        top: folder where the walk starts
+        threads: number of threads that list folders concurrently, 0 or 1 lists
+            folders one after the other
+        keep_dir: optional function that gets the path of a subfolder and returns
+            False if the subfolder (and all its subfolders) should not be visited
+
+    Yields:
+        tuples (folder, filename, stat info)
+    """
+    pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+
+    def _submit(path):
+        return pool.submit(scan_dir, path) if pool else path
+
+    def _result(pending):
+        return pending.result() if pool else scan_dir(pending)
+
+    try:
+        stack = [(str(top), _submit(str(top)))]
+        while stack:
+            root, pending = stack.pop()
+            dirs, files = _result(pending)
+            if keep_dir:
+                dirs = [d for d in dirs if keep_dir(d)]
+            # Subfolders are submitted before files of the current folder are yielded
+            stack.extend(reversed([(d, _submit(d)) for d in dirs]))
+            for filename, statinfo in files:
+                yield root, filename, statinfo
+    finally:
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
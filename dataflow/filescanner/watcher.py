@@ -0,0 +1,259 @@
+"""
+WATCHER
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+
+try:
+    # For CLI
+    from .walker import scan_dir, walk_files
+except:
+    # For BOX
+    from dataflow.filescanner.walker import scan_dir, walk_files
+
+# Constants from linux/inotify.h
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+# Header of each inotify event: watch descriptor, mask, cookie, length of name
+_event_header = struct.Struct('iIII')
+
+
+class Inotify:
+    """Minimal inotify interface via ctypes, Linux only"""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            _errno = ctypes.get_errno()
+            raise OSError(_errno, os.strerror(_errno))
+        self.folders = {}  # Watch descriptor -> folder path
+
+    @staticmethod
+    def available() -> bool:
+        if not sys.platform.startswith('linux'):
+            return False
+        libc_name = ctypes.util.find_library('c')
+        try:
+            return hasattr(ctypes.CDLL(libc_name), 'inotify_init1')
+        except OSError:
+            return False
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            _errno = ctypes.get_errno()
+            raise OSError(_errno, os.strerror(_errno), path)
+        self.folders[wd] = path
+        return wd
+
+    def read(self, timeout: float) -> list[tuple[str, str, int]]:
+        """Wait for events, returns list of tuples (folder, name, mask)"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        events = []
+        while True:
+            try:
+                buffer = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, length = _event_header.unpack_from(buffer, offset)
+                offset += _event_header.size
+                name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & IN_IGNORED:
+                    # Folder was removed
+                    self.folders.pop(wd, None)
+                    continue
+                events.append((self.folders.get(wd, ''), name, mask))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Watch folder tree for new and changed files
+
+    Uses inotify on Linux, otherwise (or if inotify cannot watch all folders,
+    e.g. on some network shares or if the limit of watched folders is reached)
+    the folder tree is walked every poll_interval seconds. Only files that were
+    modified after since_ns (default: start of the watch) are reported.
+
+    Files that are still being written are not reported: a file is reported once
+    its size and modification time did not change for settle seconds. A file is
+    reported again if it changes later.
+
+    Reported files are remembered to avoid reporting them again, forget() removes
+    them, e.g. after the file was uploaded. Files for which the optional skip_file
+    callback returns True (e.g. already uploaded in their current state) are not
+    reported.
+
+    Files that were modified more than max_age seconds ago are no longer remembered,
+    so that memory does not grow while the watch is running (also without skip_file).
+    Polling then only reports files modified within the last max_age seconds,
+    inotify still reports all files that are written.
+    """
+
+    mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, top: str, settle: float = 5.0, poll_interval: float = 10.0, keep_dir=None,
+                 logger: logging.Logger = None, since_ns: int = None, skip_file=None, max_age: float = 86400.0):
+        self.top = str(top)
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.keep_dir = keep_dir
+        self.logger = logger
+        self.since_ns = since_ns if since_ns is not None else time.time_ns()
+        self.skip_file = skip_file  # Callable (path, stat info) -> bool
+        self.max_age = max_age
+        self._pending = {}  # Path -> (time of last change, (size, mtime))
+        self._reported = {}  # Path -> (size, mtime) when file was reported
+        self._inotify = None
+        self.mode = 'polling'
+        if Inotify.available():
+            try:
+                self._inotify = Inotify()
+                self._watch_tree(self.top)
+                self.mode = 'inotify'
+            except OSError as e:
+                self._log(f"(!)inotify not possible for {self.top} ({e}), polling every {self.poll_interval}s.")
+                self._close_inotify()
+
+    def _log(self, txt: str):
+        if self.logger:
+            self.logger.info(txt)
+
+    def _close_inotify(self):
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+    def _watch_tree(self, top: str):
+        """Add watches for folder and subfolders, files modified since the start are pending"""
+        stack = [top]
+        while stack:
+            folder = stack.pop()
+            self._inotify.add_watch(folder, self.mask)
+            dirs, files = scan_dir(folder)
+            stack.extend(d for d in dirs if not self.keep_dir or self.keep_dir(d))
+            for filename, statinfo in files:
+                path = os.path.join(folder, filename)
+                if statinfo.st_mtime_ns >= self.since_ns and not self._skipped(path, statinfo):
+                    self._touch(path)
+
+    def _skipped(self, path: str, statinfo: os.stat_result) -> bool:
+        return bool(self.skip_file and self.skip_file(path, statinfo))
+
+    def forget(self, path: str):
+        """Stop remembering reported file, it is reported again if it changes or skip_file is False"""
+        self._reported.pop(path, None)
+
+    def _prune(self):
+        """Forget reported files that were modified more than max_age seconds ago"""
+        threshold = time.time_ns() - int(self.max_age * 1e9)
+        if threshold <= self.since_ns:
+            return
+        # Files modified before the threshold were found by previous polls, they are not reported again
+        self.since_ns = threshold
+        self._reported = {path: key for path, key in self._reported.items() if key[1] >= threshold}
+
+    def _touch(self, path: str, key: tuple = None):
+        """Remember change of file, the settle time starts again when the file is checked next"""
+        self._pending[path] = (time.monotonic(), key)
+
+    def _poll(self):
+        for root, filename, statinfo in walk_files(top=self.top, keep_dir=self.keep_dir):
+            if statinfo.st_mtime_ns < self.since_ns:
+                continue
+            path = os.path.join(root, filename)
+            key = (statinfo.st_size, statinfo.st_mtime_ns)
+            if path in self._pending or self._reported.get(path) == key:
+                continue
+            if path not in self._reported and self._skipped(path, statinfo):
+                continue
+            self._touch(path, key=key)
+
+    def _read_events(self, timeout: float):
+        try:
+            events = self._inotify.read(timeout=timeout)
+            for folder, name, mask in events:
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost, search changed files once
+                    self._poll()
+                    continue
+                path = os.path.join(folder, name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and (not self.keep_dir or self.keep_dir(path)):
+                        self._watch_tree(path)
+                    continue
+                self._touch(path)
+        except OSError as e:
+            # E.g. limit of watched folders reached
+            self._log(f"(!)inotify failed ({e}), polling every {self.poll_interval}s.")
+            self._close_inotify()
+            self.mode = 'polling'
+
+    def _ready(self) -> list[tuple[str, str, os.stat_result]]:
+        """Files that did not change for settle seconds"""
+        ready = []
+        now = time.monotonic()
+        for path, (changed, key) in list(self._pending.items()):
+            try:
+                statinfo = os.stat(path)
+            except OSError:
+                # File was removed or renamed
+                del self._pending[path]
+                continue
+            current = (statinfo.st_size, statinfo.st_mtime_ns)
+            if current != key:
+                # File changed since it was checked last time
+                self._pending[path] = (now, current)
+                continue
+            if now - changed < self.settle:
+                continue
+            del self._pending[path]
+            if self._reported.get(path) == current:
+                continue
+            self._reported[path] = current
+            ready.append((os.path.dirname(path), os.path.basename(path), statinfo))
+        return sorted(ready, key=lambda r: (r[0], r[1]))
+
+    def watch(self):
+        """Yield new and changed files (folder, filename, stat info) until the generator is closed"""
+        try:
+            next_poll = time.monotonic()
+            next_prune = next_poll + min(self.max_age / 10, 600)
+            while True:
+                if self._inotify:
+                    self._read_events(timeout=min(self.settle, 1.0) if self._pending else self.poll_interval)
+                else:
+                    now = time.monotonic()
+                    if now >= next_poll:
+                        self._poll()
+                        next_poll = now + self.poll_interval
+                    time.sleep(min(self.settle, 1.0) if self._pending else max(next_poll - now, 0))
+                yield from self._ready()
+                if time.monotonic() >= next_prune:
+                    self._prune()
+                    next_prune = time.monotonic() + min(self.max_age / 10, 600)
+        finally:
+            self._close_inotify()
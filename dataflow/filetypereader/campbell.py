@@ -0,0 +1,257 @@
+"""
+CAMPBELL
+
+Readers for data files of Campbell Scientific data loggers (e.g. CR1000, CR3000).
+
+TOA5: ASCII table with four header rows
+    1. environment ("TOA5", station name, logger model, serial number, ...)
+    2. variable names
+    3. units
+    4. processing (e.g. "Avg", "Smp")
+    followed by comma-separated data rows, starting with TIMESTAMP and RECORD.
+
+TOB1: binary table with five ASCII header rows
+    1. environment ("TOB1", station name, logger model, ...)
+    2. variable names
+    3. units
+    4. processing
+    5. data types (e.g. "ULONG", "IEEE4", "FP2")
+    followed by binary records of fixed length. The first two fields are
+    SECONDS and NANOSECONDS since 1990-01-01 00:00:00.
+
+Both readers return the data with the timestamp as index (TIMESTAMP) and the
+variable names and units as MultiIndex columns (var, units).
+"""
+import csv
+import gzip
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    # For CLI
+    from . import timestamps
+except:
+    # For BOX
+    from dataflow.filetypereader import timestamps
+
+TOA5 = 'TOA5'
+TOB1 = 'TOB1'
+LOGGER_FORMATS = (TOA5, TOB1)
+
+# Timestamps in TOB1 files are given as seconds since this date
+TOB1_EPOCH_NS = pd.Timestamp('1990-01-01').value
+
+# NumPy dtypes of TOB1 data types, byte order as written by the loggers
+_tob1_dtypes = {
+    'IEEE4': '<f4',
+    'IEEE4L': '<f4',
+    'IEEE4B': '>f4',
+    'IEEE8': '<f8',
+    'IEEE8L': '<f8',
+    'IEEE8B': '>f8',
+    'FP2': '>u2',  # Decoded with _fp2_table
+    'ULONG': '<u4',
+    'LONG': '<i4',
+    'UINT2': '>u2',
+    'INT2': '>i2',
+    'UINT4': '>u4',
+    'INT4': '>i4',
+    'BOOL': 'u1',
+    'BOOL2': '>u2',
+    'BOOL4': '>u4',
+}
+_ascii_type = re.compile(r'^ASCII\((\d+)\)$')
+
+# Units of variables without units
+_no_units = '-not-given-'
+
+
+def _build_fp2_table() -> np.ndarray:
+    """Values of all 65536 FP2 numbers
+
+    FP2 is the two-byte floating point format of Campbell loggers:
+    bit 15 is the sign, bits 14-13 the negative decimal exponent and
+    bits 12-0 the mantissa, e.g. mantissa 1234 with exponent 2 is 12.34.
+    Some values with the largest mantissa are reserved for +INF, -INF and NAN.
+    """
+    raw = np.arange(65536, dtype=np.uint32)
+    sign = np.where(raw & 0x8000, -1.0, 1.0)
+    exponent = (raw >> 13) & 0x3
+    mantissa = raw & 0x1FFF
+    table = sign * mantissa / 10.0 ** exponent
+    table[0x1FFF] = np.inf
+    table[0x9FFF] = -np.inf
+    table[0x9FFE] = np.nan
+    return table
+
+
+_fp2_table = _build_fp2_table()
+
+
+def logger_format(filetypeconf: dict) -> str or None:
+    """Campbell logger format of a filetype, None for other files
+
+    Raises:
+        ValueError: format is not supported
+    """
+    fmt = filetypeconf.get('data_logger_format', None)
+    if not fmt:
+        return None
+    fmt = str(fmt).upper()
+    if fmt not in LOGGER_FORMATS:
+        raise ValueError(f"data_logger_format {fmt} is not supported, "
+                         f"supported formats are {list(LOGGER_FORMATS)}")
+    return fmt
+
+
+def _open(filepath: Path, compression: str or None):
+    return gzip.open(filepath, 'rb') if compression == 'gzip' else open(filepath, 'rb')
+
+
+def _read_header_rows(f, n_rows: int, encoding: str or None) -> list:
+    """Header rows as lists of strings, file position is then at the start of the data"""
+    lines = [f.readline().decode(encoding or 'latin-1') for _ in range(n_rows)]
+    return [next(csv.reader([line])) if line.strip() else [] for line in lines]
+
+
+def _columns(varnames: list, units: list) -> pd.MultiIndex:
+    units = list(units) + [''] * (len(varnames) - len(units))
+    return pd.MultiIndex.from_tuples([(var, unit if unit.strip() else _no_units)
+                                      for var, unit in zip(varnames, units)])
+
+
+def read_toa5(filepath: Path, compression: str = None, encoding: str = None, na_values=None,
+              timestamp_format: str = None, nrows: int = None, chunksize: int = None):
+    """Read TOA5 file, the header is parsed once and used for all data rows
+
+    Data rows are read with the c engine, rows with more values than
+    variables are skipped.
+
+    Args:
+        timestamp_format: format of the TIMESTAMP column, ISO 8601 if not given
+        chunksize: if given, a generator of dataframes with chunksize rows is returned
+
+    Returns:
+        dataframe with timestamp index, empty dataframe for empty files
+    """
+    with _open(filepath=filepath, compression=compression) as f:
+        environment, varnames, units, _ = _read_header_rows(f=f, n_rows=4, encoding=encoding)
+    if not environment or not varnames:
+        return pd.DataFrame() if not chunksize else iter([])
+    if environment[0] != TOA5:
+        raise ValueError(f"File {filepath} is not a TOA5 file, first value is {environment[0]}")
+
+    na_values = ['NAN'] + (list(na_values) if isinstance(na_values, list) else [na_values] if na_values else [])
+    try:
+        data = pd.read_csv(filepath, header=None, skiprows=4, names=list(range(len(varnames))),
+                           na_values=na_values, encoding=encoding, compression=compression, engine='c',
+                           low_memory=False, nrows=nrows, chunksize=chunksize, on_bad_lines='warn',
+                           skip_blank_lines=True)
+    except pd.errors.EmptyDataError:
+        # Header only
+        return pd.DataFrame() if not chunksize else iter([])
+    columns = _columns(varnames=varnames, units=units)
+    timestamp_ix = varnames.index('TIMESTAMP') if 'TIMESTAMP' in varnames else 0
+
+    def to_frame(df: pd.DataFrame) -> pd.DataFrame:
+        df.columns = columns
+        index = timestamps.parse_timestamps(values=df.iloc[:, timestamp_ix],
+                                            timestamp_format=timestamp_format or 'ISO8601')
+        df = df.iloc[:, [ix for ix in range(len(columns)) if ix != timestamp_ix]]
+        df.index = pd.DatetimeIndex(index, name='TIMESTAMP')
+        return df
+
+    if chunksize:
+        return (to_frame(df) for df in data)
+    return to_frame(data)
+
+
+def tob1_dtype(varnames: list, datatypes: list) -> np.dtype:
+    """Structured dtype of a TOB1 record
+
+    Raises:
+        ValueError: data type is not supported
+    """
+    fields = []
+    for varname, datatype in zip(varnames, datatypes):
+        datatype = datatype.strip().upper()
+        ascii_type = _ascii_type.match(datatype)
+        if ascii_type:
+            fields.append((varname, f'S{ascii_type.group(1)}'))
+        elif datatype in _tob1_dtypes:
+            fields.append((varname, _tob1_dtypes[datatype]))
+        else:
+            raise ValueError(f"TOB1 data type {datatype} of variable {varname} is not supported")
+    # Variable names are unique in logger tables, positions are used in case they are not
+    return np.dtype([(f'f{ix}', dtype) for ix, (_, dtype) in enumerate(fields)])
+
+
+def read_tob1(filepath: Path, compression: str = None, encoding: str = None, nrows: int = None,
+              chunksize: int = None):
+    """Read TOB1 file, records are decoded as NumPy structured array without text parsing
+
+    The timestamp is calculated from the fields SECONDS and NANOSECONDS, FP2
+    values are decoded to floats, ASCII fields to strings. An incomplete last
+    record (e.g. if the logger stopped while writing) is ignored.
+
+    Args:
+        chunksize: if given, a generator of dataframes with chunksize rows is returned
+
+    Returns:
+        dataframe with timestamp index, empty dataframe for empty files
+    """
+    if chunksize:
+        return _iter_tob1(filepath=filepath, compression=compression, encoding=encoding,
+                          nrows=nrows, chunksize=chunksize)
+    return next(_iter_tob1(filepath=filepath, compression=compression, encoding=encoding,
+                           nrows=nrows, chunksize=None), pd.DataFrame())
+
+
+def _iter_tob1(filepath: Path, compression: str, encoding: str, nrows: int, chunksize: int or None):
+    with _open(filepath=filepath, compression=compression) as f:
+        environment, varnames, units, _, datatypes = _read_header_rows(f=f, n_rows=5, encoding=encoding)
+        if not environment or not varnames:
+            return
+        if environment[0] != TOB1:
+            raise ValueError(f"File {filepath} is not a TOB1 file, first value is {environment[0]}")
+        if varnames[:2] != ['SECONDS', 'NANOSECONDS']:
+            raise ValueError(f"File {filepath}: TOB1 files without SECONDS and NANOSECONDS "
+                             f"as first fields are not supported")
+        dtype = tob1_dtype(varnames=varnames, datatypes=datatypes)
+        fp2 = [ix for ix, datatype in enumerate(datatypes) if datatype.strip().upper() == 'FP2']
+        columns = _columns(varnames=varnames[2:], units=units[2:])
+
+        n_left = nrows if nrows else None
+        while n_left is None or n_left > 0:
+            n_records = chunksize if chunksize else -1
+            if n_left is not None:
+                n_records = min(n_records, n_left) if chunksize else n_left
+            buffer = f.read(n_records * dtype.itemsize if n_records > 0 else -1)
+            records = np.frombuffer(buffer, dtype=dtype, count=len(buffer) // dtype.itemsize)
+            if not len(records):
+                return
+            yield _tob1_frame(records=records, columns=columns, fp2=fp2)
+            if not chunksize:
+                return
+            n_left = n_left - len(records) if n_left is not None else None
+
+
+def _tob1_frame(records: np.ndarray, columns: pd.MultiIndex, fp2: list) -> pd.DataFrame:
+    """Dataframe from TOB1 records, timestamp from the first two fields"""
+    ns = (records['f0'].astype('int64') * 10 ** 9 + records['f1'].astype('int64')) + TOB1_EPOCH_NS
+    data = {}
+    for ix in range(2, len(records.dtype.names)):
+        values = records[f'f{ix}']
+        if ix in fp2:
+            values = _fp2_table[values]
+        elif values.dtype.kind == 'S':
+            values = np.char.rstrip(values, b'\x00').astype(str).astype(object)
+        else:
+            values = values.astype(values.dtype.newbyteorder('='))
+        data[ix - 2] = values
+    df = pd.DataFrame(data, index=timestamps.to_datetime_index(ns))
+    df.columns = columns
+    return df
@@ -0,0 +1,208 @@
+"""
+FILE CACHE
+"""
+import importlib.util
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    # For CLI
+    from ..filescanner.fingerprint import file_hash
+    from ..filescanner.manifest import hash_config
+except:
+    # For BOX
+    from dataflow.filescanner.fingerprint import file_hash
+    from dataflow.filescanner.manifest import hash_config
+
+# Parquet needs pyarrow, otherwise data are stored as .npz (numpy arrays)
+pyarrow_available = importlib.util.find_spec('pyarrow') is not None
+
+# Increase if the formatted data change, e.g. after changes in FileTypeReader
+CACHE_VERSION = 2
+
+# When the cache is larger than maxsize, entries are removed until it is smaller than
+# this fraction of maxsize, so that the cache folder is not scanned again for each new entry
+_evict_to = 0.9
+
+# Settings of data_vars that are applied after the data were formatted, changing
+# them does not require reading the file again
+_settings_applied_later = ('measurement', 'field', 'units', 'gain', 'offset', 'ignore_after', 'ignore_between',
+                           'parse_pos_indices')
+
+
+def reader_config(filetypeconf: dict, **options) -> dict:
+    """Parts of filetype settings (and run options) that change how a file is read and formatted"""
+    conf = {key: val for key, val in filetypeconf.items() if not key.startswith('data_vars')}
+    for key in filetypeconf:
+        if key.startswith('data_vars') and filetypeconf[key]:
+            # data_vars, data_vars2, ... (-ALTERNATING-)
+            # Order of variables is used as column names for files without header
+            conf[key] = [(var, {k: v for k, v in settings.items() if k not in _settings_applied_later})
+                         for var, settings in filetypeconf[key].items()]
+    conf['_options'] = options
+    conf['_version'] = [CACHE_VERSION, pd.__version__]
+    return conf
+
+
+class ParsedFileCache:
+    """Cache of formatted data of files, stored on disk
+
+    Reading and formatting a data file is skipped if the same file contents
+    were already read with the same reader settings. Entries are identified
+    by a hash of the complete file contents and a hash of the settings that
+    are relevant for reading the file (see reader_config). Settings that are
+    applied after formatting (e.g. gain, units) can change without making
+    the cached data invalid.
+
+    Each entry consists of a JSON file with column names, attrs of the
+    dataframes and other info, and one data file per dataframe (Parquet if
+    pyarrow is installed, otherwise .npz). If the cache grows larger than
+    maxsize bytes, the entries that were used least recently are removed (down
+    to 90% of maxsize). The size of the cache is determined once and then
+    updated with each stored entry, the cache folder is only scanned again
+    when the size exceeds maxsize.
+
+    Only dataframes with a timestamp index and numeric columns are cached.
+    """
+
+    def __init__(self, cachedir: Path, maxsize: int):
+        self.cachedir = Path(cachedir)
+        self.maxsize = maxsize
+        self.cachedir.mkdir(parents=True, exist_ok=True)
+        self.suffix = '.parquet' if pyarrow_available else '.npz'
+        self.size = self._scan()[1]  # Size of all cached files in bytes
+
+    def key(self, filepath: Path, filetypeconf: dict, **options) -> str:
+        """Key of the cache entry for a file, reads the complete file"""
+        return f"{file_hash(filepath)}-{hash_config(reader_config(filetypeconf, **options))}"
+
+    def load(self, key: str) -> dict or None:
+        """Cached data and info of a file, None if the file is not in the cache
+
+        Returns:
+            dict with 'dfs' (list of dataframes) and other info that was stored
+        """
+        metafile = self.cachedir / f"{key}.json"
+        try:
+            with open(metafile, 'r') as f:
+                meta = json.load(f)
+            dfs = [self._read_df(filepath=self.cachedir / datafile, columns=columns)
+                   for datafile, columns in zip(meta['datafiles'], meta['columns'])]
+            for df, attrs in zip(dfs, meta['attrs']):
+                df.attrs.update(attrs)
+            os.utime(metafile)  # Last use, for removing old entries
+        except (OSError, ValueError, KeyError):
+            return None
+        return dict(meta['info'], dfs=dfs)
+
+    def store(self, key: str, dfs: list, **info) -> bool:
+        """Store formatted dataframes of a file, with additional info (must be JSON serializable)
+
+        Returns:
+            True if the data were stored
+        """
+        if not all(self._cacheable(df) for df in dfs):
+            return False
+        datafiles = [f"{key}-{df_ix}{self.suffix}" for df_ix in range(len(dfs))]
+        meta = dict(datafiles=datafiles, columns=[[list(col) for col in df.columns] for df in dfs],
+                    attrs=[df.attrs for df in dfs], info=info)
+        try:
+            for datafile, df in zip(datafiles, dfs):
+                self._write_df(filepath=self.cachedir / datafile, df=df)
+            # Entry is complete when its JSON file exists
+            self._replace(filepath=self.cachedir / f"{key}.json",
+                          write=lambda f: f.write_text(json.dumps(meta, default=str)))
+        except (OSError, ValueError, TypeError):
+            return False
+        for filename in datafiles + [f"{key}.json"]:
+            try:
+                self.size += (self.cachedir / filename).stat().st_size
+            except OSError:
+                pass
+        if self.size > self.maxsize:
+            self._evict()
+        return True
+
+    @staticmethod
+    def _cacheable(df: pd.DataFrame) -> bool:
+        return isinstance(df.index, pd.DatetimeIndex) \
+            and df.index.tz is None \
+            and isinstance(df.columns, pd.MultiIndex) \
+            and df.columns.nlevels == 2 \
+            and all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes)
+
+    @staticmethod
+    def _replace(filepath: Path, write) -> None:
+        """Write to temporary file first, so other runs never see incomplete files"""
+        tmpfile = filepath.with_name(f"{filepath.name}.{os.getpid()}.tmp")
+        try:
+            write(tmpfile)
+            os.replace(tmpfile, filepath)
+        finally:
+            if tmpfile.exists():
+                tmpfile.unlink()
+
+    def _write_df(self, filepath: Path, df: pd.DataFrame) -> None:
+        if self.suffix == '.parquet':
+            flat_df = df.copy()
+            flat_df.columns = [str(ix) for ix in range(len(df.columns))]
+            flat_df.index.name = 'TIMESTAMP'
+            self._replace(filepath=filepath, write=lambda f: flat_df.to_parquet(f, engine='pyarrow'))
+        else:
+            arrays = {f"c{ix}": df.iloc[:, ix].to_numpy() for ix in range(len(df.columns))}
+            arrays['index'] = df.index.to_numpy().view('int64')
+
+            def write(f: Path):
+                with open(f, 'wb') as fh:
+                    np.savez(fh, **arrays)
+
+            self._replace(filepath=filepath, write=write)
+
+    def _read_df(self, filepath: Path, columns: list) -> pd.DataFrame:
+        columns = pd.MultiIndex.from_tuples([tuple(col) for col in columns])
+        if filepath.suffix == '.parquet':
+            df = pd.read_parquet(filepath, engine='pyarrow')
+            df.columns = columns
+        else:
+            with np.load(filepath, allow_pickle=False) as arrays:
+                index = pd.DatetimeIndex(arrays['index'].view('datetime64[ns]'), name='TIMESTAMP')
+                df = pd.DataFrame({ix: arrays[f"c{ix}"] for ix in range(len(columns))}, index=index)
+            df.columns = columns
+        return df
+
+    def _scan(self) -> tuple[dict, int]:
+        """Size and time of last use of each entry, and total size of the cache"""
+        entries = {}
+        total = 0
+        for entry in os.scandir(self.cachedir):
+            if not entry.is_file() or entry.name.endswith('.tmp'):
+                continue
+            key = entry.name.split('.')[0].rsplit('-', 1)[0] if not entry.name.endswith('.json') \
+                else entry.name[:-len('.json')]
+            size, last_use = entries.get(key, (0, 0))
+            statinfo = entry.stat()
+            last_use = statinfo.st_mtime if entry.name.endswith('.json') else last_use
+            entries[key] = (size + statinfo.st_size, last_use)
+            total += statinfo.st_size
+        return entries, total
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache is smaller than 90% of maxsize"""
+        entries, total = self._scan()
+        self.size = total
+        if total <= self.maxsize:
+            return
+        for key, (size, _) in sorted(entries.items(), key=lambda e: e[1][1]):
+            for filepath in self.cachedir.glob(f"{key}[.-]*"):
+                try:
+                    filepath.unlink()
+                except OSError:
+                    pass
+            total -= size
+            if total <= self.maxsize * _evict_to:
+                break
+        self.size = total
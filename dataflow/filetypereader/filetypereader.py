@@ -1,22 +1,44 @@
 import _csv
+import importlib.util
+import itertools
+import re
+import warnings
 from logging import Logger
 
 import pandas as pd
 
+try:
+    # For CLI
+    from . import campbell, gzippipe, timestamps
+except:
+    # For BOX
+    from dataflow.filetypereader import campbell, gzippipe, timestamps
+
 pd.set_option('display.width', 1000)
 pd.set_option('display.max_columns', 15)
 pd.set_option('display.max_rows', 30)
 
+# pyarrow is optional, if installed it is tried first to read files
+pyarrow_available = importlib.util.find_spec('pyarrow') is not None
+
 
 class FileTypeReader:
     """Read file and its variables according to a specified filetype"""
 
+    # Fast engine (pyarrow or c) that read the last file of each filetype, shared by all
+    # readers, later files of the same filetype start with this engine. Files that need
+    # the python engine do not change it, later files always try the fast engines first.
+    engines = {}
+
     def __init__(self,
                  filepath: str,
                  filetype: str,
                  filetypeconf: dict,
                  nrows=None,
-                 logger: Logger = None):
+                 logger: Logger = None,
+                 greenlitonly: bool = False,
+                 chunksize: int = None,
+                 mmap: bool = False):
         """
 
         :param filepath:
@@ -24,11 +46,20 @@ class FileTypeReader:
         :param filetypeconf:
         :param nrows:
         :param logger:
+        :param greenlitonly: if True, only columns that are needed for the upload are read
+        :param chunksize: if given, the file is not read at once, data are read in chunks
+            of this number of rows with iter_data()
+        :param mmap: if True, uncompressed files are memory-mapped and gzip files
+            are decompressed in a separate thread while the data are parsed
 
         """
         self.filepath = filepath
         self.filetype = filetype
         self.logger = logger
+        self.greenlitonly = greenlitonly
+        self.chunksize = chunksize
+        self.mmap = mmap
+        self.skipped_columns = []  # Columns that were not read, only used if greenlitonly
 
         self.data_df = pd.DataFrame()
         self.df_list = pd.DataFrame()
@@ -57,23 +88,33 @@ class FileTypeReader:
         self.build_timestamp = filetypeconf['data_build_timestamp']
         self.data_encoding = filetypeconf['data_encoding']
 
+        # Campbell logger files (TOA5, TOB1) are read with their own readers,
+        # header rows, delimiter and timestamp column are then given by the format
+        self.logger_format = campbell.logger_format(filetypeconf=filetypeconf)
+
         self.filetypeconf = filetypeconf
 
         self.data_df = None
 
-        self._read()
+        if not self.chunksize:
+            self._read()
 
     def _read(self):
+        if self.logger_format:
+            # Timestamp is created by the reader
+            self.data_df = self._readfile_logger()
+            return
+
         self.data_df = self._readfile()
 
         if self.data_df.empty:
             return
 
-        self.data_df = self._add_timestamp()
+        self.data_df = self._add_timestamp(df=self.data_df)
 
-    def _add_timestamp(self) -> pd.DataFrame:
+    def _add_timestamp(self, df: pd.DataFrame) -> pd.DataFrame:
 
-        df = self.data_df.copy()
+        df = df.copy()
 
         timestamp_col = None
         # Name of timestamp column from provided name
@@ -85,12 +126,13 @@ class FileTypeReader:
 
         # Timestamp from single column
         if timestamp_col:
-            df[timestamp_col] = pd.to_datetime(df[timestamp_col], format=self.timestamp_format, errors='coerce')
+            df[timestamp_col] = timestamps.parse_timestamps(values=df[timestamp_col],
+                                                            timestamp_format=self.timestamp_format)
             df = df.set_index(timestamp_col, inplace=False)
 
         # Timestamp from multiple columns
         elif self.build_timestamp:
-            df = self._build_timestamp(df=self.data_df.copy())
+            df = self._build_timestamp(df=df)
 
         df.index.name = 'TIMESTAMP'
         return df
@@ -98,8 +140,27 @@ class FileTypeReader:
     def get_data(self):
         return self.data_df
 
-    def _readfile(self):
-        """Read data file, timestamp is created later."""
+    def iter_data(self):
+        """Yield data with timestamp, in chunks of chunksize rows if chunksize is given
+
+        Without chunksize the data of the complete file are yielded at once.
+        """
+        if not self.chunksize:
+            yield self.data_df
+            return
+        if self.logger_format:
+            yield from (df for df in self._readfile_logger() if not df.empty)
+            return
+        for df in self._readfile_chunks():
+            if not df.empty:
+                yield self._add_timestamp(df=df)
+
+    def get_skipped_columns(self) -> list:
+        """Columns (variable, units) that were not read because they are not defined in data_vars"""
+        return self.skipped_columns
+
+    def _readfile_args(self) -> dict:
+        """Arguments for .read_csv"""
         args = dict(filepath_or_buffer=self.filepath,
                     skiprows=self.skiprows,
                     header=self.header,
@@ -121,10 +182,356 @@ class FileTypeReader:
                     # mangle_dupe_cols=self.mangle_dupe_cols,  # deprecated in pandas
                     )
 
-        # Try to read with args
+        # Uncompressed files are parsed directly from the page cache, without copying them to a buffer first
+        if self.mmap and not self.compression:
+            args['memory_map'] = True
+
+        # Read only columns that are needed
+        if self.greenlitonly:
+            args['usecols'] = self._greenlit_usecols(args=args)
+        return args
+
+    def _readfile(self):
+        """Read data file, timestamp is created later."""
+        args = self._readfile_args()
+
+        # Try fast engines first, the python engine is only used if they fail
+        for engine in self._fast_engines():
+            df = self._readfile_fast(args=args, engine=engine)
+            if df is not None:
+                FileTypeReader.engines[self.filetype] = engine
+                return df
+        return self._readfile_python(args=args)
+
+    def _readfile_chunks(self):
+        """Read data file in chunks of rows, timestamp is created later
+
+        Data that were already yielded cannot be read again with another engine. The
+        first chunk read with the c engine is therefore checked the same way as results
+        of _readfile_fast, the file is read with the python engine if the check fails.
+        pyarrow does not read files in chunks and is not used here.
+        """
+        args = self._readfile_args()
+        args['chunksize'] = self.chunksize
+
+        chunks = None
+        if 'c' in self._fast_engines():
+            chunks = self._readfile_chunks_fast(args=args)
+        if chunks is None:
+            chunks = self._readfile_chunks_python(args=args)
+        yield from chunks
+
+    def _readfile_chunks_fast(self, args: dict):
+        """Read data file in chunks with the c engine, None if the result might differ from the python engine"""
+        args = dict(args, engine='c', low_memory=False)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            try:
+                reader = self._read_csv(args=args)
+                chunks = iter(reader)
+                first = next(chunks, None)
+            except pd.errors.EmptyDataError:
+                # Completely empty file, see _readfile_python
+                return iter([])
+            except Exception:
+                # Erroneous rows, the python engine decides how to handle the file
+                return None
+
+        if first is None:
+            return iter([])
+        if not self._fast_result_ok(df=first, caught=caught):
+            reader.close()
+            return None
+
+        for w in caught:
+            warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+        return itertools.chain([first], chunks)
+
+    def _readfile_chunks_python(self, args: dict):
+        """Read data file in chunks with the python engine, errors are handled as in _readfile_python"""
+        args = dict(args)
+        try:
+            chunks = iter(self._read_csv(args=args))
+            first = next(chunks, None)
+        except pd.errors.EmptyDataError:
+            # Completely empty file, see _readfile_python
+            return iter([])
+        except ValueError:
+            # Erroneous second row, see _readfile_python
+            args['skiprows'] = [0, 1]
+            chunks = iter(self._read_csv(args=args))
+            first = next(chunks, None)
+        except _csv.Error:
+            # NUL bytes, see _readfile_python
+            args['engine'] = 'c'
+            chunks = iter(self._read_csv(args=args))
+            first = next(chunks, None)
+
+        if first is None:
+            return iter([])
+        return itertools.chain([first], chunks)
+
+    def _readfile_logger(self):
+        """Read Campbell logger file (TOA5 or TOB1) with timestamp, in chunks if chunksize is given
+
+        All columns are read, greenlitonly is not used for these files.
+        """
+        if self.logger_format == campbell.TOB1:
+            return campbell.read_tob1(filepath=self.filepath,
+                                      compression=self.compression,
+                                      encoding=self.data_encoding,
+                                      nrows=self.nrows,
+                                      chunksize=self.chunksize)
+        # Quotes around timestamps are removed when reading TOA5 files
+        timestamp_format = self.timestamp_format.strip('"') if self.timestamp_format else None
+        return campbell.read_toa5(filepath=self.filepath,
+                                  compression=self.compression,
+                                  encoding=self.data_encoding,
+                                  na_values=self.na_values,
+                                  timestamp_format=timestamp_format,
+                                  nrows=self.nrows,
+                                  chunksize=self.chunksize)
+
+    def _greenlit_usecols(self, args: dict) -> list or None:
+        """Positions of columns that are needed for the upload, based on the header of the file
+
+        Needed are the variables in data_vars, variables used by rawfuncs and the
+        timestamp columns (data_timestamp_column or the columns in data_build_timestamp).
+        Columns before the timestamp column are all kept if it is given as position.
+        data_remove_bad_rows gives the position of the column that identifies bad data
+        rows after the timestamp columns were removed, all columns up to this position
+        plus the number of timestamp columns are kept.
+        The names of all other columns are stored, they are reported as not greenlit.
+
+        Not used for special formats and files without header, where all columns are
+        needed or named after data_vars anyway.
+
+        Returns:
+            list of column positions, None if all columns are read
+        """
+        if self.filetypeconf['data_special_format'] or not self.header:
+            return None
+
+        try:
+            columns = self._pd_read_csv(args=dict(args, nrows=0)).columns
+        except (ValueError, pd.errors.EmptyDataError, _csv.Error):
+            # Problems with the file are handled when all data are read
+            return None
+        varnames = columns.get_level_values(0) if isinstance(columns, pd.MultiIndex) else columns
+
+        data_vars = self.filetypeconf['data_vars']
+        needed = set(data_vars.keys())
+        for settings in data_vars.values():
+            if 'rawfunc' in settings:
+                needed.update(v for v in settings['rawfunc'] if isinstance(v, str))
+
+        # Timestamp columns, columns that are removed from the data when the timestamp is created
+        timestamp_cols = []
+        if isinstance(self.timestamp_col, str):
+            timestamp_cols = [self.timestamp_col]
+        elif isinstance(self.timestamp_col, int):
+            timestamp_cols = [varnames[self.timestamp_col]]
+        elif self.build_timestamp:
+            # Column names without position, e.g. YEAR0 is column YEAR
+            timestamp_cols = [re.sub(r'\d+$', '', col) for col in self.build_timestamp.split('+')]
+        needed.update(timestamp_cols)
+
+        usecols = {ix for ix, varname in enumerate(varnames) if varname in needed}
+        if isinstance(self.timestamp_col, int):
+            # Timestamp column is given as position
+            usecols.update(range(0, self.timestamp_col + 1))
+        if self.filetypeconf['data_remove_bad_rows']:
+            # Position of the column in the file, before the timestamp columns were removed
+            badrows_col = self.filetypeconf['data_remove_bad_rows'][0] + len(timestamp_cols)
+            usecols.update(range(0, min(badrows_col + 1, len(columns))))
+
+        if len(usecols) == len(columns):
+            return None
+
+        for ix, col in enumerate(columns):
+            if ix not in usecols:
+                varname, units = col if isinstance(col, tuple) else (col, '-not-given-')
+                if 'Unnamed' in str(varname):
+                    continue
+                units = '-not-given-' if 'Unnamed' in str(units) else units
+                self.skipped_columns.append((varname, units))
+        return sorted(usecols)
+
+    def _fast_engines(self) -> list:
+        """Engines that are tried before the python engine, starting with the fast engine that worked last time"""
+        engines = []
+        if pyarrow_available and isinstance(self.delimiter, str) and len(self.delimiter) == 1:
+            engines.append('pyarrow')
+        if isinstance(self.delimiter, str) and (len(self.delimiter) == 1 or self.delimiter == r'\s+'):
+            engines.append('c')
+        last_engine = self.engines.get(self.filetype, None)
+        if last_engine in engines:
+            engines = engines[engines.index(last_engine):]
+        return engines
+
+    def _readfile_fast(self, args: dict, engine: str) -> pd.DataFrame or None:
+        """Read data file with a fast engine, None if the result might differ from the python engine"""
+        args = dict(args, engine=engine)
+        if engine == 'c':
+            # Infer dtypes from complete columns, same as the python engine
+            args['low_memory'] = False
+        elif engine == 'pyarrow':
+            # Not supported, pyarrow reads the file with its own buffers
+            args.pop('memory_map', None)
+            if isinstance(args['header'], list) and len(args['header']) == 1:
+                # pyarrow needs the header row as number, same result as a list with one row
+                args['header'] = args['header'][0]
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            try:
+                df = self._read_csv(args=args)
+            except pd.errors.EmptyDataError:
+                # Completely empty file, see _readfile_python
+                return pd.DataFrame()
+            except Exception:
+                # Not possible with this engine (e.g. option not supported by pyarrow,
+                # erroneous rows), the python engine decides how to handle the file
+                return None
+
+        if not self._fast_result_ok(df=df, caught=caught):
+            return None
+
+        for w in caught:
+            warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+        return df
+
+    def _fast_result_ok(self, df: pd.DataFrame, caught: list) -> bool:
+        """Check data read with a fast engine, False if the result might differ from the python engine"""
+        # Bad lines are handled differently by different engines
+        if any(issubclass(w.category, pd.errors.ParserWarning) for w in caught):
+            return False
+
+        # Check result against filetype settings
+        header_rows = len(self.header) if isinstance(self.header, list) else 1
+        if df.columns.nlevels != header_rows:
+            return False
+        if self.names and len(df.columns) != len(self.names):
+            return False
+        if not isinstance(df.index, pd.RangeIndex):
+            # First column was used as index because rows have more values than column names
+            return False
+        return True
+
+    def _read_csv(self, args: dict) -> pd.DataFrame:
+        header = args['header']
+        usecols = args.get('usecols', None)
+        if usecols and args['engine'] == 'python':
+            return self._read_python_usecols(args=args)
+        if (usecols and args['engine'] == 'c') \
+                or (isinstance(header, list) and (usecols or (args['engine'] == 'c' and len(header) > 1))):
+            return self._read_multiheader(args=args)
+        return self._pd_read_csv(args=args)
+
+    def _read_python_usecols(self, args: dict) -> pd.DataFrame:
+        """Read all columns with the python engine and keep the columns in usecols
+
+        With usecols, the python engine keeps rows that have more values than header
+        columns (cut to the header) instead of skipping them as bad lines.
+        """
+        usecols = args['usecols']
+        df = self._read_csv(args=dict(args, usecols=None))
+        if args.get('chunksize', None):
+            return (chunk.iloc[:, usecols] for chunk in df)
+        return df.iloc[:, usecols]
+
+    def _pd_read_csv(self, args: dict):
+        """pd.read_csv, gzip files are decompressed in a separate thread if mmap is True
+
+        The parser then reads the decompressed data from a pipe, decompression and
+        parsing run at the same time. With chunksize, the pipe is closed after the
+        last chunk was read. Not used for the pyarrow engine, which decompresses
+        and parses files with its own threads.
+        """
+        if not (self.mmap and self.compression == 'gzip') or args['engine'] == 'pyarrow':
+            return pd.read_csv(**args)
+        pipe = gzippipe.open_gzip_pipe(filepath=args['filepath_or_buffer'])
+        args = dict(args, filepath_or_buffer=pipe, compression=None)
+        if not args.get('chunksize', None):
+            with pipe:
+                return pd.read_csv(**args)
+        try:
+            chunks = pd.read_csv(**args)
+        except Exception:
+            pipe.close()
+            raise
+        return self._iter_and_close(chunks=chunks, f=pipe)
+
+    @staticmethod
+    def _iter_and_close(chunks, f):
+        try:
+            yield from chunks
+        finally:
+            f.close()
+
+    def _read_multiheader(self, args: dict) -> pd.DataFrame:
+        """Read file with several header rows (e.g. variables and units), or with usecols
+
+        The c engine silently cuts rows that have more values than header columns
+        if the header has several rows, and pandas does not allow usecols together
+        with a list of header rows. Header and data rows are therefore read separately,
+        rows with too many values are then reported as bad lines.
+
+        With usecols, the c engine also keeps rows with too many values (cut to the
+        header). One more column than in the header is then read, rows with a value in
+        this column are removed and reported as bad lines (see _remove_long_rows).
+        """
+        header = args['header']
+        header_row = max(header) if isinstance(header, list) else header
+        usecols = args.get('usecols', None)
+        columns = self._pd_read_csv(args=dict(args, nrows=0, usecols=None, chunksize=None)).columns
+
+        # Rows of the header, after skipped rows
+        skiprows = args['skiprows']
+        if not skiprows:
+            skiprows = []
+        elif isinstance(skiprows, int):
+            skiprows = list(range(skiprows))
+        skiprows = set(skiprows)
+        rows = [row for row in range(len(skiprows) + header_row + 1) if row not in skiprows]
+        skiprows.update(rows[:header_row + 1])
+
+        names = list(range(len(columns)))
+        extra_col = None
+        if usecols and args['engine'] == 'c':
+            extra_col = len(columns)
+            names.append(extra_col)
+            args = dict(args, usecols=list(usecols) + [extra_col])
+        df = self._pd_read_csv(args=dict(args, header=None, skiprows=sorted(skiprows), names=names))
+        columns = columns[usecols] if usecols else columns
+        if args.get('chunksize', None):
+            return (self._remove_long_rows(df=chunk, extra_col=extra_col).set_axis(columns, axis=1)
+                    for chunk in df)
+        df = self._remove_long_rows(df=df, extra_col=extra_col)
+        df.columns = columns
+        return df
+
+    def _remove_long_rows(self, df: pd.DataFrame, extra_col: int or None) -> pd.DataFrame:
+        """Remove rows with a value in the column after the last header column
+
+        Rows that have more values than header columns are bad lines, they are
+        removed with a ParserWarning (the same as the parsers do without usecols).
+        Rows where the first additional value is empty cannot be distinguished from
+        rows without additional values, they are kept (cut to the header).
+        """
+        if extra_col is None:
+            return df
+        long_rows = df[extra_col].notna()
+        if long_rows.any():
+            warnings.warn(f"Skipping {long_rows.sum()} rows with more values than columns "
+                          f"in file {self.filepath}", pd.errors.ParserWarning)
+            df = df.loc[~long_rows]
+        return df.drop(columns=extra_col, inplace=False)
+
+    def _readfile_python(self, args: dict) -> pd.DataFrame:
+        """Read data file with the python engine"""
         try:
             # todo read header separately like in diive
-            df = pd.read_csv(**args)
+            df = self._read_csv(args=args)
         except pd.errors.EmptyDataError:
             # EmptyDataError occurs when the file is completely empty.
             # Normally, files with file size zero are filtered out before
@@ -150,77 +557,35 @@ class FileTypeReader:
             # [0, 1] means that the empty row is skipped (0)
             # and then the erroneous row is skipped (1).
             args['skiprows'] = [0, 1]
-            df = pd.read_csv(**args)
+            df = self._read_csv(args=args)
         except _csv.Error:
             # The _csv.Error occurs e.g. in case there are NUL bytes in
             # the data file. The python engine cannot handle these bytes,
             # but the c engine can.
             args['engine'] = 'c'
-            df = pd.read_csv(**args)
+            df = self._read_csv(args=args)
 
         return df
 
     def _build_timestamp(self, df) -> pd.DataFrame:
         """
         Build full datetime timestamp by combining several cols
+
+        Rows where date info is missing or invalid are removed.
         """
 
         # Build from columns by index, column names not available
         if self.build_timestamp == 'YEAR0+MONTH1+DAY2+HOUR3+MINUTE4':
-            # Remove rows where date info is missing
-            _not_possible = df['YEAR'].isnull()
-            df = df[~_not_possible]
-            _not_possible = df['MONTH'].isnull()
-            df = df[~_not_possible]
-            _not_possible = df['DAY'].isnull()
-            df = df[~_not_possible]
-            _not_possible = df['HOUR'].isnull()
-            df = df[~_not_possible]
-            _not_possible = df['MINUTE'].isnull()
-            df = df[~_not_possible]
-
-            # pandas recognizes columns with these names as time columns
             cols = ['YEAR', 'MONTH', 'DAY', 'HOUR', 'MINUTE']
-            df['TIMESTAMP'] = pd.to_datetime(df[cols])
-            df = df.drop(columns=cols, axis=1, inplace=False)
-
-            # Remove rows where timestamp-building did not work
-            locs_emptydate = df['TIMESTAMP'].isnull()
-            df = df.loc[~locs_emptydate, :]
-
-            # Set as index
-            df = df.set_index('TIMESTAMP', inplace=False)
+            values, valid = timestamps.from_year_month_day_hour_minute(
+                year=df['YEAR'], month=df['MONTH'], day=df['DAY'], hour=df['HOUR'], minute=df['MINUTE'])
+            df = df.loc[valid].drop(columns=cols, inplace=False)
+            df.index = timestamps.to_datetime_index(values[valid])
 
         # Build from columns by name, column names available
         elif self.build_timestamp == 'YEAR+DOY+TIME':
-            # Remove rows where date info is missing
-            _not_possible = df['YEAR'].isnull()
-            df = df[~_not_possible]
-            _not_possible = df['DOY'].isnull()
-            df = df[~_not_possible]
-            _not_possible = df['DOY'] == 0
-            df = df[~_not_possible]
-            _not_possible = df['TIME'].isnull()
-            df = df[~_not_possible]
-
-            df['_basedate'] = pd.to_datetime(df['YEAR'], format='%Y', errors='coerce')
-            df['_doy_timedelta'] = pd.to_timedelta(df['DOY'], unit='D') - pd.Timedelta(days=1)
-            df['_time_str'] = df['TIME'].astype(int).astype(str).str.zfill(4)
-            df['_time'] = pd.to_datetime(df['_time_str'], format='%H%M', errors='coerce')
-            df['_hours'] = df['_time'].dt.hour
-            df['_hours'] = pd.to_timedelta(df['_hours'], unit='hours')
-            df['_minutes'] = df['_time'].dt.minute
-            df['_minutes'] = pd.to_timedelta(df['_minutes'], unit='minutes')
-
-            df['TIMESTAMP'] = df['_basedate'] \
-                              + df['_doy_timedelta'] \
-                              + df['_hours'] \
-                              + df['_minutes']
-
-            dropcols = ['_basedate', '_doy_timedelta', '_hours', '_minutes', '_time', '_time_str']
-            df = df.drop(dropcols, axis=1, inplace=False)
-            locs_emptydate = df['TIMESTAMP'].isnull()
-            df = df.loc[~locs_emptydate, :]
-            df = df.set_index('TIMESTAMP', inplace=False)
+            values, valid = timestamps.from_year_doy_time(year=df['YEAR'], doy=df['DOY'], time=df['TIME'])
+            df = df.loc[valid]
+            df.index = timestamps.to_datetime_index(values[valid])
 
         return df
@@ -10,12 +10,8 @@ import yaml
 def remove_orig_timestamp_cols(df) -> pd.DataFrame:
     """Remove original datetime columns that were used to build the timestamp index."""
     dropcols = ['DOY', 'YEAR', 'MONTH', 'DAY', 'HOUR', 'MINUTE', 'TIME']
-    for col in dropcols:
-        try:
-            df = df.drop(col, axis=1, inplace=False)
-        except KeyError as e:
-            pass
-    return df
+    # All columns in one step, columns that are not in the data are ignored
+    return df.drop(columns=dropcols, errors='ignore', inplace=False)
 
 
 def get_conf_filetypes(folder: Path, ext: str = 'yaml') -> dict:
@@ -48,75 +44,81 @@ def read_configfile(config_file) -> dict:
     return data
 
 
-def remove_unnamed_cols(df) -> pd.DataFrame:
-    """Remove columns that do not have a column name"""
-    newcols = []
-    for col in df.columns:
-        if any('Unnamed' in value for value in col):
-            pass
-        else:
-            newcols.append(col)
-    df = df[newcols]
-    df.columns = pd.MultiIndex.from_tuples(newcols)
-    return df
-
+def build_columns(df) -> pd.DataFrame:
+    """Column MultiIndex with variable names and units, built in one step
 
-def rename_unnamed_units(df) -> pd.DataFrame:
-    """Units not given in files with two-row header yields "Unnamed ..." units"""
+    - Units not given in files with single-row header: units are '-not-given-'
+    - Units not given in files with two-row header yields "Unnamed ..." units,
+      these units are renamed to '-not-given-'
+    - Columns that do not have a column name ("Unnamed ..." variable name) are removed
+    """
     newcols = []
-    for col in df.columns:
-        if any('Unnamed' in value for value in col):
+    keep = []
+    for ix, col in enumerate(df.columns):
+        if not isinstance(df.columns, pd.MultiIndex):
+            col = (col, '-not-given-')
+        if 'Unnamed' in str(col[0]):
+            continue
+        if any('Unnamed' in str(value) for value in col):
             col = (col[0], '-not-given-')
         newcols.append(col)
-    df.columns = pd.MultiIndex.from_tuples(newcols)
+        keep.append(ix)
+    if len(keep) < len(df.columns):
+        df = df.iloc[:, keep]
+    else:
+        df = df.copy(deep=False)
+    df.columns = pd.MultiIndex.from_tuples(newcols, names=[None, None])
     return df
 
 
 def combine_duplicate_cols(df: pd.DataFrame) -> pd.DataFrame:
-    """Combine duplicate columns into a single Series and add it back to the dataframe."""
-    dupl_cols = df.columns[df.columns.duplicated()].tolist()
-    if dupl_cols:
-
-        dupl_cols_subset_df = df[dupl_cols].copy()  # Make subset with duplicate cols only
-        dupl_cols_subset_df = dupl_cols_subset_df.sort_index(axis=1,
-                                                             inplace=False)  # lexsort for better performance
-        df = df.drop(dupl_cols, axis=1, inplace=False)  # Remove duplicate cols from main data
+    """Combine duplicate columns into a single column and add it back to the dataframe.
 
-        for dc_col in dupl_cols:
-            dc_merged_s = pd.Series()
-
-            for subcol_ix, subcol_name in enumerate(dupl_cols_subset_df[dc_col].columns):
-                subcol_s = dupl_cols_subset_df[dc_col].iloc[:, subcol_ix].copy()
-                subcol_s = subcol_s.dropna()
-                if subcol_ix == 0:
-                    dc_merged_s = subcol_s
-                else:
-                    dc_merged_s = pd.concat([dc_merged_s, subcol_s], axis=0)
-
-            dc_merged_s = remove_index_duplicates(data=dc_merged_s)
-
-            df[dc_merged_s.name] = dc_merged_s
-
-    return df
-
-
-def add_units_row(df) -> pd.DataFrame:
-    """Units not given in files with single-row header"""
-    if not isinstance(df.columns, pd.MultiIndex):
-        newcols = []
-        for col in df.columns:
-            newcol = (col, '-not-given-')
-            newcols.append(newcol)
-        df.columns = pd.MultiIndex.from_tuples(newcols)
+    Each row gets the value of the last of the duplicate columns where the
+    value is not missing (same as keeping the last value of each timestamp).
+    All duplicate columns with the same name are combined in one step, as
+    NumPy block with one column per duplicate. Combined columns are added
+    after the other columns.
+    """
+    duplicated = df.columns.duplicated()
+    if not duplicated.any():
+        return df
+    dupl_cols = list(dict.fromkeys(df.columns[duplicated]))  # Names of duplicate cols, in order of duplicates
+
+    # Positions of the duplicate columns for each name
+    positions = {col: [] for col in dupl_cols}
+    for ix, col in enumerate(df.columns):
+        if col in positions:
+            positions[col].append(ix)
+
+    rows = np.arange(len(df.index))
+    combined = {}
+    for col_ix, col in enumerate(dupl_cols):
+        block = df.iloc[:, positions[col]].to_numpy()
+        # Last duplicate col with a value, the last col if there is no value (missing)
+        notna = pd.notna(block)
+        last = block.shape[1] - 1 - np.argmax(notna[:, ::-1], axis=1)
+        combined[col_ix] = block[rows, last]
+    combined_df = pd.DataFrame(combined, index=df.index)
+    combined_df.columns = pd.Index(dupl_cols)
+
+    # Remove duplicate cols from main data, add combined cols
+    keep = np.flatnonzero(~df.columns.isin(dupl_cols))
+    df = pd.concat([df.iloc[:, keep], combined_df], axis=1)
     return df
 
 
 def remove_index_duplicates(data: pd.DataFrame or pd.Series, keep='last') -> pd.DataFrame or pd.Series:
+    if data.index.is_unique:
+        return data
     data = data[~data.index.duplicated(keep=keep)]
     return data
 
 
 def sort_timestamp(df) -> pd.DataFrame:
+    """Sort by timestamp, data that are already sorted are returned as they are (same as sort_index)"""
+    if df.index.is_monotonic_increasing:
+        return df
     df = df.sort_index(inplace=False)
     return df
 
@@ -128,10 +130,60 @@ def sanitize_data(df) -> pd.DataFrame:
     # as some sort of number (i.e., the column dtype does not
     # become 'object' and they are not a string) but cannot be
     # handled.
-    df = df.replace([np.inf, -np.inf], np.nan, inplace=False)
+    # Only columns that contain inf are replaced, other columns are not copied.
+    # Columns are replaced in the dataframe that is passed (isetitem), df is changed.
+    for ix in range(len(df.columns)):
+        values = df.iloc[:, ix].to_numpy()
+        if values.dtype.kind != 'f':
+            continue
+        is_inf = np.isinf(values)
+        if is_inf.any():
+            df.isetitem(ix, np.where(is_inf, np.nan, values))
+    return df
+
+
+def to_float32(df: pd.DataFrame) -> pd.DataFrame:
+    """Store float64 columns as float32, if no digits are lost
+
+    Columns are only converted if all values have at most 6 significant
+    digits (the decimal precision of float32), which is the case for most
+    sensor data. Values of these columns are then restored exactly with
+    to_float64. Other columns (e.g. large record numbers) are kept as float64.
+    Columns are replaced in the dataframe that is passed (isetitem), df is changed.
+    """
+    for ix in range(len(df.columns)):
+        values = df.iloc[:, ix]
+        if values.dtype != 'float64':
+            continue
+        with np.errstate(over='ignore', invalid='ignore'):
+            # Values outside the range of float32 become inf, these columns are kept as float64
+            values32 = values.to_numpy(dtype='float32')
+            lossless = (_round_float32(values32) == values.to_numpy()) | np.isnan(values.to_numpy())
+        if lossless.all():
+            df.isetitem(ix, pd.Series(values32, index=df.index))
     return df
 
 
+def to_float64(series: pd.Series) -> pd.Series:
+    """float32 data as float64, rounded to 6 significant digits (see to_float32)"""
+    if series.dtype != 'float32':
+        return series
+    return pd.Series(_round_float32(series.to_numpy()), index=series.index, name=series.name)
+
+
+def _round_float32(values: np.ndarray) -> np.ndarray:
+    """float64 values of float32 values, rounded to the decimal precision of float32"""
+    values = values.astype('float64')
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        exponent = np.floor(np.log10(np.abs(values)))
+        decimals = np.finfo(np.float32).precision - 1 - exponent
+        # Only positive powers of ten are exact, values >= 1e6 are divided by them instead
+        scale = 10.0 ** np.abs(decimals)
+        rounded = np.where(decimals >= 0, np.round(values * scale) / scale, np.round(values / scale) * scale)
+    # Zero, NaN and inf are kept
+    return np.where(np.isfinite(rounded), rounded, values)
+
+
 def remove_bad_data_rows(df, badrows_ids, badrows_col) -> pd.DataFrame:
     """Remove bad data rows, needed for irregular formats"""
     for ix, badrows_id in enumerate(badrows_ids):
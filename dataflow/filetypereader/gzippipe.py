@@ -0,0 +1,69 @@
+"""
+GZIP PIPE
+"""
+import gzip
+import io
+import os
+import threading
+import zlib
+from pathlib import Path
+
+# Size of decompressed blocks written to the pipe
+_blocksize = 1024 * 1024
+
+
+def open_gzip_pipe(filepath: Path):
+    """Open gzip file for reading, decompressed in a separate thread
+
+    The file is decompressed block by block in a background thread and written
+    to a pipe, the returned file object reads from the other end of the pipe.
+    Decompression (zlib releases the GIL) then runs at the same time as the
+    parser that reads the data. Only a few blocks of decompressed data are in
+    memory at any time.
+
+    If the reader closes the file before all data were read (e.g. when only the
+    first rows are needed), the thread stops at its next write. Errors during
+    decompression (e.g. truncated files) end the data early, they are raised
+    when the file object is closed.
+
+    Returns:
+        binary file object, must be closed by the caller
+    """
+    read_fd, write_fd = os.pipe()
+    reader = _PipeReader(io.FileIO(read_fd, 'rb'), buffer_size=_blocksize)
+    thread = threading.Thread(target=_decompress, args=(filepath, write_fd, reader), daemon=True)
+    thread.start()
+    reader.thread = thread
+    return reader
+
+
+def _decompress(filepath: Path, write_fd: int, reader) -> None:
+    try:
+        with gzip.open(filepath, 'rb') as f, os.fdopen(write_fd, 'wb') as pipe:
+            write_fd = None
+            for block in iter(lambda: f.read(_blocksize), b''):
+                pipe.write(block)
+    except BrokenPipeError:
+        # Reader closed the pipe, remaining data are not needed
+        pass
+    except (OSError, EOFError, zlib.error) as e:
+        reader.error = e
+    finally:
+        if write_fd is not None:
+            os.close(write_fd)
+
+
+class _PipeReader(io.BufferedReader):
+    """Read end of the pipe, closing it also waits for the decompression thread"""
+
+    thread = None
+    error = None
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        super().close()
+        if self.thread:
+            self.thread.join()
+        if self.error:
+            raise self.error
@@ -1,9 +1,18 @@
-def special_format_alternating(data_df, goodrows_col, goodrows_ids, filetypeconf) -> list:
+import numpy as np
+import pandas as pd
+
+
+def data_vars_key(source: int) -> str:
+    """Name of the setting with the variables of a data source, data_vars, data_vars2, data_vars3, ..."""
+    return 'data_vars' if source == 0 else f'data_vars{source + 1}'
+
+
+def special_format_alternating(data_df, goodrows_col, goodrows_ids, filetypeconf) -> tuple[list, str]:
     """Special format -ALTERNATING-
 
     Store data with differrent IDs in different dataframes
 
-    This special format stores data from two different sources in
+    This special format stores data from two (or more) different sources in
     one file. Each row contains an ID that indicates from which
     data source the respective data row originated. Typically,
     the ID changes with each row. For example, first row has
@@ -13,33 +22,44 @@ def special_format_alternating(data_df, goodrows_col, goodrows_ids, filetypeconf
     in one dataframe. The column names in this one dataframe are
     wrong at this point, they are fixed here.
 
-    Therefore, this dataframe is split into two dataframes here.
+    Therefore, this dataframe is split into one dataframe per source.
     Each dataframe then contains data from one single data source
-    and all rows have the same ID. Since the two dfs have a different
+    and all rows have the IDs of this source. Since the dfs have a different
     number of vars stored in them, the column names are then also fixed.
+    The variables of the first source are defined in data_vars, the
+    variables of the second source in data_vars2, of the third source
+    in data_vars3, etc.
 
-    """
+    The ID column is factorized once, the rows of each source and the IDs
+    that are not defined for any source are both found from the codes.
 
-    # Special format returns two dataframes
-    dfs = []
+    goodrows_ids can be given like this: [ [ 103, 104, 105 ], [ 203, 204, 205 ] ]
+    or as simple list: [ 103, 203 ], one entry per source.
 
-    for idix, this_id in enumerate(goodrows_ids):
+    Returns:
+        list of dataframes (one per source) and the IDs found in the data that
+        are not defined in goodrows_ids ('all IDs defined' if there are none)
+    """
+    codes, uniques = pd.factorize(data_df.iloc[:, goodrows_col])
+    uniques = pd.Index(uniques)
+    known = np.zeros(len(uniques), dtype=bool)  # IDs that belong to a source
 
-        data_vars = 'data_vars' if idix == 0 else 'data_vars2'
+    # Special format returns one dataframe per source
+    dfs = []
+    for source, source_ids in enumerate(goodrows_ids):
+        source_ids = source_ids if isinstance(source_ids, list) else [source_ids]
 
-        # Get data for ID
-        filter_data_rows = None
-        if isinstance(this_id, int):
-            filter_data_rows = data_df.iloc[:, goodrows_col] == this_id
-        elif isinstance(this_id, list):
-            filter_data_rows = data_df.iloc[:, goodrows_col].isin(this_id)
+        # Rows with one of the IDs of this source, missing IDs (code -1) are never selected
+        is_source_id = uniques.isin(source_ids)
+        known |= is_source_id
+        rows = (codes >= 0) & is_source_id[codes]
 
-        df = data_df[filter_data_rows].copy()
-        raw_varnames = list(filetypeconf[data_vars].keys())  # Varnames for this ID
-        n_raw_varnames = len(raw_varnames)  # Number of vars for this ID
-        df = df.iloc[:, 0:n_raw_varnames].copy()  # Keep number of cols for this ID
+        raw_varnames = list(filetypeconf[data_vars_key(source)].keys())  # Varnames for this ID
+        df = data_df.iloc[rows.nonzero()[0], 0:len(raw_varnames)]  # Keep number of cols for this ID
         df.columns = raw_varnames  # Assign correct varnames
-        df
         dfs.append(df)
 
-    return dfs
+    # IDs that were not defined in the filetype config
+    missed_ids = uniques[~known].tolist()
+    missed_ids = 'all IDs defined' if len(missed_ids) == 0 else missed_ids
+    return dfs, str(missed_ids)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -15,6 +16,13 @@ def special_format_icosseq(df, filetype) -> pd.DataFrame:
     This conversion makes sure that different heights are stored in different
     columns instead of different rows.
 
+    The conversion is done in one step for all locations: the location of each
+    row is stored as categorical code, rows are sorted by location (keeping their
+    order within each location) and each value is then placed in the column of
+    its location. Rows of the same location are therefore in one block, in
+    the order of the sorted locations, same as collecting the rows location by
+    location. Rows without location are removed.
+
     """
 
     # Detect subformat: profile or chambers
@@ -34,25 +42,33 @@ def special_format_icosseq(df, filetype) -> pd.DataFrame:
     if not locs_col:
         locs_col = 'INLET' if any('INLET' in col for col in df.columns) else False
 
-    # Detect unique locations identifiers, e.g. T1_35
-    locations = df[locs_col].dropna()
-    locations = locations.unique()
-    locations = list(locations)
-    locations.sort()
-
-    # Convert data structure
-    # Loop over data subsets of unique locations and collect all in df
-    locations_df = pd.DataFrame()
+    # Unique locations identifiers as sorted categories, e.g. T1_35
+    # Rows without location have code -1
+    locations = pd.Categorical(df[locs_col])
+    codes = locations.codes
+    locations = list(locations.categories)
+    if not locations:
+        return pd.DataFrame()
+
+    # Rows sorted by location, rows of the same location keep their order
+    rows = np.flatnonzero(codes >= 0)
+    rows = rows[np.argsort(codes[rows], kind='stable')]
+    codes = codes[rows]
+    n_rows = len(rows)
+
+    # Columns w/ location info (e.g. LOCATION) are not needed in converted data
+    datacols = [ix for ix, col in enumerate(df.columns) if locs_col not in col]
+
+    # Names of new columns for each location and variable
+    newnames = []
     for loc in locations:
-        _loc_df = df.loc[df[locs_col] == loc, :]
 
         # If chambers, add vertical position index 0 (measured at zero height/depth)
         if origin == 'CMB':
-            loc = f"{loc}_0" if origin == 'CMB' else loc
+            loc = f"{loc}_0"
 
-        renamedcols = []
-        for col in df.columns:
-            # _newname_suffix = '' if _newname_suffix in col else 'CMB' if subformat ==
+        for ix in datacols:
+            col = df.columns[ix]
 
             # Add subformat info to newname,
             #   e.g. 'PRF' for profile data
@@ -66,17 +82,28 @@ def special_format_icosseq(df, filetype) -> pd.DataFrame:
             # Replace double underlines that occur when 'addsuffix' is empty
             newname = newname.replace("__", "_")
 
-            # units = self.filetypeconf['data_vars'][col]['units']
-            renamedcols.append(newname)
-
-        # Make header with variable names
-        _loc_df.columns = renamedcols
-        locations_df = pd.concat([locations_df, _loc_df], axis=0)
-
-    # Remove string cols w/ location info, e.g. LOCATION_X_X_X
-    subsetcols = [col for col in locations_df if locs_col not in col]
-    locations_df = locations_df[subsetcols]
+            newnames.append(newname)
+
+    # Place values of each variable in the column of their location, missing otherwise
+    placed = []
+    for ix in datacols:
+        values = df.iloc[:, ix].to_numpy()[rows]
+        if len(locations) == 1:
+            # All rows are from the same location, no values are missing
+            placed.append(values[:, np.newaxis])
+            continue
+        dtype = np.float64 if values.dtype.kind in 'iuf' else object
+        locvalues = np.full((n_rows, len(locations)), np.nan, dtype=dtype)
+        locvalues[np.arange(n_rows), codes] = values
+        placed.append(locvalues)
+
+    # Columns ordered by location first, then by variable
+    data = {}
+    for loc_ix in range(len(locations)):
+        for var_ix in range(len(datacols)):
+            data[len(data)] = placed[var_ix][:, loc_ix]
 
     # Set the collected and converted data as main data
-    df = locations_df
-    return df
\ No newline at end of file
+    df = pd.DataFrame(data, index=df.index[rows])
+    df.columns = newnames
+    return df
@@ -0,0 +1,183 @@
+import gzip
+import math
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataflow.filetypereader import campbell
+from dataflow.filetypereader.filetypereader import FileTypeReader
+from dataflow.filetypereader.funcs import build_columns
+
+toa5_header = ['"TOA5","CH-DAV","CR1000","1234","CR1000.Std.22","CPU:meteo.CR1","123","Meteo"',
+               '"TIMESTAMP","RECORD","TA","RH","WS","Flag"',
+               '"TS","RN","degC","%","m/s",""',
+               '"","","Avg","Smp","Avg","Smp"']
+
+tob1_header = ['"TOB1","CH-DAV","CR3000","1234","CR3000.Std.22","CPU:meteo.CR3","123","Meteo"',
+               '"SECONDS","NANOSECONDS","RECORD","TA","RH","WS","Flag"',
+               '"SECONDS","NANOSECONDS","RN","degC","%","m/s",""',
+               '"","","","Avg","Smp","Avg","Smp"',
+               '"ULONG","ULONG","ULONG","IEEE4","FP2","FP2","LONG"']
+
+# Values of FP2 numbers (sign, exponent, mantissa) as given in the logger manuals
+fp2_values = [((0, 0, 0), 0.0), ((0, 0, 1234), 1234.0), ((0, 1, 1234), 123.4), ((0, 2, 1234), 12.34),
+              ((0, 3, 1234), 1.234), ((1, 2, 1234), -12.34), ((1, 3, 7999), -7.999), ((0, 0, 7999), 7999.0),
+              ((0, 0, 8191), math.inf), ((1, 0, 8191), -math.inf), ((1, 0, 8190), math.nan)]
+
+
+def _filetypeconf(**kwargs) -> dict:
+    filetypeconf = dict(filetype_gzip=False, data_skiprows=None, data_headerrows=None,
+                        data_vars={'TA': {'field': 'TA', 'units': 'degC'}}, data_timestamp_column=-9999,
+                        data_timestamp_format='"%Y-%m-%d %H:%M:%S"', data_na_values=[-9999], data_delimiter=',',
+                        data_build_timestamp=None, data_encoding='utf-8', data_special_format=None,
+                        data_remove_bad_rows=None, data_logger_format='TOA5')
+    filetypeconf.update(kwargs)
+    return filetypeconf
+
+
+def _records(n: int) -> list:
+    """Rows of a logger table: timestamp, record, TA, RH, WS and flag"""
+    rng = np.random.default_rng(18)
+    records = []
+    for ix, timestamp in enumerate(pd.date_range('2024-01-01', periods=n, freq='10s')):
+        records.append((timestamp, ix, float(np.float32(rng.integers(-400, 400) / 16)), rng.integers(0, 800) / 10,
+                        rng.integers(0, 8000) / 100, int(rng.integers(-5, 5))))
+    return records
+
+
+def _fp2(value: float) -> bytes:
+    """FP2 number of value with two decimals"""
+    mantissa = round(abs(value) * 100)
+    return struct.pack('>H', (0x8000 if value < 0 else 0) | (2 << 13) | mantissa)
+
+
+def _write_toa5(filepath, records: list, gzipped: bool = False):
+    rows = [f'"{t:%Y-%m-%d %H:%M:%S}",{rec},{ta},{rh},{ws},{flag}' for t, rec, ta, rh, ws, flag in records]
+    if len(rows) > 6:
+        # Missing values written by the logger and given in data_na_values
+        rows[5] = rows[5].replace(f",{records[5][2]},", ',"NAN",')
+        rows[6] = rows[6].replace(f",{records[6][3]},", ',-9999,')
+    text = '\r\n'.join(toa5_header + rows) + '\r\n'
+    if gzipped:
+        with gzip.open(filepath, 'wt') as f:
+            f.write(text)
+    else:
+        filepath.write_text(text)
+
+
+def _write_tob1(filepath, records: list, partial_record: bool = True):
+    data = b''
+    epoch = pd.Timestamp('1990-01-01')
+    for t, rec, ta, rh, ws, flag in records:
+        seconds = (t - epoch) // pd.Timedelta(seconds=1)
+        nanoseconds = (t - epoch - pd.Timedelta(seconds=seconds)).value
+        data += struct.pack('<III', seconds, nanoseconds, rec) + struct.pack('<f', ta) + _fp2(rh) + _fp2(ws) \
+                + struct.pack('<i', flag)
+    if partial_record:
+        data += b'\x01\x02\x03'
+    filepath.write_bytes(('\r\n'.join(tob1_header) + '\r\n').encode() + data)
+
+
+def _baseline_toa5(filepath, compression: str = None) -> pd.DataFrame:
+    """TOA5 file read as before, with the generic reader: skiprows [0, 3], header [0, 1]"""
+    df = pd.read_csv(filepath, skiprows=[0, 3], header=[0, 1], na_values=[-9999], compression=compression)
+    timestamp_col = df.columns[0]
+    df[timestamp_col] = pd.to_datetime(df[timestamp_col], format='%Y-%m-%d %H:%M:%S', errors='coerce')
+    df = df.set_index(timestamp_col)
+    df.index.name = 'TIMESTAMP'
+    return df
+
+
+def _formatted(df: pd.DataFrame) -> pd.DataFrame:
+    """Columns and numbers as after formatting the data, strings such as "NAN" become missing values"""
+    df = build_columns(df)
+    return df.apply(pd.to_numeric, errors='coerce').astype('float64')
+
+
+@pytest.mark.parametrize('gzipped', [False, True])
+def test_toa5_same_as_generic_reader(tmp_path, gzipped):
+    filepath = tmp_path / 'meteo.dat'
+    _write_toa5(filepath=filepath, records=_records(n=100), gzipped=gzipped)
+    filetypeconf = _filetypeconf(filetype_gzip=gzipped)
+    df = FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=filetypeconf).get_data()
+
+    expected = _baseline_toa5(filepath=filepath, compression='gzip' if gzipped else None)
+    pd.testing.assert_frame_equal(_formatted(df), _formatted(expected))
+    # Missing values from the logger are numbers already
+    assert df[('TA', 'degC')].dtype == 'float64'
+    assert df[('TA', 'degC')].isna().sum() == 1
+    assert df[('RH', '%')].isna().sum() == 1
+
+    chunks = list(FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=filetypeconf,
+                                 chunksize=30).iter_data())
+    assert [len(chunk) for chunk in chunks] == [30, 30, 30, 10]
+    pd.testing.assert_frame_equal(pd.concat(chunks), df)
+
+
+def test_header_only(tmp_path):
+    filepath = tmp_path / 'meteo.dat'
+    _write_toa5(filepath=filepath, records=[])
+    assert FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=_filetypeconf()).get_data().empty
+    _write_tob1(filepath=filepath, records=[])
+    assert FileTypeReader(filepath=str(filepath), filetype='test',
+                          filetypeconf=_filetypeconf(data_logger_format='TOB1')).get_data().empty
+
+
+def test_tob1_same_as_toa5(tmp_path):
+    records = _records(n=100)
+    toa5, tob1 = tmp_path / 'meteo.dat', tmp_path / 'meteo.tob'
+    _write_toa5(filepath=toa5, records=records)
+    _write_tob1(filepath=tob1, records=records)
+    df_toa5 = FileTypeReader(filepath=str(toa5), filetype='test', filetypeconf=_filetypeconf()).get_data()
+    df_tob1 = FileTypeReader(filepath=str(tob1), filetype='test',
+                             filetypeconf=_filetypeconf(data_logger_format='tob1')).get_data()
+
+    # Same values, missing values of the TOA5 file are numbers in the TOB1 file
+    df_toa5.iloc[5, 1] = records[5][2]
+    df_toa5.iloc[6, 2] = records[6][3]
+    pd.testing.assert_frame_equal(_formatted(df_tob1), _formatted(df_toa5))
+    assert df_tob1.dtypes.tolist() == ['uint32', 'float32', 'float64', 'float64', 'int32']
+
+    chunks = list(FileTypeReader(filepath=str(tob1), filetype='test', filetypeconf=_filetypeconf(
+        data_logger_format='TOB1'), chunksize=40).iter_data())
+    assert [len(chunk) for chunk in chunks] == [40, 40, 20]
+    pd.testing.assert_frame_equal(pd.concat(chunks), df_tob1)
+    df = FileTypeReader(filepath=str(tob1), filetype='test', filetypeconf=_filetypeconf(data_logger_format='TOB1'),
+                        nrows=7).get_data()
+    pd.testing.assert_frame_equal(df, df_tob1.iloc[:7])
+
+
+def test_tob1_subsecond_timestamps(tmp_path):
+    records = [(pd.Timestamp('2024-01-01') + pd.Timedelta(milliseconds=100 * ix), ix, 1.0, 2.0, 3.0, 0)
+               for ix in range(30)]
+    filepath = tmp_path / 'ec.tob'
+    _write_tob1(filepath=filepath, records=records, partial_record=False)
+    df = campbell.read_tob1(filepath=filepath)
+    assert df.index.tolist() == [t for t, *_ in records]
+
+
+def test_fp2():
+    for (sign, exponent, mantissa), value in fp2_values:
+        raw = (sign << 15) | (exponent << 13) | mantissa
+        decoded = campbell._fp2_table[raw]
+        if math.isnan(value):
+            assert math.isnan(decoded)
+        else:
+            assert decoded == value
+    # Same as decoding each number on its own
+    raw = np.arange(65536)
+    expected = np.where(raw & 0x8000, -1, 1) * (raw & 0x1FFF) / 10.0 ** ((raw >> 13) & 0x3)
+    special = np.isin(raw, [0x1FFF, 0x9FFF, 0x9FFE])
+    assert (campbell._fp2_table[~special] == expected[~special]).all()
+
+
+def test_tob1_dtype():
+    dtype = campbell.tob1_dtype(varnames=['SECONDS', 'NANOSECONDS', 'TA', 'RH', 'ID'],
+                                datatypes=['ULONG', 'ULONG', 'IEEE4', 'FP2', 'ASCII(8)'])
+    assert dtype.itemsize == 4 + 4 + 4 + 2 + 8
+    with pytest.raises(ValueError):
+        campbell.tob1_dtype(varnames=['X'], datatypes=['FP4'])
+    with pytest.raises(ValueError):
+        campbell.logger_format(filetypeconf={'data_logger_format': 'TOA6'})
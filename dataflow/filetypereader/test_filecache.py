@@ -0,0 +1,170 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataflow.filetypereader import filecache
+from dataflow.filetypereader.filecache import ParsedFileCache
+from dataflow.filetypereader.filetypereader import FileTypeReader
+
+
+def _filetypeconf(**kwargs) -> dict:
+    filetypeconf = dict(filetype_gzip=False,
+                        data_skiprows=None,
+                        data_headerrows=[0, 1],
+                        data_vars={'TA': {'field': 'TA', 'units': 'degC', 'measurement': 'TA', 'gain': 1},
+                                   'RH': {'field': 'RH', 'units': '%', 'measurement': 'RH'}},
+                        data_timestamp_column=0,
+                        data_timestamp_format='%Y-%m-%d %H:%M',
+                        data_na_values=[-9999],
+                        data_delimiter=',',
+                        data_build_timestamp=None,
+                        data_encoding='utf-8',
+                        data_special_format=None,
+                        data_remove_bad_rows=None)
+    filetypeconf.update(kwargs)
+    return filetypeconf
+
+
+@pytest.fixture(params=['.npz', '.parquet'])
+def suffix(request) -> str:
+    if request.param == '.parquet':
+        pytest.importorskip('pyarrow')
+    return request.param
+
+
+@pytest.fixture
+def cache(tmp_path, suffix) -> ParsedFileCache:
+    cache = ParsedFileCache(cachedir=tmp_path / 'cache', maxsize=10 * 1024 ** 2)
+    cache.suffix = suffix
+    return cache
+
+
+@pytest.fixture
+def datafile(tmp_path):
+    timestamps = pd.date_range('2024-01-01', periods=500, freq='30min')
+    rows = [f"{t:%Y-%m-%d %H:%M},{i * 0.1:.1f},{50 + i % 7},{'-9999' if i % 11 == 0 else 400 + i}"
+            for i, t in enumerate(timestamps)]
+    rows[3] = '2024-13-01 00:00,1.0,2,3'
+    filepath = tmp_path / 'meteo.csv'
+    filepath.write_text('\n'.join(['TIMESTAMP,TA,RH,CO2', '-,degC,%,ppm'] + rows) + '\n')
+    return filepath
+
+
+def _formatted_dfs(filepath) -> list:
+    """Dataframes as read by FileTypeReader, with different dtypes and attrs"""
+    df = FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=_filetypeconf()).get_data()
+    other = df.iloc[::2].astype({df.columns[0]: 'float32', df.columns[1]: 'int64'})
+    other.attrs['data_version'] = 'raw'
+    return [df, other]
+
+
+def test_load_same_as_stored(cache, datafile):
+    dfs = _formatted_dfs(filepath=datafile)
+    key = cache.key(filepath=datafile, filetypeconf=_filetypeconf())
+    assert cache.load(key=key) is None
+
+    assert cache.store(key, dfs=dfs, missed_ids=['CO2'], skipped_columns=[('X', '-')])
+    cached = cache.load(key=key)
+    assert cached['missed_ids'] == ['CO2']
+    assert cached['skipped_columns'] == [['X', '-']]
+    assert len(cached['dfs']) == len(dfs)
+    for df, stored in zip(cached['dfs'], dfs):
+        pd.testing.assert_frame_equal(df, stored)
+        assert df.attrs == stored.attrs
+    # NaN index (invalid timestamp) and missing values are kept
+    assert cached['dfs'][0].index.isna().sum() == 1
+    assert cached['dfs'][0].isna().sum().sum() == dfs[0].isna().sum().sum() > 0
+
+
+def test_not_cacheable(cache):
+    index = pd.DatetimeIndex(['2024-01-01', '2024-01-02'], name='TIMESTAMP')
+    columns = pd.MultiIndex.from_tuples([('TA', 'degC')])
+    assert not cache.store('a', dfs=[pd.DataFrame([['x'], ['y']], index=index, columns=columns)])
+    assert not cache.store('b', dfs=[pd.DataFrame([[1.0], [2.0]], index=index.tz_localize('UTC'), columns=columns)])
+    assert not cache.store('c', dfs=[pd.DataFrame([[1.0], [2.0]], index=[1, 2], columns=columns)])
+    assert not cache.store('d', dfs=[pd.DataFrame([[1.0], [2.0]], index=index, columns=['TA'])])
+    assert list(cache.cachedir.iterdir()) == []
+
+
+def test_key(tmp_path, datafile):
+    cache = ParsedFileCache(cachedir=tmp_path / 'cache', maxsize=1024)
+    key = cache.key(filepath=datafile, filetypeconf=_filetypeconf())
+
+    # Same contents in other file
+    copy = tmp_path / 'copy.csv'
+    copy.write_bytes(datafile.read_bytes())
+    assert cache.key(filepath=copy, filetypeconf=_filetypeconf()) == key
+
+    # Settings that are applied after formatting
+    changed = _filetypeconf()
+    changed['data_vars']['TA'].update(gain=2, units='K', measurement='_TA', field='TA_2')
+    assert cache.key(filepath=datafile, filetypeconf=changed) == key
+
+    # Changed contents, reader settings or options: read again
+    copy.write_bytes(datafile.read_bytes().replace(b'2024-01-01 01:00', b'2024-01-01 01:01'))
+    assert cache.key(filepath=copy, filetypeconf=_filetypeconf()) != key
+    assert cache.key(filepath=datafile, filetypeconf=_filetypeconf(data_na_values=[-9999, -6999])) != key
+    assert cache.key(filepath=datafile, filetypeconf=_filetypeconf(data_timestamp_format='%Y-%m-%d %H:%M:%S')) != key
+    changed = _filetypeconf()
+    changed['data_vars'] = dict(reversed(list(changed['data_vars'].items())))
+    assert cache.key(filepath=datafile, filetypeconf=changed) != key
+    changed = _filetypeconf()
+    changed['data_vars']['TA']['new_setting'] = 1
+    assert cache.key(filepath=datafile, filetypeconf=changed) != key
+    assert cache.key(filepath=datafile, filetypeconf=_filetypeconf(), float32=True) \
+           != cache.key(filepath=datafile, filetypeconf=_filetypeconf(), float32=False)
+
+
+def test_invalid_entries(cache, datafile):
+    dfs = _formatted_dfs(filepath=datafile)
+    cache.store('a', dfs=dfs, missed_ids=[])
+    cache.store('b', dfs=dfs, missed_ids=[])
+
+    # Incomplete or broken entries are read again
+    (cache.cachedir / 'a.json').write_text('{"datafiles": ')
+    assert cache.load(key='a') is None
+    (cache.cachedir / f"b-1{cache.suffix}").unlink()
+    assert cache.load(key='b') is None
+    meta = json.loads((cache.cachedir / 'b.json').read_text())
+    meta['datafiles'] = meta['datafiles'][:1]
+    (cache.cachedir / 'b.json').write_text(json.dumps(meta))
+    pd.testing.assert_frame_equal(cache.load(key='b')['dfs'][0], dfs[0])
+
+
+def test_version(tmp_path, datafile, monkeypatch):
+    cache = ParsedFileCache(cachedir=tmp_path / 'cache', maxsize=1024)
+    key = cache.key(filepath=datafile, filetypeconf=_filetypeconf())
+    monkeypatch.setattr(filecache, 'CACHE_VERSION', filecache.CACHE_VERSION + 1)
+    assert cache.key(filepath=datafile, filetypeconf=_filetypeconf()) != key
+
+
+def test_evict_least_recently_used(tmp_path, suffix):
+    columns = pd.MultiIndex.from_tuples([('TA', 'degC')])
+    index = pd.date_range('2024-01-01', periods=1000, freq='min', name='TIMESTAMP')
+    df = pd.DataFrame(np.random.default_rng(1).random((1000, 1)), index=index, columns=columns)
+    df.index.freq = None
+
+    cache = ParsedFileCache(cachedir=tmp_path / 'cache', maxsize=10 ** 9)
+    cache.suffix = suffix
+    cache.store('entry0', dfs=[df])
+    entry_size = sum(f.stat().st_size for f in cache.cachedir.iterdir())
+    cache.maxsize = int(entry_size * 3.5)
+
+    for ix in range(1, 3):
+        cache.store(f"entry{ix}", dfs=[df])
+    for ix in range(3):
+        os.utime(cache.cachedir / f"entry{ix}.json", (1000 + ix, 1000 + ix))
+    # Used entry is kept
+    assert cache.load(key='entry0') is not None
+
+    cache.store('entry3', dfs=[df])
+    assert cache.load(key='entry1') is None
+    for key in ['entry0', 'entry2', 'entry3']:
+        pd.testing.assert_frame_equal(cache.load(key=key)['dfs'][0], df)
+    assert cache.size == sum(f.stat().st_size for f in cache.cachedir.iterdir()) <= cache.maxsize
+
+    # Size is found again when the cache is opened
+    assert ParsedFileCache(cachedir=tmp_path / 'cache', maxsize=cache.maxsize).size == cache.size
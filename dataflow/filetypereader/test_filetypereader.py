@@ -0,0 +1,169 @@
+import gzip
+
+import pandas as pd
+import pytest
+
+from dataflow.filetypereader.filetypereader import FileTypeReader
+
+
+def _filetypeconf(**kwargs) -> dict:
+    filetypeconf = dict(filetype_gzip=False,
+                        data_skiprows=None,
+                        data_headerrows=[0, 1],
+                        data_vars={'TA': {'field': 'TA', 'units': 'degC'},
+                                   'RH': {'field': 'RH', 'units': '%'}},
+                        data_timestamp_column=0,
+                        data_timestamp_format='%Y-%m-%d %H:%M',
+                        data_na_values=[-9999],
+                        data_delimiter=',',
+                        data_build_timestamp=None,
+                        data_encoding='utf-8',
+                        data_special_format=None,
+                        data_remove_bad_rows=None)
+    filetypeconf.update(kwargs)
+    return filetypeconf
+
+
+def _write(path, rows: list, headerrows: int = 2) -> str:
+    lines = ['TIMESTAMP,TA,RH,CO2', '-,degC,%,ppm'][:headerrows]
+    path.write_text('\n'.join(lines + rows) + '\n')
+    return str(path)
+
+
+def _rows(n: int) -> list:
+    timestamps = pd.date_range('2024-01-01', periods=n, freq='30min')
+    return [f"{t:%Y-%m-%d %H:%M},{i * 0.1:.1f},{50 + i % 7},{400 + i}" for i, t in enumerate(timestamps)]
+
+
+@pytest.fixture(autouse=True)
+def _no_engine_memo():
+    FileTypeReader.engines.clear()
+    yield
+    FileTypeReader.engines.clear()
+
+
+def _full_and_chunks(filepath: str, filetypeconf: dict, **kwargs) -> tuple:
+    full = FileTypeReader(filepath=filepath, filetype='test', filetypeconf=filetypeconf, **kwargs).get_data()
+    chunks = list(FileTypeReader(filepath=filepath, filetype='test', filetypeconf=filetypeconf,
+                                 chunksize=7, **kwargs).iter_data())
+    return full, chunks
+
+
+@pytest.mark.filterwarnings('ignore::pandas.errors.ParserWarning')
+@pytest.mark.parametrize('bad_row', [None, 3, 20])
+@pytest.mark.parametrize('greenlitonly', [False, True])
+@pytest.mark.parametrize('headerrows', [[0], [0, 1]])
+def test_chunks_same_as_full_read(tmp_path, bad_row, greenlitonly, headerrows):
+    rows = _rows(n=30)
+    if bad_row is not None:
+        # Row with more values than the header, in the first chunk or later
+        rows[bad_row] += ',1,2'
+    filepath = _write(tmp_path / 'data.csv', rows=rows, headerrows=len(headerrows))
+
+    full, chunks = _full_and_chunks(filepath=filepath, filetypeconf=_filetypeconf(data_headerrows=headerrows),
+                                    greenlitonly=greenlitonly)
+
+    assert len(chunks) > 1
+    pd.testing.assert_frame_equal(pd.concat(chunks), full)
+    assert len(full) == 29 if bad_row is not None else 30
+
+
+def test_chunks_empty_file(tmp_path):
+    filepath = tmp_path / 'data.csv'
+    filepath.write_text('')
+    chunks = list(FileTypeReader(filepath=str(filepath), filetype='test',
+                                 filetypeconf=_filetypeconf(), chunksize=7).iter_data())
+    assert chunks == []
+
+
+def test_chunks_python_fallback(tmp_path, monkeypatch):
+    filepath = _write(tmp_path / 'data.csv', rows=_rows(n=30))
+    full = FileTypeReader(filepath=filepath, filetype='test', filetypeconf=_filetypeconf()).get_data()
+
+    # First chunk of the c engine fails the check, file is then read in chunks with the python engine
+    monkeypatch.setattr(FileTypeReader, '_fast_result_ok', lambda self, df, caught: False)
+    engines = []
+    read_csv = FileTypeReader._read_csv
+    monkeypatch.setattr(FileTypeReader, '_read_csv',
+                        lambda self, args: engines.append(args['engine']) or read_csv(self, args=args))
+    chunks = list(FileTypeReader(filepath=filepath, filetype='test', filetypeconf=_filetypeconf(),
+                                 chunksize=7).iter_data())
+
+    assert engines == ['c', 'python']
+    pd.testing.assert_frame_equal(pd.concat(chunks), full)
+
+
+def _greenlit_and_full(filepath: str, filetypeconf: dict, **kwargs) -> tuple:
+    greenlit = FileTypeReader(filepath=filepath, filetype='test', filetypeconf=filetypeconf,
+                              greenlitonly=True, **kwargs)
+    full = FileTypeReader(filepath=filepath, filetype='test', filetypeconf=filetypeconf, **kwargs)
+    return greenlit, full
+
+
+@pytest.mark.filterwarnings('ignore::pandas.errors.ParserWarning')
+@pytest.mark.parametrize('extra', [None, ',1', ',1,2', ',x'])
+@pytest.mark.parametrize('bad_row', [0, 3, 29])
+@pytest.mark.parametrize('chunksize', [None, 7])
+def test_greenlit_same_as_full_read(tmp_path, extra, bad_row, chunksize):
+    rows = _rows(n=30)
+    if extra:
+        # Row with more values than the header, skipped as bad line
+        rows[bad_row] += extra
+    filepath = _write(tmp_path / 'data.csv', rows=rows)
+
+    greenlit, full = _greenlit_and_full(filepath=filepath, filetypeconf=_filetypeconf(), chunksize=chunksize)
+    greenlit_df = pd.concat(list(greenlit.iter_data()))
+    full_df = pd.concat(list(full.iter_data()))
+
+    assert greenlit.get_skipped_columns() == [('CO2', 'ppm')]
+    assert list(greenlit_df.columns) == [('TA', 'degC'), ('RH', '%')]
+    pd.testing.assert_frame_equal(greenlit_df, full_df[greenlit_df.columns])
+    assert len(greenlit_df) == 30 if not extra else 29
+
+
+@pytest.mark.parametrize('filetypeconf, usecols', [
+    # Timestamp column by position, all columns before it are kept
+    (dict(data_timestamp_column=2), [0, 1, 2, 4]),
+    # Timestamp column by name
+    (dict(data_timestamp_column='TIMESTAMP'), [2, 4]),
+    # Timestamp built from several columns, names without position
+    (dict(data_timestamp_column=-9999, data_build_timestamp='YEAR0+MONTH1+DAY2+HOUR3+MINUTE4'), [0, 1, 3, 4]),
+    (dict(data_timestamp_column=-9999, data_build_timestamp='YEAR+DOY+TIME'), [0, 4, 5, 6]),
+    # Column that identifies bad rows, position after the timestamp column was removed
+    (dict(data_timestamp_column='TIMESTAMP', data_remove_bad_rows=[3, 'X']), [0, 1, 2, 3, 4]),
+    (dict(data_timestamp_column=-9999, data_build_timestamp='YEAR0+MONTH1+DAY2+HOUR3+MINUTE4',
+          data_remove_bad_rows=[1, 'X']), [0, 1, 2, 3, 4, 5, 6]),
+    # Special formats are always read completely
+    (dict(data_special_format='-ICOSSEQ-'), None),
+])
+def test_greenlit_usecols(tmp_path, filetypeconf, usecols):
+    filepath = tmp_path / 'data.csv'
+    filepath.write_text('YEAR,MONTH,TIMESTAMP,DAY,TA,DOY,TIME,CO2\n-,-,-,-,degC,-,-,ppm\n')
+    filetypeconf = _filetypeconf(data_vars={'TA': {'field': 'TA', 'units': 'degC'}}, **filetypeconf)
+    reader = FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=filetypeconf,
+                            greenlitonly=True, chunksize=1)
+    assert reader._readfile_args().get('usecols', None) == usecols
+
+
+@pytest.mark.parametrize('mmap', [False, True])
+def test_pyarrow_gzip(tmp_path, monkeypatch, mmap):
+    pytest.importorskip('pyarrow')
+    filepath = _write(tmp_path / 'data.csv', rows=_rows(n=30), headerrows=1)
+    gzip_filepath = tmp_path / 'data.csv.gz'
+    with open(filepath, 'rb') as f_in, gzip.open(gzip_filepath, 'wb') as f_out:
+        f_out.write(f_in.read())
+
+    # pyarrow reads the gzip file itself, also with mmap
+    engines = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(pd, 'read_csv', lambda **kwargs: engines.append(
+        (kwargs['engine'], kwargs['filepath_or_buffer'])) or read_csv(**kwargs))
+    # pyarrow only accepts strings as na_values
+    filetypeconf = _filetypeconf(data_headerrows=[0], data_na_values=['-9999'])
+    gzipped = FileTypeReader(filepath=str(gzip_filepath), filetype='test', mmap=mmap,
+                             filetypeconf=dict(filetypeconf, filetype_gzip=True)).get_data()
+
+    assert engines == [('pyarrow', str(gzip_filepath))]
+    FileTypeReader.engines.clear()
+    plain = FileTypeReader(filepath=filepath, filetype='test', filetypeconf=filetypeconf).get_data()
+    pd.testing.assert_frame_equal(gzipped, plain)
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataflow.filetypereader.filetypereader import FileTypeReader
+from dataflow.filetypereader.funcs import build_columns, combine_duplicate_cols, remove_index_duplicates, \
+    remove_orig_timestamp_cols, sanitize_data, sort_timestamp, to_float32, to_float64
+from dataflow.rawfuncs.common import calc_lwin
+
+
+def _sensor_values(rng: np.random.Generator, n: int, digits: int) -> np.ndarray:
+    """Values as parsed from text files, with the given number of significant digits"""
+    exponents = rng.integers(-8, 8, n)
+    mantissas = rng.integers(10 ** (digits - 1), 10 ** digits, n) * rng.choice([-1, 1], n)
+    strings = [f"{m}e{e - digits + 1}" for m, e in zip(mantissas, exponents)]
+    return np.array([float(s) for s in strings])
+
+
+@pytest.mark.parametrize('digits', [1, 2, 3, 4, 5, 6])
+def test_float32_same_values_at_upload(digits):
+    rng = np.random.default_rng(digits)
+    values = _sensor_values(rng=rng, n=20_000, digits=digits)
+    values[::97] = np.nan
+    values[::101] = 0
+    df = pd.DataFrame({('TA', 'degC'): values, ('RECORD', 'RN'): np.arange(len(values), dtype='float64')})
+    expected = df.copy()
+
+    df = to_float32(df=df)
+    assert df.dtypes.tolist() == ['float32', 'float32']
+    for col in df.columns:
+        uploaded = to_float64(series=df[col])
+        pd.testing.assert_series_equal(uploaded, expected[col])
+        # Gain and offset are applied to the same values as before
+        pd.testing.assert_series_equal(uploaded.multiply(0.1).add(-2.5), expected[col].multiply(0.1).add(-2.5))
+
+
+def test_float32_not_used_if_digits_are_lost():
+    df = pd.DataFrame({('TA', 'degC'): [1.5, 2.25, np.nan], ('RECORD', 'RN'): [1234567.0, 1.0, 2.0],
+                       ('CO2', 'ppm'): [412.3456, 1.0, 2.0], ('LARGE', '-'): [1e39, 1.0, 2.0],
+                       ('INF', '-'): [np.inf, -np.inf, 1.0], ('FLAG', '-'): [1, 2, 3]})
+    expected = df.copy()
+    df = to_float32(df=df)
+    assert df.dtypes.tolist() == ['float32', 'float64', 'float64', 'float64', 'float32', 'int64']
+    for col in df.columns:
+        pd.testing.assert_series_equal(to_float64(series=df[col]), expected[col])
+
+
+def test_float32_read_file_same_as_before(tmp_path):
+    rng = np.random.default_rng(20)
+    timestamps = pd.date_range('2024-01-01', periods=5000, freq='min')
+    rows = [f"{t:%Y-%m-%d %H:%M},{rng.normal(5, 10):.2f},{rng.uniform(0, 100):.1f},{rng.normal(400, 20):.3f},"
+            f"{rng.normal(300, 50):.3f},{i}" for i, t in enumerate(timestamps)]
+    filepath = tmp_path / 'meteo.csv'
+    filepath.write_text('\n'.join(['TIMESTAMP,T_RAD,RH,CO2,LW_IN_RAW,RECORD', '-,degC,%,ppm,W m-2,-'] + rows) + '\n')
+    filetypeconf = dict(filetype_gzip=False, data_skiprows=None, data_headerrows=[0, 1],
+                        data_vars={'RH': {'field': 'RH', 'units': '%'}}, data_timestamp_column=0,
+                        data_timestamp_format='%Y-%m-%d %H:%M', data_na_values=[-9999], data_delimiter=',',
+                        data_build_timestamp=None, data_encoding='utf-8', data_special_format=None,
+                        data_remove_bad_rows=None)
+    df = FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=filetypeconf).get_data()
+    expected = df.astype('float64')
+
+    df = to_float32(df=expected.copy())
+    assert (df.dtypes == 'float32').all()
+    assert df.memory_usage().sum() < expected.memory_usage().sum() * 0.6
+    for col in df.columns:
+        pd.testing.assert_series_equal(to_float64(series=df[col]), expected[col])
+
+    # Rawfuncs calculate with float64, results are the same as before
+    lwin = calc_lwin(temperature=to_float64(df[('T_RAD', 'degC')]), lwinraw=to_float64(df[('LW_IN_RAW', 'W m-2')]))
+    expected_lwin = calc_lwin(temperature=expected[('T_RAD', 'degC')], lwinraw=expected[('LW_IN_RAW', 'W m-2')])
+    pd.testing.assert_series_equal(lwin, expected_lwin)
+
+
+def _baseline_columns(df) -> pd.DataFrame:
+    """Columns built as before v0.22.0: units row added, unnamed units renamed, unnamed columns removed"""
+    if not isinstance(df.columns, pd.MultiIndex):
+        df.columns = pd.MultiIndex.from_tuples([(col, '-not-given-') for col in df.columns])
+    newcols = []
+    for col in df.columns:
+        if any('Unnamed' in value for value in col):
+            col = (col[0], '-not-given-')
+        newcols.append(col)
+    df.columns = pd.MultiIndex.from_tuples(newcols)
+    newcols = [col for col in df.columns if not any('Unnamed' in value for value in col)]
+    df = df[newcols]
+    df.columns = pd.MultiIndex.from_tuples(newcols)
+    return df
+
+
+def _baseline_format(df) -> pd.DataFrame:
+    """Formatting steps as before v0.22.0, without combining duplicate columns"""
+    df = df.sort_index(inplace=False)
+    df = df[~df.index.duplicated(keep='last')]
+    df = df.replace([np.inf, -np.inf], np.nan, inplace=False)
+    for col in ['DOY', 'YEAR', 'MONTH', 'DAY', 'HOUR', 'MINUTE', 'TIME']:
+        try:
+            df = df.drop(col, axis=1, inplace=False)
+        except KeyError:
+            pass
+    return _baseline_columns(df)
+
+
+def _format(df) -> pd.DataFrame:
+    with pd.option_context('mode.copy_on_write', True):
+        df = sort_timestamp(df=df)
+        df = remove_index_duplicates(data=df, keep='last')
+        df = sanitize_data(df)
+        df = remove_orig_timestamp_cols(df=df)
+        return build_columns(df=df)
+
+
+@pytest.mark.filterwarnings('ignore::pandas.errors.PerformanceWarning')
+@pytest.mark.parametrize('sort', ['sorted', 'shuffled', 'duplicates'])
+@pytest.mark.parametrize('header', ['single', 'units', 'unnamed_units'])
+def test_format_same_as_before(sort, header):
+    rng = np.random.default_rng(24)
+    names = ['YEAR', 'DOY', 'TA', 'Unnamed: 3', 'RH', 'Unnamed: 5', 'SW_IN']
+    data = rng.normal(size=(300, len(names)))
+    data[rng.random(data.shape) < 0.2] = np.nan
+    data[rng.random(data.shape) < 0.05] = np.inf
+    data[rng.random(data.shape) < 0.05] = -np.inf
+    df = pd.DataFrame(data, index=pd.date_range('2024-01-01', periods=300, freq='min', name='TIMESTAMP'))
+    if header == 'single':
+        df.columns = names
+    else:
+        units = ['-', '-', 'degC', '-', '%', 'W m-2', 'Unnamed: 6_level_1' if header == 'unnamed_units' else 'W m-2']
+        df.columns = pd.MultiIndex.from_tuples(list(zip(names, units)))
+    if sort == 'shuffled':
+        df = df.sample(frac=1, random_state=24)
+    elif sort == 'duplicates':
+        df = pd.concat([df, df.iloc[:20] * 2]).sample(frac=1, random_state=24)
+    df.index.freq = None
+    expected = _baseline_format(df.copy())
+    pd.testing.assert_frame_equal(_format(df.copy()), expected)
+
+
+@pytest.mark.filterwarnings('ignore::pandas.errors.PerformanceWarning')
+def test_format_read_file_same_as_before(tmp_path):
+    rng = np.random.default_rng(24)
+    timestamps = list(pd.date_range('2024-01-01', periods=3000, freq='min'))
+    # Logger restart: records written again, with other values
+    timestamps = timestamps[:2000] + timestamps[1900:]
+    rows = [f"{t:%Y-%m-%d %H:%M},{rng.normal(5, 10):.2f},{'INF' if i % 97 == 0 else f'{rng.uniform(0, 100):.1f}'},"
+            f"{rng.normal(300, 50):.3f}," for i, t in enumerate(timestamps)]
+    filepath = tmp_path / 'meteo.csv'
+    filepath.write_text('\n'.join(['TIMESTAMP,TA,RH,SW_IN,', '-,degC,%,,'] + rows) + '\n')
+    filetypeconf = dict(filetype_gzip=False, data_skiprows=None, data_headerrows=[0, 1],
+                        data_vars={'TA': {'field': 'TA', 'units': 'degC'}}, data_timestamp_column=0,
+                        data_timestamp_format='%Y-%m-%d %H:%M', data_na_values=[-9999], data_delimiter=',',
+                        data_build_timestamp=None, data_encoding='utf-8', data_special_format=None,
+                        data_remove_bad_rows=None)
+    df = FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=filetypeconf).get_data()
+    df = df.astype('float64')
+
+    formatted = _format(df.copy())
+    pd.testing.assert_frame_equal(formatted, _baseline_format(df.copy()))
+    assert formatted.columns.tolist() == [('TA', 'degC'), ('RH', '%'), ('SW_IN', '-not-given-')]
+    assert len(formatted) == 3000
+
+
+def _baseline_combine_duplicate_cols(df: pd.DataFrame) -> pd.DataFrame:
+    """Duplicate columns combined as before v0.22.0, values of the duplicates concatenated and deduplicated"""
+    dupl_cols = df.columns[df.columns.duplicated()].tolist()
+    if dupl_cols:
+        dupl_cols_subset_df = df[dupl_cols].copy().sort_index(axis=1, inplace=False)
+        df = df.drop(dupl_cols, axis=1, inplace=False)
+        for dc_col in dupl_cols:
+            subcols = [dupl_cols_subset_df[dc_col].iloc[:, ix].dropna()
+                       for ix in range(len(dupl_cols_subset_df[dc_col].columns))]
+            dc_merged_s = pd.concat(subcols, axis=0)
+            dc_merged_s = dc_merged_s[~dc_merged_s.index.duplicated(keep='last')]
+            df[dc_merged_s.name] = dc_merged_s
+    return df
+
+
+@pytest.mark.filterwarnings('ignore::pandas.errors.PerformanceWarning')
+def test_combine_duplicate_cols_same_as_before():
+    rng = np.random.default_rng(25)
+    for _ in range(300):
+        n, k = int(rng.integers(1, 30)), int(rng.integers(1, 8))
+        names = [(str(rng.choice(list('ABCD'))), 'degC') for _ in range(k)]
+        data = rng.normal(size=(n, k))
+        data[rng.random(data.shape) < 0.4] = np.nan
+        df = pd.DataFrame(data, index=pd.date_range('2024-01-01', periods=n, freq='min', name='TIMESTAMP'),
+                          columns=pd.MultiIndex.from_tuples(names))
+        expected = _baseline_combine_duplicate_cols(df.copy())
+        pd.testing.assert_frame_equal(combine_duplicate_cols(df.copy()), expected, check_freq=False)
+
+
+@pytest.mark.filterwarnings('ignore::pandas.errors.PerformanceWarning')
+def test_combine_duplicate_cols_read_file_same_as_before(tmp_path):
+    # Same variable logged in two tables of the logger program, one of them with gaps
+    rng = np.random.default_rng(25)
+    timestamps = pd.date_range('2024-01-01', periods=2000, freq='min')
+    rows = [f"{t:%Y-%m-%d %H:%M},{rng.normal(5, 10):.2f},{'' if i % 3 else f'{rng.normal(5, 10):.2f}'},"
+            f"{rng.uniform(0, 100):.1f},{'' if i % 5 == 0 else f'{rng.uniform(0, 100):.1f}'}"
+            for i, t in enumerate(timestamps)]
+    filepath = tmp_path / 'meteo.csv'
+    filepath.write_text('\n'.join(['TIMESTAMP,TA,TA,RH,RH', '-,degC,degC,%,%'] + rows) + '\n')
+    filetypeconf = dict(filetype_gzip=False, data_skiprows=None, data_headerrows=[0, 1],
+                        data_vars={'TA': {'field': 'TA', 'units': 'degC'}}, data_timestamp_column=0,
+                        data_timestamp_format='%Y-%m-%d %H:%M', data_na_values=[-9999], data_delimiter=',',
+                        data_build_timestamp=None, data_encoding='utf-8', data_special_format=None,
+                        data_remove_bad_rows=None)
+    df = FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=filetypeconf).get_data()
+    # read_csv renames duplicate columns (TA.1, degC.1), the names in the file are used again
+    df.columns = pd.MultiIndex.from_tuples([(var.split('.')[0], units.split('.')[0]) for var, units in df.columns])
+    df = df.astype('float64')
+
+    combined = combine_duplicate_cols(df.copy())
+    pd.testing.assert_frame_equal(combined, _baseline_combine_duplicate_cols(df.copy()))
+    assert combined.columns.tolist() == [('TA', 'degC'), ('RH', '%')]
+    assert combined.notna().all().all()
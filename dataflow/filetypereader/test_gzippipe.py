@@ -0,0 +1,106 @@
+import gzip
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from dataflow.filetypereader import filetypereader, gzippipe
+from dataflow.filetypereader.filetypereader import FileTypeReader
+
+
+@pytest.fixture(autouse=True)
+def _no_engine_memo():
+    FileTypeReader.engines.clear()
+    yield
+    FileTypeReader.engines.clear()
+
+
+def _read_pipe(filepath) -> bytes:
+    with gzippipe.open_gzip_pipe(filepath=filepath) as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('size', [0, 1, 1000, gzippipe._blocksize, 3 * gzippipe._blocksize + 17])
+def test_same_as_gzip_open(tmp_path, size):
+    filepath = tmp_path / 'data.csv.gz'
+    data = os.urandom(size // 2).hex().encode()[:size]
+    filepath.write_bytes(gzip.compress(data))
+    with gzip.open(filepath, 'rb') as f:
+        assert _read_pipe(filepath) == f.read() == data
+
+
+def test_multiple_members(tmp_path):
+    filepath = tmp_path / 'data.csv.gz'
+    filepath.write_bytes(gzip.compress(b'a,b\n1,2\n') + gzip.compress(b'3,4\n'))
+    assert _read_pipe(filepath) == b'a,b\n1,2\n3,4\n'
+
+
+def test_closed_early(tmp_path):
+    filepath = tmp_path / 'data.csv.gz'
+    filepath.write_bytes(gzip.compress(b'x' * (10 * gzippipe._blocksize)))
+    threads = threading.active_count()
+    pipe = gzippipe.open_gzip_pipe(filepath=filepath)
+    assert pipe.read(10) == b'x' * 10
+    pipe.close()
+    assert not pipe.thread.is_alive()
+    assert threading.active_count() == threads
+
+
+@pytest.mark.parametrize('broken', ['truncated', 'not_gzip'])
+def test_errors_same_as_gzip_open(tmp_path, broken):
+    filepath = tmp_path / 'data.csv.gz'
+    compressed = gzip.compress(b'TIMESTAMP,TA\n' * 100_000)
+    filepath.write_bytes(compressed[:len(compressed) // 2] if broken == 'truncated' else b'TIMESTAMP,TA\n')
+    with pytest.raises((OSError, EOFError)) as expected:
+        with gzip.open(filepath, 'rb') as f:
+            f.read()
+    with pytest.raises(expected.type):
+        _read_pipe(filepath)
+
+
+def _filetypeconf(**kwargs) -> dict:
+    filetypeconf = dict(filetype_gzip=False, data_skiprows=None, data_headerrows=[0, 1],
+                        data_vars={'TA': {'field': 'TA', 'units': 'degC'}, 'RH': {'field': 'RH', 'units': '%'}},
+                        data_timestamp_column=0, data_timestamp_format='%Y-%m-%d %H:%M', data_na_values=[-9999],
+                        data_delimiter=',', data_build_timestamp=None, data_encoding='utf-8',
+                        data_special_format=None, data_remove_bad_rows=None)
+    filetypeconf.update(kwargs)
+    return filetypeconf
+
+
+@pytest.mark.filterwarnings('ignore::pandas.errors.ParserWarning')
+@pytest.mark.parametrize('gzipped', [False, True])
+@pytest.mark.parametrize('chunksize', [None, 1000])
+@pytest.mark.parametrize('greenlitonly', [False, True])
+def test_read_file_same_as_without_mmap(tmp_path, monkeypatch, gzipped, chunksize, greenlitonly):
+    # The c engine reads from the pipe, pyarrow reads gzip files itself
+    monkeypatch.setattr(filetypereader, 'pyarrow_available', False)
+    timestamps = pd.date_range('2024-01-01', periods=5000, freq='min')
+    rows = [f"{t:%Y-%m-%d %H:%M},{i * 0.1:.1f},{50 + i % 7},{'-9999' if i % 11 == 0 else 400 + i}"
+            for i, t in enumerate(timestamps)]
+    rows[1500] += ',1'
+    text = '\n'.join(['TIMESTAMP,TA,RH,CO2', '-,degC,%,ppm'] + rows) + '\n'
+    filepath = tmp_path / ('data.csv.gz' if gzipped else 'data.csv')
+    if gzipped:
+        filepath.write_bytes(gzip.compress(text.encode()))
+    else:
+        filepath.write_text(text)
+    filetypeconf = _filetypeconf(filetype_gzip=gzipped)
+
+    def read(mmap: bool) -> pd.DataFrame:
+        reader = FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=filetypeconf, mmap=mmap,
+                                chunksize=chunksize, greenlitonly=greenlitonly)
+        return pd.concat(list(reader.iter_data())) if chunksize else reader.get_data()
+
+    pipes = []
+    open_gzip_pipe = gzippipe.open_gzip_pipe
+
+    def open_and_remember(filepath):
+        pipes.append(open_gzip_pipe(filepath=filepath))
+        return pipes[-1]
+
+    monkeypatch.setattr(gzippipe, 'open_gzip_pipe', open_and_remember)
+    pd.testing.assert_frame_equal(read(mmap=True), read(mmap=False))
+    assert bool(pipes) == gzipped
+    assert all(pipe.closed and not pipe.thread.is_alive() for pipe in pipes)
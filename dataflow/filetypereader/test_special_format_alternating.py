@@ -0,0 +1,99 @@
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataflow.filetypereader.filetypereader import FileTypeReader
+from dataflow.filetypereader.special_format_alternating import special_format_alternating, data_vars_key
+
+
+def _baseline_alternating(data_df, goodrows_col, goodrows_ids, filetypeconf) -> tuple[list, str]:
+    """-ALTERNATING- files split as before v0.22.0, one boolean filter per source, missed IDs from the ID column"""
+    dfs = []
+    for idix, this_id in enumerate(goodrows_ids):
+        data_vars = 'data_vars' if idix == 0 else 'data_vars2'
+        filter_data_rows = None
+        if isinstance(this_id, int):
+            filter_data_rows = data_df.iloc[:, goodrows_col] == this_id
+        elif isinstance(this_id, list):
+            filter_data_rows = data_df.iloc[:, goodrows_col].isin(this_id)
+        df = data_df[filter_data_rows].copy()
+        raw_varnames = list(filetypeconf[data_vars].keys())
+        df = df.iloc[:, 0:len(raw_varnames)].copy()
+        df.columns = raw_varnames
+        dfs.append(df)
+
+    available_ids = data_df['ID'].dropna().unique().tolist()
+    if all(isinstance(n, int) for n in goodrows_ids):
+        goodrows_ids_flat = goodrows_ids
+    else:
+        goodrows_ids_flat = list(chain.from_iterable(goodrows_ids))
+    missed_ids = [x for x in available_ids if x not in goodrows_ids_flat]
+    missed_ids = 'all IDs defined' if len(missed_ids) == 0 else missed_ids
+    return dfs, str(missed_ids)
+
+
+filetypeconf = {'data_vars': {f"A{i}": {} for i in range(5)}, 'data_vars2': {f"B{i}": {} for i in range(7)}}
+
+
+def _alternating_df(rng: np.random.Generator, n: int, ids: list) -> pd.DataFrame:
+    df = pd.DataFrame(rng.random((n, 8)), columns=['ID'] + [f"C{i}" for i in range(7)],
+                      index=pd.date_range('2024-01-01', periods=n, freq='min', name='TIMESTAMP'))
+    df['ID'] = rng.choice(ids, n)
+    df.loc[df.index[::11], 'ID'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('ids, goodrows_ids', [([103, 203, 999], [103, 203]), ([103, 203], [103, 203]),
+                                               ([103, 104, 203, 6], [[103, 104], [203]]),
+                                               ([1, 2, 3], [[1], [2, 3]]), ([7], [103, 203])])
+def test_same_as_before(ids, goodrows_ids):
+    df = _alternating_df(rng=np.random.default_rng(22), n=1000, ids=ids)
+    expected_dfs, expected_missed = _baseline_alternating(df, 0, goodrows_ids, filetypeconf)
+    dfs, missed_ids = special_format_alternating(df, 0, goodrows_ids, filetypeconf)
+    assert missed_ids == expected_missed
+    assert len(dfs) == len(expected_dfs) == 2
+    for df, expected in zip(dfs, expected_dfs):
+        pd.testing.assert_frame_equal(df, expected)
+
+
+def test_more_sources():
+    df = _alternating_df(rng=np.random.default_rng(22), n=100, ids=[1, 2, 3, 4])
+    dfs, missed_ids = special_format_alternating(df, 0, [1, 2, [3]],
+                                                 dict(filetypeconf, data_vars3={'Z0': {}, 'Z1': {}}))
+    assert [df.columns.tolist() for df in dfs] == [list(filetypeconf['data_vars']), list(filetypeconf['data_vars2']),
+                                                   ['Z0', 'Z1']]
+    for df, source_id in zip(dfs, [1, 2, 3]):
+        assert (df['A0' if source_id == 1 else 'B0' if source_id == 2 else 'Z0'] == source_id).all()
+    assert missed_ids == '[4.0]'
+    assert [data_vars_key(source) for source in range(3)] == ['data_vars', 'data_vars2', 'data_vars3']
+
+
+def test_read_file_same_as_before(tmp_path):
+    rng = np.random.default_rng(2)
+    timestamps = pd.date_range('2024-07-01', periods=3000, freq='30s')
+    rows = []
+    for i, t in enumerate(timestamps):
+        # Meteo records (ID 103) have fewer values than soil records (ID 203), rows with other IDs are not used
+        source_id = [103, 203, 203, 103, 999][i % 5]
+        values = rng.normal(10, 5, 5 if source_id == 203 else 2)
+        rows.append(','.join([str(source_id), f"{t:%Y-%m-%d %H:%M:%S}"] + [f"{v:.2f}" for v in values]
+                             + [''] * (5 - len(values))))
+    filepath = tmp_path / 'CH-CHA_iDL_BOX1_0_1_TBL1_20240701.dat'
+    filepath.write_text('\n'.join(['ID,TIMESTAMP,V1,V2,V3,V4,V5'] + rows) + '\n')
+    conf = dict(filetype_gzip=False, data_skiprows=None, data_headerrows=[0],
+                data_vars={'ID': {}, 'TA': {}, 'RH': {}},
+                data_vars2={'ID': {}, 'TS_5': {}, 'TS_10': {}, 'SWC_5': {}, 'SWC_10': {}, 'G': {}},
+                data_timestamp_column=1, data_timestamp_format='%Y-%m-%d %H:%M:%S', data_na_values=[-9999],
+                data_delimiter=',', data_build_timestamp=None, data_encoding='utf-8',
+                data_special_format='-ALTERNATING-', data_remove_bad_rows=None, data_keep_good_rows=[0, 103, 203])
+    df = FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=conf).get_data()
+
+    goodrows_col, goodrows_ids = conf['data_keep_good_rows'][0], conf['data_keep_good_rows'][1:]
+    dfs, missed_ids = special_format_alternating(df, goodrows_col, goodrows_ids, conf)
+    expected_dfs, expected_missed = _baseline_alternating(df, goodrows_col, goodrows_ids, conf)
+    for df, expected in zip(dfs, expected_dfs):
+        pd.testing.assert_frame_equal(df, expected)
+    assert [len(df) for df in dfs] == [1200, 1200]
+    assert missed_ids == expected_missed == '[999]'
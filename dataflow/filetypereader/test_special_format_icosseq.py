@@ -0,0 +1,97 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataflow.filetypereader.filetypereader import FileTypeReader
+from dataflow.filetypereader.special_format_icosseq import special_format_icosseq
+
+
+def _baseline_icosseq(df, filetype) -> pd.DataFrame:
+    """-ICOSSEQ- files converted as before v0.22.0, location by location"""
+    origin = None
+    if '-PRF-' in filetype:
+        origin = 'PRF'
+    if '-PRF-QCL-' in filetype:
+        origin = 'PRF_QCL'
+    if '-CMB-' in filetype:
+        origin = 'CMB'
+    locs_col = 'LOCATION' if any('LOCATION' in col for col in df.columns) else False
+    if not locs_col:
+        locs_col = 'INLET' if any('INLET' in col for col in df.columns) else False
+    locations = list(df[locs_col].dropna().unique())
+    locations.sort()
+    locations_df = pd.DataFrame()
+    for loc in locations:
+        _loc_df = df.loc[df[locs_col] == loc, :]
+        if origin == 'CMB':
+            loc = f"{loc}_0"
+        renamedcols = []
+        for col in df.columns:
+            addsuffix = '' if origin in col else origin
+            renamedcols.append(f"{col}_{addsuffix}_{loc}_1".replace("__", "_"))
+        _loc_df.columns = renamedcols
+        with warnings.catch_warnings():
+            # Concatenating with the empty frame of the first location
+            warnings.simplefilter('ignore', FutureWarning)
+            locations_df = pd.concat([locations_df, _loc_df], axis=0)
+    subsetcols = [col for col in locations_df if locs_col not in col]
+    return locations_df[subsetcols]
+
+
+def _profile_df(rng: np.random.Generator, n: int, n_locations: int, locs_col: str = 'LOCATION',
+                missing: bool = True, strings: bool = False, numeric_locations: bool = False) -> pd.DataFrame:
+    index = pd.date_range('2024-01-01', periods=n, freq='s', name='TIMESTAMP')
+    if numeric_locations:
+        locations = list(rng.choice(50, n_locations, replace=False).astype(float))
+    else:
+        locations = [f"T1_{h}" for h in rng.choice(100, n_locations, replace=False)]
+    df = pd.DataFrame({'CO2': rng.random(n), 'H2O': rng.integers(0, 100, n), locs_col: rng.choice(locations, n),
+                       'T_PRF': rng.random(n)}, index=index)
+    if missing:
+        df.loc[df.index[::7], locs_col] = np.nan
+        df.loc[df.index[::5], 'CO2'] = np.nan
+    if strings:
+        df['FLAG'] = rng.choice(['a', 'b'], n)
+    return df
+
+
+@pytest.mark.parametrize('filetype', ['PRF-10S-PRF-ICOSSEQ-', 'PRF-QCL-10S-PRF-QCL-ICOSSEQ-', 'CMB-10S-CMB-ICOSSEQ-'])
+@pytest.mark.parametrize('kwargs', [dict(n=50, n_locations=3), dict(n=50, n_locations=1),
+                                    dict(n=50, n_locations=4, locs_col='INLET'),
+                                    dict(n=60, n_locations=3, strings=True),
+                                    dict(n=40, n_locations=5, numeric_locations=True, locs_col='INLET'),
+                                    dict(n=30, n_locations=2, missing=False), dict(n=2000, n_locations=40)])
+def test_same_as_before(filetype, kwargs):
+    df = _profile_df(rng=np.random.default_rng(21), **kwargs)
+    expected = _baseline_icosseq(df=df.copy(), filetype=filetype)
+    pd.testing.assert_frame_equal(special_format_icosseq(df=df.copy(), filetype=filetype), expected,
+                                  check_column_type=False)
+
+
+def test_no_locations():
+    df = _profile_df(rng=np.random.default_rng(21), n=10, n_locations=2)
+    df['LOCATION'] = np.nan
+    assert special_format_icosseq(df=df, filetype='PRF-10S-PRF-ICOSSEQ-').empty
+
+
+def test_read_file_same_as_before(tmp_path):
+    rng = np.random.default_rng(1)
+    locations = ['T1_35', 'T1_2', 'T1_10', 'T1_90']
+    timestamps = pd.date_range('2024-07-01', periods=3000, freq='10s')
+    rows = [f"{t:%Y-%m-%d %H:%M:%S},{locations[i // 6 % 4]},{rng.normal(420, 10):.3f},{rng.normal(10, 2):.3f},"
+            f"{'NaN' if i % 13 == 0 else 1}" for i, t in enumerate(timestamps)]
+    filepath = tmp_path / 'CH-DAV_prof_20240701.csv'
+    filepath.write_text('\n'.join(['TIMESTAMP,LOCATION,CO2_DRY,H2O,VALVE_STATUS'] + rows) + '\n')
+    filetypeconf = dict(filetype_gzip=False, data_skiprows=None, data_headerrows=[0],
+                        data_vars={'CO2_DRY': {'field': 'CO2_DRY', 'units': 'umol mol-1'}}, data_timestamp_column=0,
+                        data_timestamp_format='%Y-%m-%d %H:%M:%S', data_na_values=[-9999], data_delimiter=',',
+                        data_build_timestamp=None, data_encoding='utf-8', data_special_format='-ICOSSEQ-',
+                        data_remove_bad_rows=None)
+    df = FileTypeReader(filepath=str(filepath), filetype='PRF-10S-PRF-ICOSSEQ-', filetypeconf=filetypeconf).get_data()
+
+    converted = special_format_icosseq(df=df.copy(), filetype='PRF-10S-PRF-ICOSSEQ-')
+    pd.testing.assert_frame_equal(converted, _baseline_icosseq(df=df.copy(), filetype='PRF-10S-PRF-ICOSSEQ-'),
+                                  check_column_type=False)
+    assert converted.columns.tolist()[:3] == ['CO2_DRY_PRF_T1_10_1', 'H2O_PRF_T1_10_1', 'VALVE_STATUS_PRF_T1_10_1']
@@ -0,0 +1,205 @@
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataflow.filetypereader.filetypereader import FileTypeReader
+from dataflow.filetypereader.timestamps import EPOCH_FORMAT, days_from_civil, parse_timestamps, valid_dates
+
+build_year_month = 'YEAR0+MONTH1+DAY2+HOUR3+MINUTE4'
+build_year_doy = 'YEAR+DOY+TIME'
+
+
+def _baseline_build_timestamp(df: pd.DataFrame, build_timestamp: str) -> pd.DataFrame:
+    """Timestamp from multiple columns as built before v0.22.0"""
+    if build_timestamp == build_year_month:
+        for col in ['YEAR', 'MONTH', 'DAY', 'HOUR', 'MINUTE']:
+            df = df[~df[col].isnull()]
+        cols = ['YEAR', 'MONTH', 'DAY', 'HOUR', 'MINUTE']
+        df['TIMESTAMP'] = pd.to_datetime(df[cols])
+        df = df.drop(columns=cols, axis=1, inplace=False)
+        df = df.loc[~df['TIMESTAMP'].isnull(), :]
+        df = df.set_index('TIMESTAMP', inplace=False)
+    elif build_timestamp == build_year_doy:
+        for col in ['YEAR', 'DOY', 'TIME']:
+            df = df[~df[col].isnull()]
+        df = df[~(df['DOY'] == 0)]
+        df['_basedate'] = pd.to_datetime(df['YEAR'], format='%Y', errors='coerce')
+        df['_doy_timedelta'] = pd.to_timedelta(df['DOY'], unit='D') - pd.Timedelta(days=1)
+        df['_time_str'] = df['TIME'].astype(int).astype(str).str.zfill(4)
+        df['_time'] = pd.to_datetime(df['_time_str'], format='%H%M', errors='coerce')
+        df['_hours'] = pd.to_timedelta(df['_time'].dt.hour, unit='hours')
+        df['_minutes'] = pd.to_timedelta(df['_time'].dt.minute, unit='minutes')
+        df['TIMESTAMP'] = df['_basedate'] + df['_doy_timedelta'] + df['_hours'] + df['_minutes']
+        df = df.drop(['_basedate', '_doy_timedelta', '_hours', '_minutes', '_time', '_time_str'], axis=1)
+        df = df.loc[~df['TIMESTAMP'].isnull(), :]
+        df = df.set_index('TIMESTAMP', inplace=False)
+    return df
+
+
+def _build_timestamp(df: pd.DataFrame, build_timestamp: str) -> pd.DataFrame:
+    reader = types.SimpleNamespace(build_timestamp=build_timestamp)
+    return FileTypeReader._build_timestamp(reader, df=df.copy())
+
+
+def _random_columns(build_timestamp: str, rng: np.random.Generator, n: int) -> pd.DataFrame:
+    """Date columns with valid values, missing values, decimals and values out of range"""
+    if build_timestamp == build_year_month:
+        # Invalid dates (e.g. 2023-02-29 or month 13) only in some frames, they stopped the file before
+        days = [1, 28, 29, 30, 31, 15.5, np.nan, 0, 32] if rng.random() < 0.2 else [1, 28, 15.5, np.nan]
+        months = [1, 2, 12, np.nan, 3.0, 13, 0] if rng.random() < 0.2 else [1, 2, 12, np.nan, 3.0]
+        columns = dict(YEAR=rng.choice([2019, 2020, 2023, np.nan, 2100.0, 1900], n),
+                       MONTH=rng.choice(months, n),
+                       DAY=rng.choice(days, n),
+                       HOUR=rng.choice([0, 23, 24, 1.5, -1, np.nan], n),
+                       MINUTE=rng.choice([0, 59, 60, 30.25, np.nan], n))
+    else:
+        columns = dict(YEAR=rng.choice([2019, 2020, np.nan, 2023.0, 1900], n),
+                       DOY=rng.choice([0, 1, 59, 60, 366, 367, 1.5, -2, np.nan, 0.25], n),
+                       TIME=rng.choice([0, 930, 2359, 2400, 960, 1230.7, -30, 5, np.nan, 12345, 59, 100], n))
+    return pd.DataFrame(dict(columns, TA=rng.random(n)), index=rng.permutation(n) + 10)
+
+
+@pytest.mark.parametrize('build_timestamp', [build_year_month, build_year_doy])
+def test_build_timestamp_same_as_before(build_timestamp):
+    rng = np.random.default_rng(15)
+    compared = 0
+    for _ in range(300):
+        df = _random_columns(build_timestamp=build_timestamp, rng=rng, n=20)
+        try:
+            expected = _baseline_build_timestamp(df=df.copy(), build_timestamp=build_timestamp)
+        except (ValueError, OverflowError):
+            # Rows with invalid dates stopped the file before, they are now removed
+            continue
+        pd.testing.assert_frame_equal(_build_timestamp(df=df, build_timestamp=build_timestamp), expected)
+        compared += 1
+    assert compared > 100
+
+
+def test_build_timestamp_invalid_rows_removed():
+    df = pd.DataFrame(dict(YEAR=[2023, 2023, 2024, np.nan], MONTH=[2, 13, 2, 1], DAY=[29, 1, 29, 1],
+                           HOUR=[0, 0, 12.5, 0], MINUTE=[0, 0, 0, 0], TA=[1.0, 2.0, 3.0, 4.0]))
+    with pytest.raises(ValueError):
+        _baseline_build_timestamp(df=df.copy(), build_timestamp=build_year_month)
+    df = _build_timestamp(df=df, build_timestamp=build_year_month)
+    assert df.index.tolist() == [pd.Timestamp('2024-02-29 12:30')]
+    assert df['TA'].tolist() == [3.0]
+
+
+def test_days_from_civil():
+    dates = pd.date_range('1678-01-01', '2262-01-01', freq='13D')
+    days = days_from_civil(year=dates.year.to_numpy(), month=dates.month.to_numpy(), day=dates.day.to_numpy())
+    assert (days == (dates - pd.Timestamp('1970-01-01')).days.to_numpy()).all()
+
+
+def test_valid_dates():
+    year, month, day = np.meshgrid([1900, 2000, 2023, 2024], np.arange(-1, 14), np.arange(-1, 33))
+    year, month, day = year.ravel(), month.ravel(), day.ravel()
+    expected = pd.to_datetime(pd.DataFrame(dict(year=year, month=month, day=day)), errors='coerce').notna()
+    assert (valid_dates(year=year, month=month, day=day) == expected.to_numpy()).all()
+
+
+def test_read_file_same_as_before(tmp_path):
+    # Layout of CR10X files: year, day of year and time as HHMM
+    rng = np.random.default_rng(1)
+    doy = np.repeat(np.arange(1, 367), 48)
+    time = np.tile([h * 100 + m for h in range(24) for m in (0, 30)], 366)
+    rows = [f"2024,{d},{t},{v:.3f}" for d, t, v in zip(doy, time, rng.random(len(doy)))]
+    rows[10] = '2024,0,930,1.0'
+    rows[20] = '2024,12,2400,1.0'
+    rows[30] = '2024,12,,1.0'
+    filepath = tmp_path / 'cr10x.dat'
+    filepath.write_text('\n'.join(['YEAR,DOY,TIME,TA'] + rows) + '\n')
+    filetypeconf = dict(filetype_gzip=False, data_skiprows=None, data_headerrows=[0],
+                        data_vars={'TA': {'field': 'TA', 'units': 'degC'}}, data_timestamp_column=-9999,
+                        data_timestamp_format=None, data_na_values=[-9999], data_delimiter=',',
+                        data_build_timestamp=build_year_doy, data_encoding='utf-8', data_special_format=None,
+                        data_remove_bad_rows=None)
+    df = FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=filetypeconf).get_data()
+
+    expected = _baseline_build_timestamp(df=pd.read_csv(filepath, header=[0]), build_timestamp=build_year_doy)
+    pd.testing.assert_frame_equal(df, expected)
+    assert len(df) == len(rows) - 3
+
+
+timestamp_formats = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '"%Y-%m-%d %H:%M:%S"',
+                     '%Y-%m-%d %H:%M:%S.%f', '%d.%m.%Y %H:%M', '%Y%m%d%H%M', '%Y-%m-%d', '%d/%m/%Y %H:%M:%S',
+                     '%Y-%j %H%M', '%%Y%Y-%m-%d']
+
+timestamp_strings = ['2023-01-01 00:00:00', '2023-12-31 23:59:59', '2024-02-29 12:00:00', '2023-02-29 12:00:00',
+                     '2023-1-1 0:0:0', '2023-01-01 00:00:60', '2023-01-01 24:00:00', '2023-01-01T10:00:00',
+                     '"2023-01-01 10:00:00"', '2023-01-01 10:00:00.1', '2023-01-01 10:00:00.123456789',
+                     '2023-01-01 10:00:00.1234567891', '01.02.2023 10:30', '1.2.2023 10:30', '202301011030',
+                     '2023-01-01', '2023-01-01 10:00', 'x', '', '  ', '2023-13-01 00:00:00',
+                     '２０２３-01-01 00:00:00', '2023-001 1030', '%Y2023-01-01', '2262-01-01 00:00:00',
+                     '2262-12-01 00:00:00', '1677-01-01 00:00:00', '1900-02-29 00:00', '2000-02-29 00:00',
+                     '31/12/2023 23:59:59', '2023-01-01 10:00:00.']
+
+
+@pytest.mark.parametrize('timestamp_format', timestamp_formats)
+def test_parse_timestamps_same_as_to_datetime(timestamp_format):
+    rng = np.random.default_rng(16)
+    for it in range(100):
+        values = [str(v) for v in rng.choice(timestamp_strings, 30)]
+        values[0] = None if it % 3 == 0 else values[0]
+        values[1] = np.nan if it % 5 == 0 else values[1]
+        values = pd.Series(values, dtype=object, index=rng.permutation(30), name='TIMESTAMP')
+        try:
+            expected = pd.to_datetime(values, format=timestamp_format, errors='coerce')
+        except ValueError:
+            with pytest.raises(ValueError):
+                parse_timestamps(values=values, timestamp_format=timestamp_format)
+            continue
+        pd.testing.assert_series_equal(parse_timestamps(values=values, timestamp_format=timestamp_format), expected)
+
+
+@pytest.mark.parametrize('timestamp_format, freq', [('%Y-%m-%d %H:%M:%S.%f', '100ms'), ('%d.%m.%Y %H:%M:%S', '1s'),
+                                                    ('%d.%m.%Y %H:%M:%S', '100ms'), ('%Y%m%d%H%M', '1min'),
+                                                    ('"%Y-%m-%d %H:%M:%S"', '1s'), ('%d %b %Y %H:%M', '1min')])
+def test_parse_timestamps_high_frequency(timestamp_format, freq):
+    dates = pd.date_range('2023-12-31 23:00', periods=20_000, freq=freq)
+    values = pd.Series(dates.strftime(timestamp_format))
+    values.iloc[[5, 500]] = ['2023-12-31 25:00', None]
+    expected = pd.to_datetime(values, format=timestamp_format, errors='coerce')
+    pd.testing.assert_series_equal(parse_timestamps(values=values, timestamp_format=timestamp_format), expected)
+
+
+def test_parse_timestamps_numbers():
+    values = pd.Series([202301011030, np.nan, 202313011030])
+    pd.testing.assert_series_equal(parse_timestamps(values=values, timestamp_format='%Y%m%d%H%M'),
+                                   pd.to_datetime(values, format='%Y%m%d%H%M', errors='coerce'))
+
+
+def test_parse_timestamps_epoch():
+    values = pd.Series(['1700000000.5', 'x', None, 1e30, 0, -1.25], index=range(10, 16))
+    parsed = parse_timestamps(values=values, timestamp_format=EPOCH_FORMAT)
+    assert parsed.index.equals(values.index)
+    assert parsed.tolist()[0] == pd.Timestamp('2023-11-14 22:13:20.5')
+    assert parsed.iloc[1:4].isna().all()
+    assert parsed.tolist()[4:] == [pd.Timestamp('1970-01-01'), pd.Timestamp('1969-12-31 23:59:58.75')]
+
+
+@pytest.mark.parametrize('timestamp_format', ['%d.%m.%Y %H:%M', '%Y-%m-%d %H:%M', '%d/%m/%Y %H%M'])
+def test_read_file_with_format_same_as_before(tmp_path, timestamp_format):
+    dates = pd.date_range('2024-01-01', periods=1000, freq='10min')
+    rows = [f"{t:{timestamp_format}},{i * 0.1:.1f}" for i, t in enumerate(dates)]
+    # Month 13
+    rows[3] = f"{dates[3]:{timestamp_format.replace('%m', '13')}},1.0"
+    filepath = tmp_path / 'meteo.csv'
+    filepath.write_text('\n'.join(['TIMESTAMP,TA', '-,degC'] + rows) + '\n')
+    filetypeconf = dict(filetype_gzip=False, data_skiprows=None, data_headerrows=[0, 1],
+                        data_vars={'TA': {'field': 'TA', 'units': 'degC'}}, data_timestamp_column=0,
+                        data_timestamp_format=timestamp_format, data_na_values=[-9999], data_delimiter=',',
+                        data_build_timestamp=None, data_encoding='utf-8', data_special_format=None,
+                        data_remove_bad_rows=None)
+    df = FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=filetypeconf).get_data()
+
+    # Timestamp parsed by pd.to_datetime as before
+    expected = pd.read_csv(filepath, header=[0, 1])
+    timestamp_col = expected.columns[0]
+    expected[timestamp_col] = pd.to_datetime(expected[timestamp_col], format=timestamp_format, errors='coerce')
+    expected = expected.set_index(timestamp_col)
+    expected.index.name = 'TIMESTAMP'
+    pd.testing.assert_frame_equal(df, expected)
+    assert df.index.isna().sum() == 1
@@ -0,0 +1,293 @@
+"""
+TIMESTAMPS
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    # For CLI
+    from ..common.times import split_datetime_format
+except:
+    # For BOX
+    from dataflow.common.times import split_datetime_format
+
+NS_PER_DAY = 86_400 * 10 ** 9
+NS_PER_HOUR = 3_600 * 10 ** 9
+NS_PER_MINUTE = 60 * 10 ** 9
+
+# Years that pandas can represent with nanosecond timestamps
+YEAR_MIN = 1678
+YEAR_MAX = 2262
+
+# Timestamp format for seconds since 1970-01-01 00:00:00 (epoch), not supported by pd.to_datetime
+EPOCH_FORMAT = '%s'
+
+# Directives that are parsed directly from fixed-width strings, with their number of digits,
+# %f (fraction of second) is only parsed at the end of the string and has 1 to 9 digits
+_fixed_widths = {'Y': 4, 'm': 2, 'd': 2, 'H': 2, 'M': 2, 'S': 2}
+
+# Compiled timestamp formats, see _compile_format
+_compiled_formats = {}
+
+# Number of days in each month (index 1-12), February has one day more in leap years
+_days_in_month = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype='int64')
+
+
+def to_float_array(series: pd.Series) -> np.ndarray:
+    """Values of series as float array, values that are not numbers become NaN"""
+    # Always a copy, arrays are changed in place (and are read-only views with copy-on-write)
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan, copy=True)
+
+
+def days_from_civil(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Number of days since 1970-01-01 for dates in the proleptic Gregorian calendar
+
+    Integer arithmetic only (algorithm by Howard Hinnant), works for whole arrays at once.
+    """
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    year_of_era = year - era * 400
+    day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146_097 + day_of_era - 719_468
+
+
+def is_leap_year(year: np.ndarray) -> np.ndarray:
+    return (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+
+
+def valid_dates(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """True for existing dates with years that pandas can represent"""
+    valid_month = (month >= 1) & (month <= 12)
+    days_in_month = _days_in_month[np.where(valid_month, month, 0)] \
+                    + ((month == 2) & is_leap_year(year))
+    return valid_month & (year >= YEAR_MIN) & (year <= YEAR_MAX) & (day >= 1) & (day <= days_in_month)
+
+
+def _in_bounds(days: np.ndarray, *ns: np.ndarray) -> np.ndarray:
+    """True where days plus nanoseconds (float, approximate) are within the range of pandas timestamps"""
+    total = days * float(NS_PER_DAY) + sum(ns)
+    with np.errstate(invalid='ignore'):
+        return (total > pd.Timestamp.min.value + NS_PER_DAY) & (total < pd.Timestamp.max.value - NS_PER_DAY)
+
+
+def from_year_month_day_hour_minute(year: pd.Series, month: pd.Series, day: pd.Series,
+                                    hour: pd.Series, minute: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Timestamps from separate columns for year, month, day, hour and minute
+
+    Same result as pd.to_datetime() with columns YEAR, MONTH, DAY, HOUR and MINUTE:
+    year, month and day are truncated to integers, hour and minute can have
+    decimals and are added as time to the date.
+
+    Returns:
+        timestamps as int64 nanoseconds since epoch, and boolean array that is
+        False for rows with missing values or invalid dates (their timestamps
+        are meaningless)
+    """
+    year, month, day, hour, minute = map(to_float_array, (year, month, day, hour, minute))
+    valid = ~(np.isnan(year) | np.isnan(month) | np.isnan(day) | np.isnan(hour) | np.isnan(minute))
+    valid &= np.isfinite(hour) & np.isfinite(minute)
+    with np.errstate(invalid='ignore'):
+        year, month, day = (np.trunc(np.where(valid, a, 1)).astype('int64') for a in (year, month, day))
+    valid &= valid_dates(year=year, month=month, day=day)
+
+    days = days_from_civil(year=np.where(valid, year, 1970), month=np.where(valid, month, 1),
+                           day=np.where(valid, day, 1))
+    hour_ns = np.round(np.where(valid, hour, 0) * NS_PER_HOUR)
+    minute_ns = np.round(np.where(valid, minute, 0) * NS_PER_MINUTE)
+    valid &= _in_bounds(days, hour_ns, minute_ns)
+
+    time_ns = np.where(valid, hour_ns, 0).astype('int64') + np.where(valid, minute_ns, 0).astype('int64')
+    return np.where(valid, days, 0) * NS_PER_DAY + time_ns, valid
+
+
+def from_year_doy_time(year: pd.Series, doy: pd.Series, time: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Timestamps from separate columns for year, day of year and time (HHMM, e.g. 930 for 09:30)
+
+    Day of year 1 is the 1st of January, day of year can have decimals and can
+    be larger than the number of days in the year. Rows with day of year 0 and
+    rows where the time (truncated to an integer) is not a valid HHMM time
+    between 0 and 2359 are invalid. Data loggers (e.g. CR10X) store data in
+    this layout.
+
+    Returns:
+        timestamps as int64 nanoseconds since epoch, and boolean array that is
+        False for rows with missing or invalid values (their timestamps are
+        meaningless)
+    """
+    year, doy, time = map(to_float_array, (year, doy, time))
+    valid = ~(np.isnan(year) | np.isnan(doy) | np.isnan(time)) & (doy != 0) & np.isfinite(doy)
+    with np.errstate(invalid='ignore'):
+        year = np.trunc(np.where(valid, year, 1970)).astype('int64')
+        hhmm = np.trunc(np.where(valid & np.isfinite(time), time, -1)).astype('int64')
+    valid &= (year >= YEAR_MIN) & (year <= YEAR_MAX)
+    valid &= (hhmm >= 0) & (hhmm // 100 <= 23) & (hhmm % 100 <= 59)
+
+    days = days_from_civil(year=np.where(valid, year, 1970), month=1, day=1)
+    doy_ns = np.round((np.where(valid, doy, 1) - 1) * NS_PER_DAY)
+    valid &= _in_bounds(days, doy_ns)
+
+    time_ns = (hhmm // 100) * NS_PER_HOUR + (hhmm % 100) * NS_PER_MINUTE
+    timestamps = np.where(valid, days, 0) * NS_PER_DAY \
+                 + np.where(valid, doy_ns, 0).astype('int64') + np.where(valid, time_ns, 0)
+    return timestamps, valid
+
+
+def to_datetime_index(timestamps: np.ndarray, name: str = 'TIMESTAMP') -> pd.DatetimeIndex:
+    """DatetimeIndex from int64 nanoseconds since epoch"""
+    return pd.DatetimeIndex(timestamps.astype('int64').view('datetime64[ns]'), name=name)
+
+
+def parse_timestamps(values: pd.Series, timestamp_format: str) -> pd.Series:
+    """Parse timestamps, same result as pd.to_datetime(values, format=timestamp_format, errors='coerce')
+
+    The fastest way of parsing is selected from the format and the values:
+        - ISO 8601 formats (e.g. '%Y-%m-%d %H:%M:%S' or '%Y-%m-%dT%H:%M:%S.%f') are
+          parsed by pd.to_datetime, which has its own fast parser for these formats.
+        - Strings that repeat (e.g. timestamps with one second resolution in 10 Hz
+          files) are parsed by pd.to_datetime, which parses each unique string once.
+        - Other fixed-width formats with year, month, day, hour, minute, second and
+          fraction of second (e.g. '%d.%m.%Y %H:%M:%S', '%Y%m%d%H%M', or quoted TOA5
+          timestamps '"%Y-%m-%d %H:%M:%S"') are converted directly from the digits
+          at fixed positions, for all rows at once. Rows that do not fit (e.g. single
+          digit months) are parsed with pd.to_datetime.
+
+    In addition, EPOCH_FORMAT ('%s') parses seconds since 1970-01-01 (can have decimals).
+    """
+    if timestamp_format == EPOCH_FORMAT:
+        seconds = to_float_array(values)
+        with np.errstate(invalid='ignore'):
+            seconds[~((seconds > pd.Timestamp.min.value / 1e9) & (seconds < pd.Timestamp.max.value / 1e9))] = np.nan
+        return pd.Series(pd.to_datetime(seconds, unit='s'), index=values.index, name=values.name)
+
+    tokens = _compile_format(timestamp_format)
+    if not tokens \
+            or _is_iso_format(timestamp_format) \
+            or pd.api.types.infer_dtype(values, skipna=True) != 'string' \
+            or values.iloc[:1000].nunique(dropna=False) * 20 < len(values.iloc[:1000]):
+        return pd.to_datetime(values, format=timestamp_format, errors='coerce', cache=True)
+
+    strings = values.to_numpy()
+    try:
+        # One byte per character, missing values become b'nan' or b'None' and are not parsed
+        strings = np.asarray(strings, dtype=bytes)
+    except UnicodeEncodeError:
+        strings = np.asarray(strings, dtype=str)
+    timestamps, parsed = _parse_fixed_width(strings=strings, tokens=tokens)
+
+    # Remaining strings
+    remaining = ~parsed
+    if remaining.any():
+        parsed_remaining = pd.to_datetime(pd.Series(values.to_numpy()[remaining], dtype=object),
+                                          format=timestamp_format, errors='coerce', cache=True)
+        if parsed_remaining.dtype != 'datetime64[ns]':
+            # E.g. timezones in timestamps
+            return pd.to_datetime(values, format=timestamp_format, errors='coerce', cache=True)
+        timestamps[remaining] = parsed_remaining.to_numpy().view('int64')
+
+    return pd.Series(timestamps.view('datetime64[ns]'), index=values.index, name=values.name)
+
+
+def _is_iso_format(timestamp_format: str) -> bool:
+    """True for ISO 8601 formats, same rules as pandas"""
+    for date_sep in [' ', '/', '\\', '-', '.', '']:
+        for time_sep in [' ', 'T']:
+            for fraction in ['', '%z', '.%f', '.%f%z']:
+                iso_format = f"%Y{date_sep}%m{date_sep}%d{time_sep}%H:%M:%S{fraction}"
+                if iso_format.startswith(timestamp_format) and timestamp_format != '%Y%m':
+                    return True
+    return False
+
+
+def _compile_format(timestamp_format: str) -> list or None:
+    """Split timestamp format into literal characters and fixed-width directives
+
+    Returns:
+        list of ('directive', name, width) and ('literal', character, 1) tuples,
+        None if the format cannot be parsed from fixed-width strings
+    """
+    if timestamp_format in _compiled_formats:
+        return _compiled_formats[timestamp_format]
+    compiled = []
+    directives = []
+    for kind, value in split_datetime_format(timestamp_format):
+        if kind == 'literal':
+            compiled.extend(('literal', char, 1) for char in value)
+        elif value in _fixed_widths:
+            compiled.append(('directive', value, _fixed_widths[value]))
+            directives.append(value)
+        elif value == 'f':
+            compiled.append(('directive', value, 0))  # Width depends on string
+            directives.append(value)
+        else:
+            compiled = None
+            break
+    if compiled is not None:
+        if len(set(directives)) != len(directives) \
+                or not {'Y', 'm', 'd'}.issubset(directives) \
+                or ('f' in directives and compiled[-1][1] != 'f'):
+            compiled = None
+    _compiled_formats[timestamp_format] = compiled
+    return compiled
+
+
+def _parse_fixed_width(strings: np.ndarray, tokens: list) -> tuple[np.ndarray, np.ndarray]:
+    """Parse strings that fit the fixed-width format, from the digits at fixed positions
+
+    Strings with other lengths, other characters or values out of range (e.g. month 13
+    or second 60) are not parsed, pd.to_datetime decides how to handle them.
+
+    Returns:
+        timestamps as int64 nanoseconds since epoch, and boolean array that is True
+        for strings that were parsed
+    """
+    timestamps = np.zeros(len(strings), dtype='int64')
+    parsed = np.zeros(len(strings), dtype=bool)
+    if not len(strings) or not strings.dtype.itemsize:
+        return timestamps, parsed
+
+    # Characters as integers, one row per string, strings are padded with zeros
+    chars = strings.view('uint8' if strings.dtype.kind == 'S' else 'uint32').reshape(len(strings), -1)
+    width = sum(w for _, _, w in tokens)
+    has_fraction = tokens[-1] == ('directive', 'f', 0)
+
+    for length in range(width + 1, width + 10) if has_fraction else [width]:
+        if length > chars.shape[1]:
+            break
+        # Strings with this length, characters at other positions are checked below
+        rows = chars[:, length - 1] != 0
+        if length < chars.shape[1]:
+            rows &= chars[:, length] == 0
+        rows = np.flatnonzero(rows)
+        if not len(rows):
+            continue
+        # One row per character position, contiguous for fast column operations
+        sub = np.ascontiguousarray((chars if len(rows) == len(chars) else chars[rows])[:, :length].T)
+        zero = chars.dtype.type(ord('0'))
+        ok = np.ones(len(rows), dtype=bool)
+        values = {}
+        pos = 0
+        for kind, value, w in tokens:
+            if value == 'f':
+                w = length - width
+            if kind == 'directive':
+                number = np.zeros(len(rows), dtype='int64')
+                for col in range(pos, pos + w):
+                    digit = sub[col] - zero  # Characters other than digits wrap around to large numbers
+                    ok &= digit <= 9
+                    number = number * 10 + digit
+                values[value] = number * 10 ** (9 - w) if value == 'f' else number
+            else:
+                ok &= sub[pos] == ord(value)
+            pos += w
+
+        year, month, day = values['Y'], values['m'], values['d']
+        hour, minute, second = (values.get(d, 0) for d in 'HMS')
+        ok &= valid_dates(year=year, month=month, day=day) & (year < YEAR_MAX)
+        ok &= (hour <= 23) & (minute <= 59) & (second <= 59)
+        ns = days_from_civil(year=np.where(ok, year, 1970), month=np.where(ok, month, 1), day=np.where(ok, day, 1)) \
+             * NS_PER_DAY + hour * NS_PER_HOUR + minute * NS_PER_MINUTE + second * 10 ** 9 + values.get('f', 0)
+        timestamps[rows[ok]] = ns[ok]
+        parsed[rows[ok]] = True
+
+    return timestamps, parsed
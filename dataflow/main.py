@@ -5,9 +5,9 @@
 # https://docs.influxdata.com/influxdb/cloud/tools/client-libraries/python/#query-data-from-influxdb-with-python
 import datetime as dt
 import fnmatch
+import time
 # Ignore future warnings for pandas 3.0
 import warnings
-from itertools import chain
 from pathlib import Path
 
 import pandas as pd
@@ -22,26 +22,32 @@ warnings.simplefilter(action='ignore', category=FutureWarning)
 try:
     # For CLI
     from .filescanner.filescanner import FileScanner
+    from .filescanner.manifest import ScanManifest
+    from .filescanner.fingerprint import Fingerprinter
     from .filetypereader.filetypereader import FileTypeReader
-    from .filetypereader.funcs import get_conf_filetypes, read_configfile, remove_unnamed_cols, \
-        rename_unnamed_units, add_units_row, remove_index_duplicates, sort_timestamp, sanitize_data, \
-        remove_bad_data_rows, remove_orig_timestamp_cols, combine_duplicate_cols
+    from .filetypereader.filecache import ParsedFileCache
+    from .filetypereader.funcs import get_conf_filetypes, read_configfile, build_columns, \
+        remove_index_duplicates, sort_timestamp, sanitize_data, \
+        remove_bad_data_rows, remove_orig_timestamp_cols, combine_duplicate_cols, to_float32, to_float64
     from .common import logger, cli, logblocks
     from .common.times import make_run_id, DetectFrequency, add_timezone_to_timestamp
     from .rawfuncs import ch_cha, ch_fru, common
-    from .filetypereader.special_format_alternating import special_format_alternating
+    from .filetypereader.special_format_alternating import special_format_alternating, data_vars_key
     from .filetypereader.special_format_icosseq import special_format_icosseq
 except ImportError:
     # For local machine
     from filescanner.filescanner import FileScanner
+    from filescanner.manifest import ScanManifest
+    from filescanner.fingerprint import Fingerprinter
     from filetypereader.filetypereader import FileTypeReader
-    from dataflow.filetypereader.funcs import get_conf_filetypes, read_configfile, remove_unnamed_cols, \
-        rename_unnamed_units, add_units_row, remove_index_duplicates, sort_timestamp, sanitize_data, \
-        remove_bad_data_rows, remove_orig_timestamp_cols, combine_duplicate_cols
+    from filetypereader.filecache import ParsedFileCache
+    from dataflow.filetypereader.funcs import get_conf_filetypes, read_configfile, build_columns, \
+        remove_index_duplicates, sort_timestamp, sanitize_data, \
+        remove_bad_data_rows, remove_orig_timestamp_cols, combine_duplicate_cols, to_float32, to_float64
     from common import logger, cli, logblocks
     from common.times import make_run_id, DetectFrequency, add_timezone_to_timestamp
     from rawfuncs import ch_cha, ch_fru, common
-    from filetypereader.special_format_alternating import special_format_alternating
+    from filetypereader.special_format_alternating import special_format_alternating, data_vars_key
     from filetypereader.special_format_icosseq import special_format_icosseq
 
 pd.set_option('display.width', 1000)
@@ -68,6 +74,10 @@ tags = [
     'offset'
 ]
 
+# Number of fingerprints of processed files that are remembered in watch mode (dedup),
+# the oldest fingerprints are removed first
+watch_max_fingerprints = 100_000
+
 
 class DataFlow:
 
@@ -84,7 +94,20 @@ class DataFlow:
             newestfiles: int = 0,
             nrows: int = None,
             testupload: bool = False,
-            ingest: bool = True
+            ingest: bool = True,
+            incremental: bool = False,
+            scanthreads: int = 0,
+            datefrom: dt.datetime = None,
+            dateto: dt.datetime = None,
+            stream: bool = False,
+            watch: bool = False,
+            dedup: bool = False,
+            greenlitonly: bool = False,
+            chunksize: int = 0,
+            cachedir: str = None,
+            cachesize: float = 10,
+            mmap: bool = False,
+            float32: bool = False
     ):
 
         # Args
@@ -100,6 +123,19 @@ class DataFlow:
         self.nrows = nrows
         self.testupload = testupload  # If True, upload data to 'a' bucket in database
         self.ingest = ingest  # If False, the upload part of the script will be skipped
+        self.incremental = incremental  # If True, only new or changed files are processed
+        self.scanthreads = scanthreads  # Number of threads FileScanner uses to list folders, 0 = serial
+        self.datefrom = datefrom  # Only year/month folders within this date range are scanned
+        self.dateto = dateto
+        self.stream = stream  # If True, files are uploaded while FileScanner is still searching for more files
+        self.watch = watch  # If True, new files are uploaded as soon as they arrive, until interrupted
+        self.dedup = dedup  # If True, files with identical contents are only uploaded once
+        self.greenlitonly = greenlitonly  # If True, only columns defined in the filetype settings are read
+        self.chunksize = chunksize  # Number of rows that are read and uploaded at once, 0 = complete file
+        self.cachedir = Path(cachedir) if cachedir else None  # Folder for cache of formatted data, None = no cache
+        self.cachesize = cachesize  # Maximum size of the cache in GiB
+        self.mmap = mmap  # If True, files are memory-mapped (uncompressed) or decompressed in a thread (gzip)
+        self.float32 = float32  # If True, data are held as float32 until the upload, for all filetypes
 
         # Read configs
         (self.conf_filetypes,
@@ -122,51 +158,124 @@ class DataFlow:
         self.version = get_version(__name__, Path(__file__).parent.parent)  # Single source of truth for version
         self._log_start()
 
+        # Manifest of already scanned and uploaded files, only used for incremental runs
+        self.manifest = ScanManifest(filepath=self._manifest_filepath(),
+                                     conf_filetypes=self.conf_filetypes) \
+            if self.incremental else None
+
         # Inititate variable for connection to database, only filled if varscanner is executed
         # self.dbc = None
 
+        self.client = None  # Connection to database
         self.filepath_filescanner_filetypes_df = None  # Found files with defined filetypes
         self.filescanner_filetypes_df = pd.DataFrame()  # Collect info about found files
         self.varscanner_df = pd.DataFrame()  # Collect info for each variable
         self.filedata_details_df = pd.DataFrame()  # Collect info about data for each file
         self.vars_empty_not_uploaded = []  # Variables that were found to contain no data
+        self.seen_fingerprints = {}  # (Filetype, fingerprint) of uploaded files (keys, in order), only used for dedup
+        # Fingerprints are shared by the scan and the watch, same limit as seen_fingerprints in watch mode
+        self.fingerprinter = Fingerprinter(maxsize=watch_max_fingerprints if self.watch else None) \
+            if self.dedup else None
+        self.watch_since_ns = None  # Start of the first scan, files modified since then are watched
+        self.watch_unique_vars = set()  # Raw variable names that were already stored to CSV in watch mode
+
+        # Cache of formatted data of files, only used if cachedir is given
+        self.filecache = ParsedFileCache(cachedir=self.cachedir, maxsize=int(self.cachesize * 1024 ** 3)) \
+            if self.cachedir else None
 
         self.run()
 
     def run(self):
-        self.filescanner_filetypes_df, self.filepath_filescanner_filetypes_df = self._filescanner()
+        if self.watch:
+            # Files written while the first scan is running are found by the watch
+            self.watch_since_ns = time.time_ns()
 
-        # Check if any files were found
-        if len(self.filescanner_filetypes_df) == 0:
-            self.log.info(f"(!)No files found for filegroup {self.filegroup} in folder {self.dir_source}.")
+        if self.stream and self.newestfiles:
+            self.log.info(f"(!)Streaming is not possible when only the newest files are considered "
+                          f"(newestfiles={self.newestfiles}), files are scanned first.")
+
+        if self.stream and not self.newestfiles:
+            self._filescanner_varscanner_stream()
         else:
-            self._varscanner()
+            self.filescanner_filetypes_df, self.filepath_filescanner_filetypes_df = self._filescanner()
 
-    def _filescanner(self) -> tuple[pd.DataFrame, Path]:
-        """Call FileScanner"""
+            # Check if any files were found
+            if len(self.filescanner_filetypes_df) == 0:
+                self.log.info(f"(!)No files found for filegroup {self.filegroup} in folder {self.dir_source}.")
+            else:
+                self._varscanner()
+
+        if self.watch:
+            self._watch()
+
+        if self.manifest:
+            self.manifest.close()
+
+    def _init_filescanner(self) -> FileScanner:
         self.log.info(f"")
         self.log.info(f"Calling FileScanner ...")
-        filescanner = FileScanner(dir_src=self.dir_source,
-                                  site=self.site,
-                                  datatype=self.datatype,
-                                  filegroup=self.filegroup,
-                                  filelimit=self.filelimit,
-                                  newestfiles=self.newestfiles,
-                                  conf_filetypes=self.conf_filetypes,
-                                  logger=self.log,
-                                  testupload=self.testupload)
+        return FileScanner(dir_src=self.dir_source,
+                           site=self.site,
+                           datatype=self.datatype,
+                           filegroup=self.filegroup,
+                           filelimit=self.filelimit,
+                           newestfiles=self.newestfiles,
+                           conf_filetypes=self.conf_filetypes,
+                           logger=self.log,
+                           testupload=self.testupload,
+                           manifest=self.manifest,
+                           scanthreads=self.scanthreads,
+                           datefrom=self.datefrom,
+                           dateto=self.dateto,
+                           fingerprint=self.dedup,
+                           fingerprinter=self.fingerprinter)
+
+    def _filescanner(self) -> tuple[pd.DataFrame, Path]:
+        """Call FileScanner"""
+        filescanner = self._init_filescanner()
         filescanner.run()
         filescanner_df = filescanner.get_results()
 
+        # Files with found filetype
+        filescanner_filetypes_df = filescanner_df.loc[filescanner_df['config_filetype'] != '-not-defined-', :].copy()
+        filescanner_filetypes_df = \
+            filescanner_filetypes_df[~filescanner_filetypes_df['filename'].duplicated(keep='first')]
+
+        # Files with identical contents (and the same filetype) are only processed once, the first file is used
+        if self.dedup:
+            fingerprints = filescanner_filetypes_df['fingerprint']
+            _duplicate = filescanner_filetypes_df.duplicated(subset=['config_filetype', 'fingerprint'], keep='first') \
+                         & fingerprints.notna()
+            self.log.info(f"FILESCANNER skipping {_duplicate.sum()} files with contents identical to other files.")
+            for rix, row in filescanner_filetypes_df[_duplicate].iterrows():
+                self.log.info(f"    {row['filepath']}  (fingerprint {row['fingerprint']})")
+            filescanner_filetypes_df = filescanner_filetypes_df[~_duplicate]
+            _fingerprinted = filescanner_filetypes_df[fingerprints.notna()]
+            self.seen_fingerprints.update(dict.fromkeys(zip(_fingerprinted['config_filetype'],
+                                                            _fingerprinted['fingerprint'])))
+
+        # Incremental run: skip files that were already uploaded and did not change since
+        if self.manifest:
+            _uploaded = [self.manifest.is_uploaded(filepath=fp) for fp in filescanner_filetypes_df['filepath']]
+            _uploaded = pd.Series(_uploaded, index=filescanner_filetypes_df.index, dtype=bool)
+            self.log.info(f"FILESCANNER skipping {_uploaded.sum()} files that were already uploaded "
+                          f"in a previous run and did not change since (manifest: {self.manifest.filepath}).")
+            filescanner_filetypes_df = filescanner_filetypes_df[~_uploaded]
+
+        filepath_filescanner_filetypes_df = self._store_filescanner_csv(
+            filescanner_df=filescanner_df, filescanner_filetypes_df=filescanner_filetypes_df)
+
+        return filescanner_filetypes_df, filepath_filescanner_filetypes_df
+
+    def _store_filescanner_csv(self, filescanner_df: pd.DataFrame, filescanner_filetypes_df: pd.DataFrame) -> Path:
+        """Store info about found files to CSV files"""
+
         # All found files
         outfile = self.dir_out_run / f"1-0_{self.run_id}_filescanner.csv"
         filescanner_df.to_csv(outfile, index=False)
 
         # Files with found filetype
-        filepath_filescanner_filetypes_df = self.dir_out_run / f"1-1_{self.run_id}_filescanner_filetypes.csv"
-        filescanner_filetypes_df = filescanner_df.loc[filescanner_df['config_filetype'] != '-not-defined-', :].copy()
-        filescanner_filetypes_df = \
-            filescanner_filetypes_df[~filescanner_filetypes_df['filename'].duplicated(keep='first')]
+        filepath_filescanner_filetypes_df = self._filepath_filescanner_filetypes()
         filescanner_filetypes_df.to_csv(filepath_filescanner_filetypes_df, index=False)
 
         self.log.info(f"FILESCANNER found a filetype for "
@@ -183,16 +292,120 @@ class DataFlow:
         ignored = list(map(lambda x: x.endswith('-IGNORE'), filescanner_df['config_filetype']))
         filescanner_df[ignored].to_csv(outfile, index=False)
 
-        return filescanner_filetypes_df, filepath_filescanner_filetypes_df
+        return filepath_filescanner_filetypes_df
 
-    def _varscanner(self):
-        """Scan files found by 'filescanner' for variables and upload to database
+    def _filepath_filescanner_filetypes(self) -> Path:
+        return self.dir_out_run / f"1-1_{self.run_id}_filescanner_filetypes.csv"
+
+    def _filescanner_varscanner_stream(self):
+        """Scan files and upload data while the scan is still running
 
+        Each file is uploaded as soon as FileScanner found a filetype for it,
+        which means that reading and uploading data overlap with the search
+        for more files. Info about found files is stored after the scan.
         """
+        self.filepath_filescanner_filetypes_df = self._filepath_filescanner_filetypes()
+        filescanner = self._init_filescanner()
+        self._connect_db()
+
+        processed = set()
+        seen_filenames = set()
+        for newfile in filescanner.iter_files():
+            if newfile['config_filetype'] == '-not-defined-':
+                continue
 
-        # Establish connection to database
-        # self.dbc = dbcInflux(dirconf=str(self.dirconf))
+            # Files with the same filename are only processed once, the first found file is used
+            if newfile['filename'] in seen_filenames:
+                continue
+            seen_filenames.add(newfile['filename'])
+
+            # Files with identical contents are only processed once, the first found file is used
+            if self._duplicate_contents(newfile=newfile):
+                continue
+
+            # Incremental run: skip files that were already uploaded and did not change since
+            if self.manifest and self.manifest.is_uploaded(filepath=newfile['filepath']):
+                self.log.info(f"(!)Skipping file {newfile['filepath']} because it was already uploaded.")
+                continue
+
+            processed.add(newfile['filepath'])
+            self._upload_file(file_info=newfile)
+
+        filescanner.finalize()
+        filescanner_df = filescanner.get_results()
+        self.filescanner_filetypes_df = filescanner_df[filescanner_df['filepath'].isin(processed)]
+        self._store_filescanner_csv(filescanner_df=filescanner_df,
+                                    filescanner_filetypes_df=self.filescanner_filetypes_df)
+
+        if not processed:
+            self.log.info(f"(!)No files found for filegroup {self.filegroup} in folder {self.dir_source}.")
+        else:
+            # Store info about filetypes and found variables to CSV files
+            self._store_info_csv()
+
+    def _watch(self):
+        """Upload new and changed files as soon as they arrive in the source folder, until interrupted
 
+        Files that were found during the previous scan are already uploaded, files
+        that were written while the scan was running are found by the watch. Info about
+        filetypes and found variables is appended to the CSV files after each uploaded
+        file and is then not kept in memory.
+        """
+        filescanner = self._init_filescanner()
+        if not self.client:
+            self._connect_db()
+
+        # Info from the previous scan was already stored to CSV files
+        if not self.varscanner_df.empty:
+            self.watch_unique_vars.update(self.varscanner_df['raw_varname'])
+        self.varscanner_df = pd.DataFrame()
+        self.filedata_details_df = pd.DataFrame()
+
+        try:
+            for newfile in filescanner.watch(since_ns=self.watch_since_ns):
+                if newfile['config_filetype'] == '-not-defined-':
+                    self.log.info(f"(!)No filetype defined for new file {newfile['filepath']}, file is skipped.")
+                    continue
+                if self._duplicate_contents(newfile=newfile):
+                    continue
+                # Files that were uploaded during the scan and did not change since
+                if self.manifest and self.manifest.is_uploaded(filepath=newfile['filepath']):
+                    filescanner.forget(filepath=newfile['filepath'])
+                    continue
+                try:
+                    self._upload_file(file_info=newfile)
+                    self._append_info_csv()
+                except Exception as e:
+                    # One erroneous file does not stop the watch, the file is uploaded again if it changes
+                    self.log.exception(f"### (!)ERROR: file {newfile['filepath']} could not be uploaded "
+                                       f"and is skipped: {e}")
+                    self.varscanner_df = pd.DataFrame()
+                    self.filedata_details_df = pd.DataFrame()
+                    continue
+                if self.manifest and self.manifest.is_uploaded(filepath=newfile['filepath']):
+                    # Uploaded files are known from the manifest, the watcher does not need to remember them
+                    filescanner.forget(filepath=newfile['filepath'])
+        except KeyboardInterrupt:
+            self.log.info(f"Stopped watching {self.dir_source}.")
+
+    def _duplicate_contents(self, newfile: dict) -> bool:
+        """Check if a file with identical contents and the same filetype was already processed, only used for dedup"""
+        fingerprint = newfile.get('fingerprint', None)
+        if not self.dedup or not fingerprint:
+            return False
+        key = (newfile['config_filetype'], fingerprint)
+        if key in self.seen_fingerprints:
+            self.log.info(f"(!)Skipping file {newfile['filepath']} because a file with identical contents "
+                          f"and the same filetype was already processed (fingerprint {fingerprint}).")
+            return True
+        self.seen_fingerprints[key] = None
+        if self.watch and len(self.seen_fingerprints) > watch_max_fingerprints:
+            # Watch runs indefinitely, only the fingerprints of the most recent files are kept
+            del self.seen_fingerprints[next(iter(self.seen_fingerprints))]
+        return False
+
+    def _connect_db(self):
+        """Establish connection to database"""
         self.client = InfluxDBClient(url=self.conf_db['url'], token=self.conf_db['token'], org=self.conf_db['org'],
                                      timeout=999_000, enable_gzip=True)
         # self.client = get_client(conf_db=self.conf_db)
@@ -203,33 +416,152 @@ class DataFlow:
                                        filescanner_df_outfilepath=self.filepath_filescanner_filetypes_df,
                                        logfile_name=self.logfile_name)
 
+    def _varscanner(self):
+        """Scan files found by 'filescanner' for variables and upload to database
+
+        """
+
+        # Establish connection to database
+        # self.dbc = dbcInflux(dirconf=str(self.dirconf))
+        self._connect_db()
+
         for file_ix, file_info in self.filescanner_filetypes_df.iterrows():
+            self._upload_file(file_info=file_info)
 
-            config_filetype = file_info['config_filetype']
-            filetypeconf = self.conf_filetypes[config_filetype]
-            filepath = file_info['filepath']
+        # Store info about filetypes and found variables to CSV files
+        self._store_info_csv()
 
-            # Check if filetype is allowed for varscanner, if not then continue with next filetype in for-loop
-            ok = self._check_filetype_allowed(config_filetype=config_filetype)
-            if not ok:
-                self.log.info(f"### (!)WARNING: filetype {config_filetype} is not allowed "
-                              f"and will be skipped.")
-                continue
+    def _upload_file(self, file_info):
+        """Read data file, format data and upload variables to database
 
-            # Skip files w/ filesize zero
-            ok = self._check_filesize_zero(filesize=file_info['filesize'],
-                                           filepath=filepath)
-            if not ok:
-                continue  # Continue with next file in for-loop
+        Args:
+            file_info: info about the file from FileScanner, row of the results
+                dataframe or record yielded by FileScanner.iter_files
+        """
+        config_filetype = file_info['config_filetype']
+        filetypeconf = self.conf_filetypes[config_filetype]
+        filepath = file_info['filepath']
+
+        # Check if filetype is allowed for varscanner, if not then continue with next file
+        ok = self._check_filetype_allowed(config_filetype=config_filetype)
+        if not ok:
+            self.log.info(f"### (!)WARNING: filetype {config_filetype} is not allowed "
+                          f"and will be skipped.")
+            return
+
+        # Skip files w/ filesize zero
+        ok = self._check_filesize_zero(filesize=file_info['filesize'],
+                                       filepath=filepath,
+                                       filesize_uncompressed=file_info.get('filesize_uncompressed', None))
+        if not ok:
+            self._mark_uploaded(filepath=filepath)  # Nothing to upload, no need to check again
+            return  # Continue with next file
+
+        # Formatted data from cache, otherwise read data file with config for this filetype
+        # Files that are read in chunks are not cached, the key (hash of the complete file) is not needed
+        cachekey = self.filecache.key(filepath=filepath, filetypeconf=filetypeconf,
+                                      nrows=self.nrows, greenlitonly=self.greenlitonly, float32=self.float32) \
+            if self.filecache and not self._read_chunksize(filetypeconf=filetypeconf) else None
+        cached = self.filecache.load(key=cachekey) if cachekey else None
+        if cached:
+            self.log.info(f">>> Loading formatted data of file {filepath} from cache ...")
+            file_data = [(cached['dfs'], cached['missed_ids'])]
+        else:
+            filetypereader = self._readfile(filepath=filepath,
+                                            config_filetype=config_filetype,
+                                            filetypeconf=filetypeconf)
+            file_data = self._iter_formatted_data(filetypereader=filetypereader,
+                                                  filetypeconf=filetypeconf,
+                                                  config_filetype=config_filetype)
+
+        # todo from loopvars in dbc
+        # todo include dbc here?
+
+        # write_api = get_write_api(client=client)
+
+        # The WriteApi in batching mode (default mode) is suppose to run as a singleton.
+        # To flush all your data you should wrap the execution using with
+        # client.write_api(...) as write_api: statement or call write_api.close()
+        # at the end of your script.
+        # https://influxdb-client.readthedocs.io/en/stable/usage.html#write
+        # https://influxdb-client.readthedocs.io/en/stable/usage.html#batching
+        # Batches that failed after all retries are not raised by the batching WriteApi,
+        # they are collected with the error callback (file is then not marked as uploaded)
+        failed_batches = []
+
+        def batch_failed(conf, data, exception) -> None:
+            failed_batches.append(exception)
+            self.log.info(f"### (!)ERROR: batch of file {filepath} could not be written to "
+                          f"bucket {conf[0]}: {exception}")
+
+        with self.client.write_api(
+                write_options=WriteOptions(batch_size=5_000,  # the number of data point to collect in a batch
+                                           flush_interval=1_000,
+                                           # the number of milliseconds before the batch is written
+                                           # flush_interval=10_000,
+                                           jitter_interval=0,
+                                           # the number of milliseconds to increase the batch flush interval by a random amount
+                                           retry_interval=5_000,
+                                           max_retries=5,
+                                           max_retry_delay=30_000,
+                                           exponential_base=2),
+                error_callback=batch_failed) as write_api:
+            # with self.write_api as write_api:
+
+            # Info from previous chunks of the same file
+            n_chunks = 0
+            details_start = len(self.filedata_details_df.index)
+            varscanner_start = len(self.varscanner_df.index)
+            chunk_freqs = {}
+
+            # Data of the complete file, or chunks of rows if chunksize is given
+            for file_df, missed_ids in file_data:
+                n_chunks += 1
+                skipped_columns = None
+                if n_chunks == 1:
+                    skipped_columns = [tuple(col) for col in cached['skipped_columns']] if cached \
+                        else filetypereader.get_skipped_columns()
+
+                # Files that were read completely are cached, before data are changed during upload
+                if cachekey and not cached:
+                    self.filecache.store(key=cachekey, dfs=file_df,
+                                         missed_ids=missed_ids, skipped_columns=skipped_columns)
 
-            # Read data file with config for this filetype
-            file_df = self._readfile(filepath=filepath,
-                                     config_filetype=config_filetype,
-                                     filetypeconf=filetypeconf)
+                self._loop_file_dataframes(
+                    filename=file_info['filename'],
+                    file_df=file_df,
+                    filetypeconf=filetypeconf,
+                    config_filetype=config_filetype,
+                    db_bucket=file_info['db_bucket'],
+                    missed_ids=missed_ids,
+                    write_api=write_api,
+                    skipped_columns=skipped_columns,
+                    chunk_freqs=chunk_freqs)
+
+        # One entry per file and variable, also if the file was uploaded in chunks
+        if n_chunks > 1:
+            self._merge_chunk_info(details_start=details_start, varscanner_start=varscanner_start)
+
+        # Only files where all data were written are uploaded, others are uploaded again in the next run
+        if failed_batches:
+            self.log.info(f"### (!)WARNING: {len(failed_batches)} batch(es) of file {filepath} could not be "
+                          f"written to the database, file is not marked as uploaded.")
+            return
+        self._mark_uploaded(filepath=filepath)
+
+    def _iter_formatted_data(self, filetypereader, filetypeconf, config_filetype):
+        """Formatted data of a file
+
+        Yields:
+            list of formatted dataframes and missed IDs, for the complete
+            file or for each chunk of rows if chunksize is given
+        """
+        for file_df in filetypereader.iter_data():
 
             # Remove rows that do not contain a timestamp
             no_date = file_df.index.isnull()
-            file_df = file_df.loc[file_df.index[~no_date]]
+            if no_date.any():
+                file_df = file_df.loc[~no_date]
 
             # Skip empty dataframes
             # It is possible that a file contains data that result in an empty dataframe,
@@ -252,41 +584,41 @@ class DataFlow:
             # Special formats can return two dataframes stored in a list, make consistent
             file_df = [file_df] if not isinstance(file_df, list) else file_df
 
-            # todo from loopvars in dbc
-            # todo include dbc here?
-
-            # write_api = get_write_api(client=client)
-
-            # The WriteApi in batching mode (default mode) is suppose to run as a singleton.
-            # To flush all your data you should wrap the execution using with
-            # client.write_api(...) as write_api: statement or call write_api.close()
-            # at the end of your script.
-            # https://influxdb-client.readthedocs.io/en/stable/usage.html#write
-            # https://influxdb-client.readthedocs.io/en/stable/usage.html#batching
-            with self.client.write_api(
-                    write_options=WriteOptions(batch_size=5_000,  # the number of data point to collect in a batch
-                                               flush_interval=1_000,
-                                               # the number of milliseconds before the batch is written
-                                               # flush_interval=10_000,
-                                               jitter_interval=0,
-                                               # the number of milliseconds to increase the batch flush interval by a random amount
-                                               retry_interval=5_000,
-                                               max_retries=5,
-                                               max_retry_delay=30_000,
-                                               exponential_base=2)) as write_api:
-                # with self.write_api as write_api:
-
-                self._loop_file_dataframes(
-                    filename=file_info['filename'],
-                    file_df=file_df,
-                    filetypeconf=filetypeconf,
-                    config_filetype=config_filetype,
-                    db_bucket=file_info['db_bucket'],
-                    missed_ids=missed_ids,
-                    write_api=write_api)
-
-        # Store info about filetypes and found variables to CSV files
-        self._store_info_csv()
+            # Format data collection, for each df in list
+            yield [self._format_data(df=df, filetypeconf=filetypeconf) for df in file_df], missed_ids
+
+    def _merge_chunk_info(self, details_start: int, varscanner_start: int) -> None:
+        """Merge info collected for each chunk of a file, starting at the given rows"""
+
+        # Filedata details: one row per dataframe
+        details_df = self.filedata_details_df.iloc[details_start:]
+        agg = {col: 'first' for col in details_df.columns if col != 'dataframe'}
+        agg.update(firstdate='min', lastdate='max', n_datarows='sum', n_vars='max')
+        if 'non_numeric_cols' in details_df:
+            agg['non_numeric_cols'] = lambda cols: ', '.join(dict.fromkeys(col for cols_chunk in cols.dropna()
+                                                                          for col in cols_chunk.split(', ') if col))
+        details_df = details_df.groupby('dataframe', sort=False, as_index=False).agg(agg)
+        self.filedata_details_df = pd.concat([self.filedata_details_df.iloc[:details_start],
+                                              details_df[self.filedata_details_df.columns]],
+                                             axis=0, ignore_index=True)
+
+        # Varscanner: one row per variable, from first to last date across all chunks
+        varscanner_df = self.varscanner_df.iloc[varscanner_start:]
+        if varscanner_df.empty:
+            return
+        keys = ['raw_varname', 'raw_units', 'field', 'data_raw_freq']
+        dates = varscanner_df.groupby(keys, sort=False, dropna=False).agg(first_date=('first_date', 'min'),
+                                                                            last_date=('last_date', 'max'))
+        varscanner_df = varscanner_df.drop_duplicates(subset=keys, keep='first').set_index(keys)
+        varscanner_df[['first_date', 'last_date']] = dates
+        varscanner_df = varscanner_df.reset_index()[self.varscanner_df.columns]
+        self.varscanner_df = pd.concat([self.varscanner_df.iloc[:varscanner_start], varscanner_df],
+                                       axis=0, ignore_index=True)
+
+    def _mark_uploaded(self, filepath) -> None:
+        """Remember in manifest that file was uploaded, skipped for test uploads and runs without ingest"""
+        if self.manifest and self.ingest and not self.testupload:
+            self.manifest.mark_uploaded(filepath=filepath)
 
     def _store_info_csv(self) -> None:
 
@@ -310,20 +642,49 @@ class DataFlow:
             outfile = self.dir_out_run / f"3-3_{self.run_id}_varscanner_vars_not_greenlit.csv"
             self.varscanner_df.loc[self.varscanner_df['greenlit'] == False, :].to_csv(outfile, index=False)
 
+    def _append_info_csv(self) -> None:
+        """Append info about data and variables of the last uploaded file to the CSV files (watch mode)
+
+        Only the new rows are written, the CSV files are not written again completely.
+        The info is then removed from memory.
+        """
+        outfiles = [(self.filedata_details_df, self.dir_out_run / f"2-0_{self.run_id}_filedata_details.csv")]
+        if not self.varscanner_df.empty:
+            # Output found unique variables, only variables that were not found before
+            new_vars = self.varscanner_df[['raw_varname']].drop_duplicates()
+            new_vars = new_vars[~new_vars['raw_varname'].isin(self.watch_unique_vars)]
+            self.watch_unique_vars.update(new_vars['raw_varname'])
+            outfiles += [
+                (self.varscanner_df, self.dir_out_run / f"3-0_{self.run_id}_varscanner.csv"),
+                (new_vars, self.dir_out_run / f"3-1_{self.run_id}_varscanner_vars_unique.csv"),
+                (self.varscanner_df.loc[self.varscanner_df['greenlit'] == False, :],
+                 self.dir_out_run / f"3-3_{self.run_id}_varscanner_vars_not_greenlit.csv")]
+
+        for df, outfile in outfiles:
+            if df.empty:
+                continue
+            if outfile.exists():
+                # Same column order as in the existing file
+                df = df.reindex(columns=pd.read_csv(outfile, nrows=0).columns)
+            df.to_csv(outfile, mode='a', header=not outfile.exists(), index=False)
+
+        self.varscanner_df = pd.DataFrame()
+        self.filedata_details_df = pd.DataFrame()
+
     def _set_data_raw_freq(self, filetypeconf, df_ix) -> str:
         data_raw_freq = filetypeconf['data_raw_freq']
         if isinstance(data_raw_freq, str):
             pass
         elif isinstance(data_raw_freq, list):
-            # Special formats can have two different time resolutions
+            # Special formats can have different time resolutions
             # Special format '-ALTERNATING-' can contain data with different time
-            # resolutions, which are defined as a list in the config file, e.g., [30min, 10min].
+            # resolutions, which are defined as a list in the config file, e.g., [30min, 10min],
+            # one entry per data source.
             # To continue processing, the list element is extracted and returned as string.
             # For all other formats, the time resolution is already defined as a string
             # in the config file.
             if filetypeconf['data_special_format'] == '-ALTERNATING-':
-                data_raw_freq = str(filetypeconf['data_raw_freq'][0]) if df_ix == 0 else str(
-                    filetypeconf['data_raw_freq'][1])
+                data_raw_freq = str(filetypeconf['data_raw_freq'][df_ix])
             else:
                 raise Exception(f"Only -ALTERNATING- filetypes can have a list of time "
                                 f"resolutions, so this settings for 'data_raw_freq' "
@@ -331,21 +692,26 @@ class DataFlow:
         return data_raw_freq
 
     def _loop_file_dataframes(self, filename, file_df, filetypeconf, config_filetype,
-                              db_bucket, missed_ids, write_api):
+                              db_bucket, missed_ids, write_api, skipped_columns=None, chunk_freqs=None):
 
-        # Format data collection, for each df in list
+        # Data collection was already formatted, for each df in list
         for df_ix, df in enumerate(file_df):
-            df = self._format_data(df=df, filetypeconf=filetypeconf)
 
             if df.empty:
                 continue
 
-            # Special format -ALTERNATING- has a second set of data_vars
-            data_vars = filetypeconf['data_vars'].copy() if df_ix == 0 else filetypeconf['data_vars2'].copy()
+            # Special format -ALTERNATING- has one set of data_vars per data source (data_vars2, data_vars3, ...)
+            data_vars = filetypeconf[data_vars_key(source=df_ix)].copy()
 
             data_raw_freq = self._set_data_raw_freq(filetypeconf=filetypeconf, df_ix=df_ix)
 
-            detected_freqs = self._detect_frequency(df=df, data_raw_freq=data_raw_freq)
+            # Files that are uploaded in chunks: time resolution is detected from the first chunk
+            if chunk_freqs is not None and df_ix in chunk_freqs:
+                detected_freqs = chunk_freqs[df_ix]
+            else:
+                detected_freqs = self._detect_frequency(df=df, data_raw_freq=data_raw_freq)
+                if chunk_freqs is not None and len(df.index) > 1:
+                    chunk_freqs[df_ix] = detected_freqs
 
             # Collect info about current data
             cur_filedata_details = {
@@ -365,7 +731,8 @@ class DataFlow:
                 'n_vars': len(df.columns),
                 'db_bucket': db_bucket,
                 'special_format': filetypeconf['data_special_format'],
-                'missed_ids': str(missed_ids)
+                'missed_ids': str(missed_ids),
+                'non_numeric_cols': ', '.join(df.attrs.get('non_numeric_cols', []))
             }
 
             # Merge filedata details info
@@ -400,9 +767,11 @@ class DataFlow:
                         if c in existing_cols:
                             df = df.drop(c, axis=1, inplace=False)
                 # Add new variables calculated with rawfuncs to main dataframe
-                df = pd.concat([df, newdata_df], axis=1).copy()
-                df = df.sort_index(axis=0, inplace=False)
-                df = df.sort_index(axis=1, inplace=False)
+                df = pd.concat([df, newdata_df], axis=1)
+                if not df.index.is_monotonic_increasing:
+                    df = df.sort_index(axis=0, inplace=False)
+                if not df.columns.is_monotonic_increasing:
+                    df = df.sort_index(axis=1, inplace=False)
                 data_vars = {**data_vars, **newdata_vars}  # Merge two dicts
 
             # Loop over variables
@@ -439,6 +808,9 @@ class DataFlow:
                     varcol = (newvar[varcol], newvar['raw_units'])  # Column name to access var in df
                     var_df = df[[varcol]].copy()
 
+                    # Data held as float32 are uploaded as float64 (no change for float64 data)
+                    var_df[varcol] = to_float64(series=var_df[varcol])
+
                     # Apply gain (gain = 1 (float) if no gain is specified in filetype settings)
                     var_df[varcol] = var_df[varcol].multiply(newvar['gain'])
 
@@ -506,6 +878,24 @@ class DataFlow:
                 self.varscanner_df = pd.concat([self.varscanner_df, pd.DataFrame.from_dict([newvar])],
                                                axis=0, ignore_index=True)
 
+            # Columns that were not read (greenlitonly) are listed as not greenlit,
+            # from the header only, data availability is not checked
+            if skipped_columns and df_ix == 0:
+                self.log.info(f"Listing {len(skipped_columns)} columns that were not read "
+                              f"as not greenlit: {[col[0] for col in skipped_columns]}")
+                skipped_vars = [self.create_varentry(rawvar=var,
+                                                     data_vars=data_vars,
+                                                     filetypeconf=filetypeconf,
+                                                     config_filetype=config_filetype,
+                                                     to_bucket=db_bucket,
+                                                     data_raw_freq=data_raw_freq,
+                                                     freq=cur_filedata_details['freq_detected'],
+                                                     first_date=df.index[0],
+                                                     last_date=df.index[-1])
+                                for var in skipped_columns]
+                self.varscanner_df = pd.concat([self.varscanner_df, pd.DataFrame.from_dict(skipped_vars)],
+                                               axis=0, ignore_index=True)
+
             if self.log:
                 self.log.info(f"\n")
                 self.log.info(f"*** FINISHED DATA UPLOAD FOR FILETYPE {newvar['config_filetype']}.")
@@ -529,6 +919,9 @@ class DataFlow:
         if rawfunc_cols:
             rawfunc_df = df[rawfunc_cols].copy()
 
+            # Functions calculate with float64 (e.g. T**4 in calc_lwin), also if data are held as float32
+            rawfunc_df = rawfunc_df.apply(to_float64)
+
             if not rawfunc_df.empty:
                 # Apply functions to raw data and update metadata
                 newdata_df, newdata_vars = self._execute_rawfuncs(
@@ -831,59 +1224,65 @@ class DataFlow:
         if filetypeconf['data_special_format'] == '-ICOSSEQ-':
             file_df = special_format_icosseq(df=file_df, filetype=config_filetype)
         elif filetypeconf['data_special_format'] == '-ALTERNATING-':
+            # Returns one dataframe per data source in list, and IDs that are not defined in the config
+            file_df, missed_ids = special_format_alternating(data_df=file_df,
+                                                             goodrows_col=filetypeconf['data_keep_good_rows'][0],
+                                                             goodrows_ids=filetypeconf['data_keep_good_rows'][1:],
+                                                             filetypeconf=filetypeconf)
 
-            goodrows_ids = filetypeconf['data_keep_good_rows'][1:]
-
-            # Scan data to detect potentially unknown IDs that identify data rows.
-            missed_ids = self._check_special_format_alternating_missed_ids(file_df=file_df,
-                                                                           goodrows_ids=goodrows_ids)
-
-            file_df = special_format_alternating(data_df=file_df,
-                                                 goodrows_col=filetypeconf['data_keep_good_rows'][0],
-                                                 goodrows_ids=goodrows_ids,
-                                                 filetypeconf=filetypeconf)  # Returns two dataframes in list
-
-        # Return as list to be consistent, -ALTERNATING- creates a list of two dataframes
+        # Return as list to be consistent, -ALTERNATING- creates a list of dataframes
         file_df = [file_df] if not isinstance(file_df, list) else file_df
         return file_df, missed_ids
 
     def _format_data(self, df, filetypeconf) -> pd.DataFrame:
+        """Format data of a file, with pandas copy-on-write
+
+        Copy-on-write is only enabled here (not for other code that imports this
+        module): data that are not changed are then not copied by the formatting steps.
+        The columns of the dataframe that is passed are replaced (it is changed).
+        """
+        with pd.option_context('mode.copy_on_write', True):
+            # Sort index of collected data
+            df = sort_timestamp(df=df)
+
+            # Remove duplicate entries (same timestamp)
+            df = remove_index_duplicates(data=df, keep='last')
 
-        # Sort index of collected data
-        df = sort_timestamp(df=df)
+            # Convert data to float, values that are not numbers (e.g. in bad data rows) become missing values
+            df, non_numeric_cols = self._to_numeric(df=df)
 
-        # Remove duplicate entries (same timestamp)
-        df = remove_index_duplicates(data=df, keep='last')
+            # Remove bad data rows
+            badrows_col = None if not filetypeconf['data_remove_bad_rows'] \
+                else filetypeconf['data_remove_bad_rows'][0]  # Col used to identify rows w/ bad data
+            badrows_ids = None if not filetypeconf['data_remove_bad_rows'] \
+                else filetypeconf['data_remove_bad_rows'][1:]  # ID(s) used to identify rows w/ bad data
+            if badrows_ids:
+                df = remove_bad_data_rows(df=df, badrows_col=badrows_col, badrows_ids=badrows_ids)
 
-        # Convert data to float or string
-        # Columns can be dtype string after this step, which can either be
-        # desired (ICOSSEQ locations), or unwanted (in case of bad data rows)
-        df = self._convert_to_float_or_string(df=df)
+            # Sanitize data, replace inf/-inf with np.nan
+            df = sanitize_data(df)
 
-        df = self._to_numeric(df=df)
+            # Remove original datetime columns that were used to build the timestamp index
+            df = remove_orig_timestamp_cols(df=df)
 
-        # Remove bad data rows
-        badrows_col = None if not filetypeconf['data_remove_bad_rows'] \
-            else filetypeconf['data_remove_bad_rows'][0]  # Col used to identify rows w/ bad data
-        badrows_ids = None if not filetypeconf['data_remove_bad_rows'] \
-            else filetypeconf['data_remove_bad_rows'][1:]  # ID(s) used to identify rows w/ bad data
-        if badrows_ids:
-            df = remove_bad_data_rows(df=df, badrows_col=badrows_col, badrows_ids=badrows_ids)
+            # Columns
+            # df = df.sort_index(axis=1, inplace=False)  # lexsort for better performance
+            df = build_columns(df=df)
+            df = combine_duplicate_cols(df=df)
 
-        # Sanitize data, replace inf/-inf with np.nan
-        df = sanitize_data(df)
+            # Hold data as float32 until the upload (per filetype or for all filetypes)
+            if self.float32 or filetypeconf.get('data_float32', False):
+                df = to_float32(df=df)
 
-        # Remove original datetime columns that were used to build the timestamp index
-        df = remove_orig_timestamp_cols(df=df)
+            # Columns that contained values that are not numbers, for filedata details
+            df.attrs['non_numeric_cols'] = non_numeric_cols
 
-        # Columns
-        # df = df.sort_index(axis=1, inplace=False)  # lexsort for better performance
-        df = add_units_row(df=df)
-        df = rename_unnamed_units(df=df)
-        df = combine_duplicate_cols(df=df)
-        df = remove_unnamed_cols(df=df)
+            return df
 
-        return df
+    def _read_chunksize(self, filetypeconf) -> int or None:
+        """Number of rows that are read at once, None if the complete file is read"""
+        # Special formats need all rows of the file at once
+        return self.chunksize if self.chunksize and not filetypeconf['data_special_format'] else None
 
     def _readfile(self, filepath, config_filetype, filetypeconf):
         # Read data of current file
@@ -894,77 +1293,57 @@ class DataFlow:
         self.log.info(f">>>     filetype: {config_filetype}")
         self.log.info(f">>> ")
         # filetypeconf = self.conf_filetypes[filetype]
-        file_df = FileTypeReader(filepath=filepath,
-                                 filetype=config_filetype,
-                                 filetypeconf=filetypeconf,
-                                 nrows=self.nrows).get_data()
-
-        return file_df
+        chunksize = self._read_chunksize(filetypeconf=filetypeconf)
+        if chunksize:
+            self.log.info(f">>>     reading chunks of {chunksize} rows")
+        filetypereader = FileTypeReader(filepath=filepath,
+                                        filetype=config_filetype,
+                                        filetypeconf=filetypeconf,
+                                        nrows=self.nrows,
+                                        greenlitonly=self.greenlitonly,
+                                        chunksize=chunksize,
+                                        mmap=self.mmap)
+        return filetypereader
 
     @staticmethod
-    def _to_numeric(df) -> pd.DataFrame:
-        """Make sure all data are numeric"""
-
-        for col in df.columns:
-            try:
-                df[col] = df[col].astype(float)
-            except ValueError as e:
-                df[col] = df[col].apply(pd.to_numeric, errors='coerce')
-        # try:
-        #     df = df.astype(float)  # Crashes if not possible
-        # except ValueError as e:
-        #     df = df.apply(pd.to_numeric, errors='coerce')  # Does not crash
-        return df
+    def _to_numeric(df) -> tuple[pd.DataFrame, list]:
+        """Make sure all data are numeric
 
-    @staticmethod
-    def _check_special_format_alternating_missed_ids(file_df, goodrows_ids) -> str:
-        """Check if there are IDs that were not defined in the filetype config
+        Each column is converted to float as a whole. Columns that cannot be
+        converted directly (e.g. text in some rows) are converted with
+        pd.to_numeric, values that are not numbers then become missing values.
+        Columns are replaced in the dataframe that is passed (isetitem), df is changed.
 
-        In case of special format -ALTERNATING-, there can be multiple integer IDs
-        at the start of each data record, this method checks if there are any new and
-        undefined IDs.
-
-        goodrows_ids can be given like this: [ [ 103, 104, 105 ], [ 203, 204, 205 ] ]
-        or as simple list: goodrows_ids can be given like this: [ 103, 203 ]
+        Returns:
+            data and names of columns that contained values that are not numbers
         """
-        available_ids = file_df['ID'].dropna().unique().tolist()
-        # missed_ids = []
-        # available_ids = [103,203,204,999,6,5,4,5,3,2,1,5,6,5]
-        if all(isinstance(n, int) for n in goodrows_ids):
-            # IDs are provided as list of integers
-            goodrows_ids_flat = goodrows_ids
-        else:
-            # IDs are provided as list of lists
-            goodrows_ids_flat = list(chain.from_iterable(goodrows_ids))
-        missed_ids = [x for x in available_ids if x not in goodrows_ids_flat]
-        missed_ids = 'all IDs defined' if len(missed_ids) == 0 else missed_ids
-        return str(missed_ids)
-
-    def _convert_to_float_or_string(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Convert data to float or string
-
-        Convert each column to best possible data format, either
-        float64 or string. NaNs are not converted to string, they
-        are still recognized as missing after this step.
+        non_numeric_cols = []
+        for ix, col in enumerate(df.columns):
+            values = df.iloc[:, ix]
+            try:
+                numeric = values.astype(float)
+            except (ValueError, TypeError):
+                numeric = pd.to_numeric(values, errors='coerce').astype(float)
+                non_numeric_cols.append(str(col[0]) if isinstance(col, tuple) else str(col))
+            df.isetitem(ix, numeric)
+        return df, non_numeric_cols
+
+    def _check_filesize_zero(self, filesize, filepath, filesize_uncompressed=None):
+        """Skip files w/ filesize zero.
+
+        Gzip files are also skipped if their uncompressed filesize is zero,
+        the uncompressed filesize was detected by FileScanner.
         """
-        df = df.convert_dtypes(infer_objects=False, convert_boolean=False, convert_integer=False)
-
-        _found_dtypes = df.dtypes
-        _is_dtype_string = _found_dtypes == 'string'
-        _num_dtype_string = _is_dtype_string.sum()
-        _dtype_str_colnames = _found_dtypes[_is_dtype_string].index.to_list()
-        _dtype_other_colnames = _found_dtypes[~_is_dtype_string].index.to_list()
-        return df
-
-    def _check_filesize_zero(self, filesize, filepath):
-        """Skip files w/ filesize zero."""
-        # TODO HIER WEITER GZIP uncompressed filesize 0
-
         if filesize == 0:
             logtxt = f"(!)Skipping file {filepath} " \
                      f"because filesize is {filesize}"
             self.log.info(logtxt)
             return False
+        elif pd.notna(filesize_uncompressed) and filesize_uncompressed == 0:
+            logtxt = f"(!)Skipping file {filepath} " \
+                     f"because uncompressed filesize is {filesize_uncompressed} (filesize {filesize})"
+            self.log.info(logtxt)
+            return False
         else:
             return True
 
@@ -1182,6 +1561,10 @@ class DataFlow:
             _key = 'out_dataflow'
         return Path(self.conf_dirs[_key]) / 'runs'
 
+    def _manifest_filepath(self) -> Path:
+        """Manifest is stored next to the output folders of the single runs"""
+        return self.dir_out_run.parent / f"_manifest_{self.site}_{self.datatype}_{self.filegroup}.sqlite"
+
     def _setdirs(self):
         """Set source dir (raw data) and output dir (results, logs)"""
         dir_out_runs = self._set_outdir()
@@ -1258,6 +1641,19 @@ class DataFlow:
         self.log.info(f"         month: {self.month}")
         self.log.info(f"         filelimit: {self.filelimit}")
         self.log.info(f"         newestfiles: {self.newestfiles}")
+        self.log.info(f"         incremental: {self.incremental}")
+        self.log.info(f"         scanthreads: {self.scanthreads}")
+        self.log.info(f"         datefrom: {self.datefrom}")
+        self.log.info(f"         dateto: {self.dateto}")
+        self.log.info(f"         stream: {self.stream}")
+        self.log.info(f"         watch: {self.watch}")
+        self.log.info(f"         dedup: {self.dedup}")
+        self.log.info(f"         greenlitonly: {self.greenlitonly}")
+        self.log.info(f"         chunksize: {self.chunksize}")
+        self.log.info(f"         cachedir: {self.cachedir}")
+        self.log.info(f"         cachesize: {self.cachesize}")
+        self.log.info(f"         mmap: {self.mmap}")
+        self.log.info(f"         float32: {self.float32}")
 
         # args = vars(self.args)
 
@@ -1316,7 +1712,20 @@ def main():
              year=args.year,
              month=args.month,
              filelimit=args.filelimit,
-             newestfiles=args.newestfiles)
+             newestfiles=args.newestfiles,
+             incremental=args.incremental,
+             scanthreads=args.scanthreads,
+             datefrom=args.datefrom,
+             dateto=args.dateto,
+             stream=args.stream,
+             watch=args.watch,
+             dedup=args.dedup,
+             greenlitonly=args.greenlitonly,
+             chunksize=args.chunksize,
+             cachedir=args.cachedir,
+             cachesize=args.cachesize,
+             mmap=args.mmap,
+             float32=args.float32)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,71 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('influxdb_client')
+
+from dataflow.filetypereader.filetypereader import FileTypeReader
+from dataflow.main import DataFlow
+
+
+def _baseline_to_numeric(df) -> pd.DataFrame:
+    """Data converted as before v0.22.0, to nullable dtypes first and then value by value"""
+    df = df.convert_dtypes(infer_objects=False, convert_boolean=False, convert_integer=False)
+    for col in df.columns:
+        try:
+            df[col] = df[col].astype(float)
+        except ValueError:
+            df[col] = df[col].apply(pd.to_numeric, errors='coerce')
+    return df
+
+
+def _assert_same_numbers(df: pd.DataFrame, expected: pd.DataFrame):
+    assert df.dtypes.astype(str).tolist() == expected.dtypes.astype(str).tolist()
+    assert np.array_equal(df.to_numpy(float), expected.to_numpy(float), equal_nan=True)
+
+
+tokens = ['1', '1.5', ' 2.5', '-3', '1e3', 'NaN', 'nan', 'inf', '-inf', 'Infinity', 'abc', '', '1_0', '0x1f', '+4',
+          np.nan, None, '7 ', '1,5', '  ', 'TRUE', '1.2.3', '-', '--', 5, 2.5, '１']
+
+
+def test_to_numeric_same_as_before():
+    rng = np.random.default_rng(23)
+    for _ in range(1000):
+        n = rng.integers(1, 6)
+        values = [tokens[i] for i in rng.integers(0, len(tokens), n)]
+        df = pd.DataFrame({'A': pd.Series(values, dtype=object), 'B': np.arange(n), 'C': np.arange(n) * 0.5})
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            expected = _baseline_to_numeric(df.copy())
+        try:
+            df['A'].astype(float)
+            expected_non_numeric = []
+        except ValueError:
+            expected_non_numeric = ['A']
+        df, non_numeric_cols = DataFlow._to_numeric(df=df.copy())
+        _assert_same_numbers(df, expected)
+        assert non_numeric_cols == expected_non_numeric
+
+
+def test_to_numeric_read_file_same_as_before(tmp_path):
+    rng = np.random.default_rng(23)
+    timestamps = pd.date_range('2024-01-01', periods=2000, freq='min')
+    rows = [f"{t:%Y-%m-%d %H:%M},{v:.2f},{int(v * 10) % 100},{i}" for i, (t, v) in
+            enumerate(zip(timestamps, rng.normal(10, 5, len(timestamps))))]
+    # Bad data row written by the logger after a restart
+    rows[700] = '2024-01-01 11:40,NAN,ERROR,700'
+    filepath = tmp_path / 'meteo.csv'
+    filepath.write_text('\n'.join(['TIMESTAMP,TA,RH,RECORD', '-,degC,%,-'] + rows) + '\n')
+    filetypeconf = dict(filetype_gzip=False, data_skiprows=None, data_headerrows=[0, 1],
+                        data_vars={'TA': {'field': 'TA', 'units': 'degC'}}, data_timestamp_column=0,
+                        data_timestamp_format='%Y-%m-%d %H:%M', data_na_values=[-9999], data_delimiter=',',
+                        data_build_timestamp=None, data_encoding='utf-8', data_special_format=None,
+                        data_remove_bad_rows=None)
+    file_df = FileTypeReader(filepath=str(filepath), filetype='test', filetypeconf=filetypeconf).get_data()
+
+    df, non_numeric_cols = DataFlow._to_numeric(df=file_df.copy())
+    _assert_same_numbers(df, _baseline_to_numeric(file_df.copy()))
+    assert non_numeric_cols == ['RH']
+    assert df[('RH', '%')].isna().sum() == 1